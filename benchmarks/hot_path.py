@@ -0,0 +1,57 @@
+# Micro-benchmark of the per-record overhead added by `track_progress`.
+#
+# Usage: python -m benchmarks.hot_path [number_of_records]
+#
+import sys
+import time
+
+from progress_tracker import compile_format, track_progress
+
+TWO_FIELDS = compile_format("{records_seen} {items_per_second}")
+
+CONFIGURATIONS = {
+    "no conditions": {},
+    "every_n_records=1000": {"every_n_records": 1000},
+    "every_n_percent=10": {"every_n_percent": 10},
+    "every_n_seconds=60": {"every_n_seconds": 60},
+    "every_n_seconds=60 sample_tolerance=1": {"every_n_seconds": 60, "sample_tolerance": 1},
+    "every_n_seconds_idle=60": {"every_n_seconds_idle": 60},
+    "every_n_seconds=60 watchdog": {"every_n_seconds": 60, "watchdog": True},
+    "every_n_seconds_idle=60 watchdog": {"every_n_seconds_idle": 60, "watchdog": True},
+    "track_latency": {"track_latency": True},
+    "every_n_records=1": {"every_n_records": 1},
+    "every_n_records=1 two fields": {"every_n_records": 1, "format_callback": TWO_FIELDS},
+}
+
+
+def ignore(_message: str) -> None:
+    pass
+
+
+def bare_loop(records: range) -> float:
+    start = time.perf_counter()
+    for _ in records:
+        pass
+    return time.perf_counter() - start
+
+
+def tracked_loop(records: range, **kwargs: object) -> float:
+    start = time.perf_counter()
+    for _ in track_progress(records, callback=ignore, **kwargs):
+        pass
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    number_of_records = int(sys.argv[1]) if len(sys.argv) > 1 else 1000000
+    records = range(number_of_records)
+    baseline = min(bare_loop(records) for _ in range(3))
+    print("{:<36} {:>10.1f} ns/record".format("bare loop", baseline / number_of_records * 1e9))
+    for name, kwargs in CONFIGURATIONS.items():
+        elapsed = min(tracked_loop(records, **kwargs) for _ in range(3))
+        overhead = (elapsed - baseline) / number_of_records * 1e9
+        print("{:<36} {:>10.1f} ns/record overhead".format(name, overhead))
+
+
+if __name__ == "__main__":
+    main()
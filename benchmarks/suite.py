@@ -0,0 +1,201 @@
+# Benchmark suite for the cost of tracking, with a regression check against a stored baseline.
+#
+# Runs `track_progress` over a matrix of configurations (each condition alone and combined, with small and large values,
+# over sized and unsized iterables, with cheap and slow callbacks), and measures for each one:
+#   - the overhead in nanoseconds per record, compared to a bare loop over the same iterable (best of `--repeats` runs).
+#   - the memory used per record, using `tracemalloc`: the growth of the peak (which catches per-record buffers and
+#     garbage that builds up) and of the memory still in use after the run (which catches leaks).
+#
+# Usage:
+#   python -m benchmarks.suite [--records N] [--repeats N] [--filter TEXT] [--output results.json]
+#   python -m benchmarks.suite --baseline baseline.json  # Exits with status 1 if there is a regression.
+#
+# Timings are only comparable between runs on the same machine, so no baseline is stored in the repository. Instead,
+# before a release, CI runs this suite against the previous release (with `--output`) and then against the new one
+# (with `--baseline`), on the same runner. Configurations that the previous release doesn't support are skipped.
+#
+import argparse
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+from progress_tracker import track_progress
+
+# (name, keyword arguments to `track_progress`). Conditions that report on almost every record are also run with a slow callback.
+CONDITIONS: List[Tuple[str, Dict[str, Any]]] = [
+    ("no conditions", {}),
+    ("every_n_records=1", {"every_n_records": 1}),
+    ("every_n_records=1000", {"every_n_records": 1000}),
+    ("every_n_records=1000000000", {"every_n_records": 1000000000}),
+    ("every_n_percent=0.001", {"every_n_percent": 0.001}),
+    ("every_n_percent=10", {"every_n_percent": 10}),
+    ("every_n_seconds=0.0001", {"every_n_seconds": 0.0001}),
+    ("every_n_seconds=60", {"every_n_seconds": 60}),
+    ("every_n_seconds=60 sample_tolerance=1", {"every_n_seconds": 60, "sample_tolerance": 1}),
+    ("every_n_seconds=60 watchdog", {"every_n_seconds": 60, "watchdog": True}),
+    ("every_n_seconds_idle=60", {"every_n_seconds_idle": 60}),
+    ("every_n_seconds_idle=60 watchdog", {"every_n_seconds_idle": 60, "watchdog": True}),
+    ("every_n_seconds_since_report=60", {"every_n_seconds_since_report": 60}),
+    ("report_first_record report_last_record", {"report_first_record": True, "report_last_record": True}),
+    ("track_latency", {"track_latency": True}),
+    ("combined", {"every_n_records": 1000, "every_n_percent": 10, "every_n_seconds": 60, "report_last_record": True}),
+    ("combined watchdog", {"every_n_records": 1000, "every_n_percent": 10, "every_n_seconds": 60, "every_n_seconds_idle": 60, "watchdog": True}),
+]
+FREQUENT_CONDITIONS = {"every_n_records=1", "every_n_percent=0.001", "every_n_seconds=0.0001"}
+
+# A regression is an overhead that is more than `tolerance` (relative) and `SLACK_NS` (absolute) above the baseline,
+# or memory that is still in use after the run that grows by more than `RETAINED_BYTES_SLACK` per record.
+DEFAULT_TOLERANCE = 0.25
+SLACK_NS = 20.0
+RETAINED_BYTES_SLACK = 1.0
+
+
+def cheap_callback(_message: str) -> None:
+    pass
+
+
+def slow_callback(_message: str) -> None:
+    # Roughly the cost of writing a line to a terminal.
+    for _ in range(100):
+        pass
+
+
+def make_iterable(records: int, sized: bool) -> Iterable[int]:
+    return range(records) if sized else iter(range(records))
+
+
+def bare_loop(records: int, sized: bool) -> float:
+    iterable = make_iterable(records, sized)
+    start = time.perf_counter()
+    for _ in iterable:
+        pass
+    return time.perf_counter() - start
+
+
+def tracked_loop(records: int, sized: bool, callback: Callable[[str], None], kwargs: Dict[str, Any]) -> float:
+    iterable = make_iterable(records, sized)
+    start = time.perf_counter()
+    for _ in track_progress(iterable, callback=callback, **kwargs):
+        pass
+    return time.perf_counter() - start
+
+
+def memory_per_record(records: int, sized: bool, callback: Callable[[str], None], kwargs: Dict[str, Any]) -> Tuple[float, float]:
+    # Returns the growth of (peak memory, memory in use) per record, while tracking (and after tracking) `records` records.
+    iterable = make_iterable(records, sized)
+    tracemalloc.start()
+    try:
+        start, _ = tracemalloc.get_traced_memory()
+        for _ in track_progress(iterable, callback=callback, **kwargs):
+            pass
+        current, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return (peak - start) / records, (current - start) / records
+
+
+def supported(kwargs: Dict[str, Any]) -> bool:
+    # Whether the version of `track_progress` that is being measured (ex. a previous release) takes these arguments.
+    try:
+        track_progress([], **kwargs)
+    except TypeError:
+        return False
+    return True
+
+
+def configurations() -> List[Tuple[str, bool, Callable[[str], None], Dict[str, Any]]]:
+    matrix: List[Tuple[str, bool, Callable[[str], None], Dict[str, Any]]] = []
+    for condition, kwargs in CONDITIONS:
+        for sized in [True, False]:
+            if not sized and "every_n_percent" in kwargs:
+                continue  # Needs a total.
+            callbacks: List[Tuple[str, Callable[[str], None]]] = [("cheap", cheap_callback)]
+            if condition in FREQUENT_CONDITIONS:
+                callbacks.append(("slow", slow_callback))
+            for callback_name, callback in callbacks:
+                name = "{} [{}, {} callback]".format(condition, "sized" if sized else "unsized", callback_name)
+                matrix.append((name, sized, callback, kwargs))
+    return matrix
+
+
+def run(records: int, repeats: int, name_filter: str = "") -> Dict[str, Any]:
+    bare_ns = {
+        sized: min(bare_loop(records, sized) for _ in range(repeats)) / records * 1e9
+        for sized in [True, False]
+    }
+    results = {}
+    for name, sized, callback, kwargs in configurations():
+        if name_filter not in name:
+            continue
+        if not supported(kwargs):
+            print("{:<72} skipped (not supported by this version)".format(name))
+            continue
+        elapsed = min(tracked_loop(records, sized, callback, kwargs) for _ in range(repeats))
+        peak_bytes, retained_bytes = memory_per_record(records, sized, callback, kwargs)
+        results[name] = {
+            "ns_per_record": elapsed / records * 1e9,
+            "overhead_ns_per_record": elapsed / records * 1e9 - bare_ns[sized],
+            "peak_bytes_per_record": peak_bytes,
+            "retained_bytes_per_record": retained_bytes,
+        }
+        print("{:<72} {:>10.1f} ns/record overhead {:>8.2f} peak bytes/record {:>8.2f} retained bytes/record".format(
+            name, results[name]["overhead_ns_per_record"], peak_bytes, retained_bytes))
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "records": records,
+        "repeats": repeats,
+        "bare_loop_ns_per_record": {"sized": bare_ns[True], "unsized": bare_ns[False]},
+        "results": results,
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], tolerance: float = DEFAULT_TOLERANCE) -> List[str]:
+    # Returns a description of each regression. Configurations that are missing from either run are ignored.
+    regressions = []
+    for name, result in sorted(results["results"].items()):
+        expected = baseline["results"].get(name)
+        if expected is None:
+            continue
+        overhead = result["overhead_ns_per_record"]
+        allowed = max(0.0, expected["overhead_ns_per_record"]) * (1 + tolerance) + SLACK_NS
+        if overhead > allowed:
+            regressions.append("{}: {:.1f} ns/record overhead (baseline: {:.1f})".format(name, overhead, expected["overhead_ns_per_record"]))
+        retained = result["retained_bytes_per_record"]
+        if retained > expected["retained_bytes_per_record"] + RETAINED_BYTES_SLACK:
+            regressions.append("{}: {:.2f} retained bytes/record (baseline: {:.2f})".format(name, retained, expected["retained_bytes_per_record"]))
+    return regressions
+
+
+def main(arguments: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Measures the per-record cost of tracking progress.")
+    parser.add_argument("--records", type=int, default=200000, help="The number of records in each run.")
+    parser.add_argument("--repeats", type=int, default=3, help="The number of timed runs of each configuration (the fastest is kept).")
+    parser.add_argument("--filter", default="", help="Only run the configurations whose names contain this text.")
+    parser.add_argument("--output", help="Write the results to this JSON file (ex. to update the baseline).")
+    parser.add_argument("--baseline", help="Compare the results to this JSON file, and exit with status 1 if there are regressions.")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE, help="The relative increase in overhead that is allowed.")
+    options = parser.parse_args(arguments)
+
+    results = run(options.records, options.repeats, options.filter)
+    if options.output:
+        with open(options.output, "w") as file:
+            json.dump(results, file, indent=2, sort_keys=True)
+            file.write("\n")
+    if options.baseline:
+        with open(options.baseline) as file:
+            baseline = json.load(file)
+        regressions = compare(results, baseline, options.tolerance)
+        for regression in regressions:
+            print("REGRESSION " + regression)
+        if regressions:
+            return 1
+        print("No regressions compared to {}".format(options.baseline))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
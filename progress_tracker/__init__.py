@@ -1 +1,19 @@
 from .progress_tracker import ProgressTracker, track_progress, EVERY_N_PERCENT, EVERY_N_RECORDS, EVERY_N_SECONDS, EVERY_N_SECONDS_IDLE, EVERY_N_SECONDS_SINCE_REPORT, REPORT_FIRST_RECORD, REPORT_LAST_RECORD
+from .clock import FakeClock
+from .watchdog import Watchdog
+from .async_progress_tracker import AsyncProgressTracker, track_progress_async
+from .concurrent_progress_tracker import ConcurrentProgressTracker, track_progress_concurrently
+from .multiprocess import MultiprocessProgressTracker, track_progress_of_workers
+from .sinks import BackgroundSink, TerminalSink, BLOCK, COALESCE, DROP_OLDEST
+from .estimators import CumulativeRate, EWMARate, RateEstimator, SlidingWindowRate
+from .report import CompiledFormat, Report, compile_format
+from .exporters import PrometheusExporter, StatsDExporter
+from .checkpoint import Checkpoint
+from .events import EventLog, read_events
+from .replay import replay
+from .totals import AverageSizeTotal, LengthHint
+from .progress_tracker import disable, enable
+from .files import FileProgressTracker, track_file
+from .nested import NestedProgressTracker, track_nested
+from .pipeline import PipelineProgressTracker, track_pipeline
+from .distributed import DistributedProgressTracker, ShardProgressTracker, track_shard, track_shards
@@ -0,0 +1,156 @@
+import asyncio
+import inspect
+from typing import AbstractSet, Any, AsyncIterable, AsyncIterator, Callable, Optional, Set, Type, TypeVar, cast
+from types import TracebackType
+
+from progress_tracker.clock import ns_to_seconds
+from progress_tracker.progress_tracker import REASON_BITS, REPORT_LAST_RECORD, ProgressTracker, reasons_from_mask
+
+T = TypeVar("T")
+
+
+class AsyncProgressTracker(ProgressTracker[T]):
+    # The asyncio version of `ProgressTracker`, which wraps an `AsyncIterable`.
+    #
+    # The time-based conditions are checked using the event loop's timers, so (just like when using a watchdog)
+    # they are reported even while the loop is awaiting the next record.
+    # If the `callback` returns an awaitable, it is run as a task, so that a slow callback does not hold up processing.
+    #
+    def __init__(self, iterable: AsyncIterable[T], **kwargs: Any) -> None:
+        if kwargs.get("watchdog"):
+            raise TypeError("AsyncProgressTracker checks the time-based conditions using the event loop, so it does not take a `watchdog`.")
+        super().__init__(cast(Any, iterable), **kwargs)
+        self.async_iterable = iterable
+        self.check_clock = False
+        self.sampling = False  # Not needed, since the event loop's timers check the time-based conditions.
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.timer_handle: Optional[asyncio.TimerHandle] = None
+        self.pending_callbacks: Set['asyncio.Future[Any]'] = set()
+
+    def __aiter__(self) -> AsyncIterator[T]:
+        if self.is_pass_through():
+            return self.async_iterable.__aiter__()
+        return self.aiter_helper()
+
+    async def aiter_helper(self) -> AsyncIterator[T]:
+        used_as_context_manager = self.used_as_context_manager
+        if not used_as_context_manager:
+            self.__enter__()
+
+        self.start_timers()
+        weight = self.weight
+        latencies = self.interval_latencies
+        clock = self.clock
+        report: Callable[[AbstractSet[str]], Any] = self.raise_report
+        track_records_done = False
+        if self.has_time_conditions:
+            report = self.offer_report
+            track_records_done = True
+        if weight is not None:
+            # A record with no weight does not change `records_seen`, so it can't be reported on separately.
+            report = self.offer_report
+
+        try:
+            records = self.async_iterable.__aiter__()
+            records_to_skip = self.take_records_to_skip()
+            while records_to_skip > 0:  # Already processed before resuming from a checkpoint.
+                try:
+                    await records.__anext__()
+                except StopAsyncIteration:
+                    break
+                records_to_skip -= 1
+
+            async for record in records:
+                if weight is None:
+                    self.records_seen += 1
+                else:
+                    self.records_seen += weight(record)
+                if latencies is None:
+                    yield record  # Process record
+                else:
+                    started_ns = clock()
+                    yield record  # Process record
+                    latencies.record(clock() - started_ns)
+
+                if self.records_seen >= self.next_check_at:
+                    reasons_to_report = self.should_report()
+                    if reasons_to_report:
+                        report(reasons_to_report)
+
+                if track_records_done:
+                    self.records_done = self.records_seen
+            self.iteration_finished = True
+            self.stop_timers()
+
+            if self.watchdog_error is not None:
+                raise self.watchdog_error
+
+            if self.report_last_record and self.records_seen > 0 and not self.report_raised_this_record:  # Ensure that we don't break the "Report Creation Invariants".
+                report(reasons_from_mask(REASON_BITS[REPORT_LAST_RECORD]))
+        except BaseException:
+            if not used_as_context_manager:
+                self.failed = True  # Including when the loop breaks before the end, or raises.
+            raise
+        finally:
+            if not used_as_context_manager:
+                self.complete()
+                await self.wait_for_callbacks()
+
+    async def __aenter__(self) -> 'AsyncProgressTracker[T]':
+        self.__enter__()
+        return self
+
+    async def __aexit__(self, exc_type: Optional[Type[Exception]], value: Optional[Exception], traceback: Optional[TracebackType]) -> None:
+        if exc_type is not None:
+            self.failed = True
+        self.complete()
+        await self.wait_for_callbacks()
+
+    def start_timers(self) -> None:
+        if self.timeout is not None:
+            self.timeout.reset()
+        if self.idle_timeout is not None:
+            self.idle_timeout.reset()
+        if self.has_time_conditions:
+            self.loop = asyncio.get_event_loop()
+            self.reset_time_condition_checks()
+            self.schedule_timer(self.next_time_condition_deadline(self.clock()))
+
+    def stop_timers(self) -> None:
+        if self.timer_handle is not None:
+            self.timer_handle.cancel()
+            self.timer_handle = None
+
+    def complete(self) -> None:
+        super().complete()
+        self.stop_timers()
+
+    def schedule_timer(self, deadline_ns: int) -> None:
+        assert self.loop is not None
+        self.timer_handle = self.loop.call_at(self.loop.time() + ns_to_seconds(deadline_ns - self.clock()), self.on_timer)
+
+    def on_timer(self) -> None:
+        next_deadline_ns = self.check_time_conditions(self.clock())
+        if next_deadline_ns is None or self.timer_handle is None:
+            self.timer_handle = None
+        else:
+            self.schedule_timer(next_deadline_ns)
+
+    def send_report(self, reasons_to_report: AbstractSet[str]) -> None:
+        if self.sink is not None:
+            super().send_report(reasons_to_report)
+            return
+        result = self.callback(self.format_callback(self.create_report(), reasons_to_report))
+        if inspect.isawaitable(result):
+            task = asyncio.ensure_future(result)
+            self.pending_callbacks.add(task)
+            task.add_done_callback(self.pending_callbacks.discard)
+
+    async def wait_for_callbacks(self) -> None:
+        # Wait for any callbacks that are still running, raising the first error (if any).
+        while self.pending_callbacks:
+            await asyncio.gather(*list(self.pending_callbacks))
+
+
+def track_progress_async(iterable: AsyncIterable[T], **kwargs: Any) -> AsyncProgressTracker[T]:
+    return AsyncProgressTracker(iterable, **kwargs)
@@ -0,0 +1,114 @@
+import json
+import os
+import sys
+import tempfile
+from typing import Any, Dict, Optional
+
+from progress_tracker.clock import seconds_to_ns
+
+# The version of the checkpoint file format.
+CHECKPOINT_VERSION = 1
+
+# Record count used for thresholds that will never be reached.
+NEVER = sys.maxsize
+
+
+class Checkpoint(object):
+    # Periodically saves a tracker's state to `path`, so that a restarted job can resume where it left off.
+    #
+    # A checkpoint is written every `every_n_records` records and/or (roughly) every `every_n_seconds` seconds.
+    # Both are folded into the tracker's record thresholds: the time-based cadence is converted into a number of
+    # records using the rate observed between checks, so the clock is never read on every record.
+    #
+    # Files are replaced atomically (written to a temporary file in the same directory, then renamed), so a crash
+    # while writing leaves the previous checkpoint intact.
+    #
+    def __init__(self, path: str, every_n_records: Optional[int] = None, every_n_seconds: Optional[float] = None, fsync: bool = True) -> None:
+        if every_n_records is None and every_n_seconds is None:
+            every_n_seconds = 60
+        if every_n_records is not None and every_n_records < 1:
+            raise ValueError("every_n_records must be at least 1.")
+        self.path = path
+        self.every_n_records = every_n_records
+        self.interval_ns = seconds_to_ns(every_n_seconds) if every_n_seconds is not None else None
+        self.fsync = fsync
+        self.saves = 0
+
+        self.last_save_ns = 0
+        self.last_check_ns = 0
+        self.last_check_records = 0
+        self.step = 1  # The number of records between checks of the time-based cadence.
+        self.next_records_at = NEVER
+        self.next_check_at = NEVER
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self.path, "r", encoding="utf-8") as file:
+                state: Dict[str, Any] = json.load(file)
+        except FileNotFoundError:
+            return None
+        if state.get("version") != CHECKPOINT_VERSION:
+            raise ValueError("Unsupported checkpoint version {!r} in {!r}.".format(state.get("version"), self.path))
+        return state
+
+    def save(self, state: Dict[str, Any]) -> None:
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temporary_path = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp", dir=directory)
+        try:
+            with os.fdopen(descriptor, "w", encoding="utf-8") as file:
+                json.dump(dict(state, version=CHECKPOINT_VERSION), file, separators=(",", ":"))
+                if self.fsync:
+                    file.flush()
+                    os.fsync(file.fileno())
+            os.replace(temporary_path, self.path)
+        except BaseException:
+            os.unlink(temporary_path)
+            raise
+        self.saves += 1
+
+    def remove(self) -> None:
+        try:
+            os.unlink(self.path)
+        except FileNotFoundError:
+            pass
+
+    def start(self, records_seen: int, now_ns: int) -> None:
+        self.last_save_ns = self.last_check_ns = now_ns
+        self.last_check_records = records_seen
+        self.step = 1
+        if self.every_n_records is not None:
+            self.next_records_at = self.next_records_checkpoint(records_seen)
+        self.update_next_check(records_seen)
+
+    def check(self, records_seen: int, now_ns: int) -> bool:
+        # Called once `records_seen >= next_check_at`. Returns whether a checkpoint should be saved now.
+        due = False
+        if records_seen >= self.next_records_at:
+            due = True
+            self.next_records_at = self.next_records_checkpoint(records_seen)
+        if self.interval_ns is not None:
+            if now_ns - self.last_save_ns >= self.interval_ns:
+                due = True
+            remaining_ns = self.interval_ns if due else self.last_save_ns + self.interval_ns - now_ns
+            elapsed_ns = now_ns - self.last_check_ns
+            if elapsed_ns > 0:
+                # Aim for the next check to land on the deadline, but only let the gap between checks double each time.
+                estimate = int((records_seen - self.last_check_records) * remaining_ns / elapsed_ns)
+                self.step = max(1, min(estimate, 2 * self.step))
+            else:
+                self.step *= 2
+            self.last_check_ns = now_ns
+            self.last_check_records = records_seen
+        if due:
+            self.last_save_ns = now_ns
+        self.update_next_check(records_seen)
+        return due
+
+    def next_records_checkpoint(self, records_seen: int) -> int:
+        assert self.every_n_records is not None
+        return ((records_seen // self.every_n_records) + 1) * self.every_n_records
+
+    def update_next_check(self, records_seen: int) -> None:
+        self.next_check_at = self.next_records_at
+        if self.interval_ns is not None:
+            self.next_check_at = min(self.next_check_at, records_seen + self.step)
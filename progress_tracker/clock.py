@@ -0,0 +1,50 @@
+import time
+from datetime import timedelta
+from typing import Callable
+
+# A clock is any zero-argument callable that returns a monotonically non-decreasing number of nanoseconds.
+# Only differences between two readings are meaningful.
+Clock = Callable[[], int]
+
+NANOSECONDS_PER_SECOND = 1000000000
+MICROSECOND = timedelta(microseconds=1)
+
+
+def monotonic_ns_fallback() -> int:
+    # `time.monotonic_ns` is only available from Python 3.7.
+    return int(time.monotonic() * NANOSECONDS_PER_SECOND)
+
+
+monotonic_ns: Clock = getattr(time, "monotonic_ns", monotonic_ns_fallback)
+
+default_clock: Clock = monotonic_ns
+
+
+def seconds_to_ns(seconds: float) -> int:
+    return int(seconds * NANOSECONDS_PER_SECOND)
+
+
+def ns_to_seconds(nanoseconds: int) -> float:
+    return nanoseconds / NANOSECONDS_PER_SECOND
+
+
+def ns_to_timedelta(nanoseconds: int) -> timedelta:
+    # Rounded to the nearest microsecond. Multiplying a timedelta by an integer is much cheaper than calling the constructor
+    # (especially with a float number of microseconds), and reports create these for every report.
+    return MICROSECOND * ((nanoseconds + 500) // 1000)
+
+
+class FakeClock(object):
+    # A deterministic clock, which only moves when told to.
+    # Useful for tests, and for replaying recorded progress.
+    def __init__(self, start_ns: int = 0) -> None:
+        self.now_ns = start_ns
+
+    def __call__(self) -> int:
+        return self.now_ns
+
+    def advance(self, seconds: float = 0, nanoseconds: int = 0) -> None:
+        self.now_ns += seconds_to_ns(seconds) + nanoseconds
+
+    def set(self, now_ns: int) -> None:
+        self.now_ns = now_ns
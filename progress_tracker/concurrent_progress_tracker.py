@@ -0,0 +1,133 @@
+import concurrent.futures
+import functools
+import threading
+from typing import Any, Callable, Iterable, Iterator, List, Optional, TypeVar
+
+from progress_tracker import progress_tracker
+from progress_tracker.progress_tracker import ProgressTracker
+from progress_tracker.report import Report
+
+T = TypeVar("T")
+R = TypeVar("R")
+
+
+class ConcurrentProgressTracker(ProgressTracker[T]):
+    # A tracker that can be shared between threads (ex. the workers of a `ThreadPoolExecutor`), which call `update()`.
+    #
+    # Each thread counts its own records in a separate cell, so updates don't contend on a lock.
+    # The cells are only summed (under a lock) when a thread's count reaches its next merge point,
+    # which is spaced so that the merges happen around the time that the next record-based condition is met.
+    # Because of this, reports may contain counts that are slightly past the record count that met the condition.
+    #
+    # The time-based conditions are checked by a watchdog by default, since no single thread sees every record.
+    #
+    def __init__(self, iterable: Optional[Iterable[T]] = None, **kwargs: Any) -> None:
+        kwargs.setdefault("watchdog", True)
+        super().__init__(iterable, **kwargs)
+        if self.check_clock:
+            # The merges are spaced by the record-based conditions only, so the clock would never be checked.
+            raise ValueError("ConcurrentProgressTracker checks the time-based conditions using a watchdog (or by sampling the clock, "
+                             "with `sample_tolerance`), so `watchdog` can not be False when using them.")
+        self.local = threading.local()
+        self.cells: List[List[int]] = []  # [records counted by the thread, count at which the thread next merges]
+        self.merge_lock = threading.Lock()
+
+    def update(self, n: int = 1) -> None:
+        if not progress_tracker.enabled:
+            return
+        cell: Optional[List[int]] = getattr(self.local, "cell", None)
+        if cell is None:
+            cell = self.register_thread()
+        cell[0] += n
+        if cell[0] >= cell[1]:
+            self.merge(cell)
+
+    def register_thread(self) -> List[int]:
+        with self.merge_lock:
+            if not self.advancing:
+                if self.start_ns is None:
+                    self.start()
+                self.start_timers()
+                self.advancing = True
+            cell = [0, 0]
+            self.cells.append(cell)
+            cell[1] = self.merge_stride()
+        self.local.cell = cell
+        return cell
+
+    def merge_stride(self) -> int:
+        # Assumes that all of the threads are progressing at about the same rate.
+        return max(1, (self.next_check_at - self.records_seen) // len(self.cells))
+
+    def refresh(self) -> None:
+        # Must hold `merge_lock`.
+        self.records_seen = sum(cell[0] for cell in self.cells)
+        self.records_done = self.records_seen
+
+    def merge(self, cell: List[int]) -> None:
+        with self.merge_lock:
+            self.refresh()
+            if self.check_clock or self.records_seen >= self.next_check_at:
+                reasons_to_report = self.should_report()
+                if reasons_to_report:
+                    self.offer_report(reasons_to_report)
+            cell[1] = cell[0] + self.merge_stride()
+
+    def check_time_conditions(self, now_ns: int) -> Optional[int]:
+        with self.merge_lock:
+            self.refresh()
+            return super().check_time_conditions(now_ns)
+
+    def snapshot(self) -> Report:
+        with self.merge_lock:
+            self.refresh()
+            return super().snapshot()
+
+    def complete(self) -> None:
+        with self.merge_lock:
+            self.refresh()
+            # The last counts of threads that didn't reach their next merge point may meet a condition.
+            if self.advancing and self.records_seen >= self.next_check_at:
+                reasons_to_report = self.should_report()
+                if reasons_to_report:
+                    self.offer_report(reasons_to_report)
+            super().complete()
+
+    def __iter__(self) -> Iterator[T]:
+        if self.iterable is None:
+            raise TypeError("This tracker was not given an iterable. Use `update()` to record progress instead.")
+        iterable = self.iterable
+
+        def iter_helper() -> Iterator[T]:
+            for record in iterable:
+                yield record  # Process record
+                self.update()
+
+        if self.is_pass_through():
+            return iter(iterable)
+        if self.used_as_context_manager:
+            return iter_helper()
+        return self.iter_in_context(iter_helper())
+
+    def wrap(self, function: Callable[..., R]) -> Callable[..., R]:
+        # Wraps `function`, so that each call to it records that one record has been processed.
+        @functools.wraps(function)
+        def wrapper(*args: Any, **kwargs: Any) -> R:
+            result = function(*args, **kwargs)
+            self.update()
+            return result
+        return wrapper
+
+    def map(self, executor: concurrent.futures.Executor, function: Callable[..., R], *iterables: Iterable[Any], **kwargs: Any) -> Iterator[R]:
+        # `executor.map`, where the progress is recorded by the workers as each call completes.
+        return executor.map(self.wrap(function), *iterables, **kwargs)
+
+    def as_completed(self, futures: Iterable['concurrent.futures.Future[R]'], timeout: Optional[float] = None) -> Iterator['concurrent.futures.Future[R]']:
+        # `concurrent.futures.as_completed`, where the progress is recorded as each future completes.
+        for future in concurrent.futures.as_completed(futures, timeout):
+            self.update()
+            yield future
+
+
+def track_progress_concurrently(iterable: Optional[Iterable[T]] = None, **kwargs: Any) -> ConcurrentProgressTracker[T]:
+    return ConcurrentProgressTracker(iterable, **kwargs)
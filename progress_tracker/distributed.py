@@ -0,0 +1,326 @@
+import asyncio
+import os
+import socket
+import threading
+import warnings
+from typing import AbstractSet, Any, Dict, Iterable, List, Mapping, Optional, Set, Tuple, TypeVar, Union
+
+from progress_tracker.clock import ns_to_seconds, seconds_to_ns
+from progress_tracker.progress_tracker import EVERY_N_SECONDS, EVERY_N_SECONDS_IDLE, EVERY_N_SECONDS_SINCE_REPORT, ProgressTracker, default_format_callback
+from progress_tracker.report import Report
+from progress_tracker.watchdog import Watchdog
+
+T = TypeVar("T")
+
+# A TCP (host, port) address, or the path of a Unix domain socket.
+Address = Union[Tuple[str, int], str]
+
+# How long a shard waits to connect to (or to send to) the aggregator before giving up on a batch.
+SEND_TIMEOUT = 5.0
+
+# The protocol is newline-delimited text. A shard sends `shard <name>` when it connects, `total <n>` if it knows its total,
+# then the number of records processed since its previous batch, and finally `done`.
+HELLO = "shard"
+TOTAL = "total"
+DONE = "done"
+
+
+def per_shard_format_callback(report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+    # The default format, followed by the rate of each shard since the previous report (to help spot stragglers).
+    rates = ", ".join(
+        "{}: {}".format(shard, "{:.1f}/s".format(rate) if rate is not None else "?")
+        for shard, rate in sorted(report["shard_items_per_second"].items())
+    )
+    return "{} [Per shard: {}]".format(default_format_callback(report, reasons), rates)
+
+
+class DistributedProgressTracker(ProgressTracker[Any]):
+    # Tracks the combined progress of the shards of a job, which run in other processes (or on other hosts) and
+    # use a `ShardProgressTracker` to send their progress to this tracker's server.
+    #
+    # The server is an asyncio server (on TCP, or on a Unix domain socket when `address` is a path) that runs on its own
+    # thread while the tracker is used as a context manager. Each batch of records that a shard sends is added with
+    # `advance()`, so the conditions are checked against the combined total. Without a `total`, the total is the sum of the
+    # totals sent by the shards (so it grows as shards connect). With `shards`, `wait()` returns once that many shards are done.
+    #
+    def __init__(self, address: Address = ("127.0.0.1", 0), shards: Optional[int] = None, **kwargs: Any) -> None:
+        if "weight" in kwargs:
+            raise TypeError("DistributedProgressTracker does not take a `weight`.")
+        if any(kwargs.get(condition) is not None for condition in (EVERY_N_SECONDS, EVERY_N_SECONDS_IDLE, EVERY_N_SECONDS_SINCE_REPORT)):
+            kwargs.setdefault("watchdog", True)  # Batches only arrive every so often.
+        with warnings.catch_warnings():
+            if kwargs.get("total") is None:
+                warnings.simplefilter("ignore", RuntimeWarning)  # Without a `total`, the shards send theirs.
+            super().__init__(None, **kwargs)
+        self.requested_address = address
+        self.shards = shards
+        self.totals_from_shards = self.total is None
+        self.shard_records: Dict[str, int] = {}
+        self.shard_totals: Dict[str, int] = {}
+        self.shards_done: Set[str] = set()
+        self.shards_lock = threading.Lock()
+        self.finished = threading.Event()
+        self.last_report_shard_records: Dict[str, int] = {}
+        self.last_report_ns: Optional[int] = None
+        self.loop: Optional[asyncio.AbstractEventLoop] = None
+        self.server: Optional[Any] = None
+        self.server_ready = threading.Event()
+        self.server_error: Optional[BaseException] = None
+        self.thread: Optional[threading.Thread] = None
+        self.connections: Set['asyncio.Task[None]'] = set()
+        self.counts_observed = True  # Progress is added with `advance()`, so the tracker is never a pass-through.
+
+    def __enter__(self) -> 'DistributedProgressTracker':
+        super().__enter__()
+        self.last_report_ns = self.start_ns
+        self.advancing = True
+        self.start_timers()
+        self.thread = threading.Thread(target=self.serve, name="progress_tracker-aggregator", daemon=True)
+        self.thread.start()
+        self.server_ready.wait()
+        if self.server_error is not None:
+            raise self.server_error
+        return self
+
+    @property
+    def address(self) -> Address:
+        # The address that the shards should connect to (with the port that was picked, when using port 0).
+        assert self.server is not None, "The tracker's server has not been started."
+        if isinstance(self.requested_address, str):
+            return self.requested_address
+        host, port = self.server.sockets[0].getsockname()[:2]
+        return str(host), int(port)
+
+    def serve(self) -> None:
+        # Runs the server's event loop, on the tracker's thread.
+        loop = asyncio.new_event_loop()
+        self.loop = loop
+        try:
+            if isinstance(self.requested_address, str):
+                starting = asyncio.start_unix_server(self.accept, path=self.requested_address)
+            else:
+                host, port = self.requested_address
+                starting = asyncio.start_server(self.accept, host, port)
+            self.server = loop.run_until_complete(starting)
+        except BaseException as error:
+            self.server_error = error
+            loop.close()
+            return
+        finally:
+            self.server_ready.set()
+        loop.run_forever()
+        self.server.close()
+        loop.run_until_complete(self.server.wait_closed())
+        for connection in self.connections:
+            connection.cancel()
+        if self.connections:
+            loop.run_until_complete(asyncio.gather(*self.connections, return_exceptions=True))
+        loop.close()
+
+    def accept(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        assert self.loop is not None
+        connection = self.loop.create_task(self.receive(reader, writer))
+        self.connections.add(connection)
+        connection.add_done_callback(self.connections.discard)
+
+    async def receive(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        shard: Optional[str] = None
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    return
+                command, _, argument = line.decode("utf-8").strip().partition(" ")
+                if command == HELLO:
+                    shard = argument
+                    with self.shards_lock:
+                        self.shard_records.setdefault(shard, 0)
+                elif shard is None:
+                    return  # Not a shard.
+                elif command == TOTAL:
+                    self.add_shard_total(shard, int(argument))
+                elif command == DONE:
+                    self.shard_done(shard)
+                else:
+                    self.add_shard_records(shard, int(command))
+        except (ConnectionError, ValueError):
+            pass  # Batches aren't acknowledged, so the records of any that were lost with the connection are never counted.
+        finally:
+            writer.close()
+
+    def add_shard_records(self, shard: str, records: int) -> None:
+        with self.shards_lock:
+            self.shard_records[shard] += records
+        self.advance(records)
+
+    def add_shard_total(self, shard: str, total: int) -> None:
+        if not self.totals_from_shards:
+            return
+        with self.shards_lock:
+            self.shard_totals[shard] = total
+            combined_total = sum(self.shard_totals.values())
+        self.set_total(combined_total)
+
+    def shard_done(self, shard: str) -> None:
+        with self.shards_lock:
+            self.shards_done.add(shard)
+            if self.shards is not None and len(self.shards_done) >= self.shards:
+                self.finished.set()
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        # Waits until `shards` shards are done. Returns False if `timeout` seconds passed first.
+        assert self.shards is not None, "The tracker was not told how many `shards` to wait for."
+        return self.finished.wait(timeout)
+
+    def stop_server(self) -> None:
+        if self.thread is not None:
+            assert self.loop is not None
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self.thread.join()
+            self.thread = None
+            if isinstance(self.requested_address, str) and os.path.exists(self.requested_address):
+                os.unlink(self.requested_address)
+
+    def complete(self) -> None:
+        self.stop_server()  # First, so that no more records are added while completing.
+        super().complete()
+
+    def shard_values(self) -> Tuple[Dict[str, int], Dict[str, Optional[float]]]:
+        with self.shards_lock:
+            shard_records = dict(self.shard_records)
+        now_ns = self.clock()
+        assert self.last_report_ns is not None
+        elapsed_seconds = ns_to_seconds(now_ns - self.last_report_ns)
+        shard_items_per_second = {
+            shard: (records - self.last_report_shard_records.get(shard, 0)) / elapsed_seconds if elapsed_seconds != 0 else None
+            for shard, records in shard_records.items()
+        }
+        return shard_records, shard_items_per_second
+
+    def add_shard_values(self, report: Report) -> Report:
+        report["shard_records"], report["shard_items_per_second"] = self.shard_values()
+        return report
+
+    def create_report(self) -> Report:
+        return self.add_shard_values(super().create_report())
+
+    def snapshot(self) -> Report:
+        report = super().snapshot()
+        if self.last_report_ns is None:
+            report["shard_records"], report["shard_items_per_second"] = {}, {}
+            return report
+        return self.add_shard_values(report)
+
+    def send_report(self, reasons_to_report: AbstractSet[str]) -> None:
+        super().send_report(reasons_to_report)
+        with self.shards_lock:
+            self.last_report_shard_records = dict(self.shard_records)
+        self.last_report_ns = self.clock()
+
+
+class ShardProgressTracker(ProgressTracker[T]):
+    # Tracks one shard of a job, and sends its progress to a `DistributedProgressTracker` at `address`.
+    #
+    # Records are counted locally (as by any tracker, so the shard can have its own conditions as well), and the number of
+    # records processed since the previous batch is sent every `interval` seconds from a watchdog's thread, rather than
+    # per record. The last batch is sent when the tracker completes. Batches that could not be sent (ex. while the
+    # aggregator is unreachable) are counted in `send_errors`, and their records are sent with the next batch.
+    # Batches aren't acknowledged though, so a batch that was sent, but lost with its connection, isn't sent again.
+    #
+    # Connecting and sending block (for up to `SEND_TIMEOUT`), so batches are sent from a watchdog that is only shared
+    # by shards, rather than from the one that checks the time-based conditions of every other tracker.
+    #
+    shared_sender: Optional[Watchdog] = None
+    shared_sender_lock = threading.Lock()
+
+    def __init__(self, iterable: Optional[Iterable[T]] = None, address: Optional[Address] = None, shard: Optional[str] = None,
+                 interval: float = 1, **kwargs: Any) -> None:
+        if address is None:
+            raise TypeError("ShardProgressTracker needs the `address` of a DistributedProgressTracker.")
+        super().__init__(iterable, **kwargs)
+        self.address = address
+        self.shard = shard if shard is not None else "{}:{}".format(socket.gethostname(), os.getpid())
+        self.interval_ns = seconds_to_ns(interval)
+        self.sender = self.shared_sender_watchdog()
+        self.send_handle: Optional[int] = None
+        self.send_lock = threading.Lock()
+        self.socket: Optional[socket.socket] = None
+        self.records_sent = 0
+        self.batches_sent = 0
+        self.send_errors = 0
+        self.counts_observed = True  # The aggregator reports on the shard's progress.
+
+    @classmethod
+    def shared_sender_watchdog(cls) -> Watchdog:
+        with cls.shared_sender_lock:
+            if cls.shared_sender is None:
+                cls.shared_sender = Watchdog()
+            return cls.shared_sender
+
+    def start(self) -> None:
+        super().start()
+        self.send()  # Connects, so that the aggregator knows about the shard (and its total) as soon as possible.
+        self.send_handle = self.sender.schedule(self.sender.clock() + self.interval_ns, self.check)
+
+    def check(self, now_ns: int) -> Optional[int]:
+        # Called from the sender's thread.
+        if self.send_handle is None:
+            return None
+        self.send()
+        return now_ns + self.interval_ns
+
+    def connect(self) -> socket.socket:
+        if isinstance(self.address, str):
+            connection = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            connection.settimeout(SEND_TIMEOUT)
+            try:
+                connection.connect(self.address)
+            except OSError:
+                connection.close()
+                raise
+            return connection
+        return socket.create_connection(self.address, SEND_TIMEOUT)
+
+    def send(self, done: bool = False) -> None:
+        with self.send_lock:
+            records_seen = self.records_seen
+            lines: List[str] = []
+            try:
+                if self.socket is None:
+                    self.socket = self.connect()
+                    lines.append("{} {}".format(HELLO, self.shard))
+                    if self.total is not None:
+                        lines.append("{} {}".format(TOTAL, self.total))
+                if records_seen > self.records_sent:
+                    lines.append(str(records_seen - self.records_sent))
+                if done:
+                    lines.append(DONE)
+                if lines:
+                    self.socket.sendall("".join(line + "\n" for line in lines).encode("utf-8"))
+                    self.batches_sent += 1
+                self.records_sent = records_seen
+            except OSError:
+                self.send_errors += 1
+                self.close()
+
+    def close(self) -> None:
+        if self.socket is not None:
+            self.socket.close()
+            self.socket = None
+
+    def complete(self) -> None:
+        if self.send_handle is not None:
+            self.sender.cancel(self.send_handle)
+            self.send_handle = None
+        super().complete()
+        self.send(done=True)
+        with self.send_lock:
+            self.close()
+
+
+def track_shards(address: Address = ("127.0.0.1", 0), shards: Optional[int] = None, **kwargs: Any) -> DistributedProgressTracker:
+    return DistributedProgressTracker(address, shards, **kwargs)
+
+
+def track_shard(iterable: Optional[Iterable[T]] = None, address: Optional[Address] = None, **kwargs: Any) -> ShardProgressTracker[T]:
+    return ShardProgressTracker(iterable, address, **kwargs)
@@ -0,0 +1,159 @@
+import abc
+from typing import Any, Dict, List, Optional
+
+from progress_tracker.clock import ns_to_seconds, seconds_to_ns
+
+
+class RateEstimator(abc.ABC):
+    # Estimates the rate (in records per second) at which records are being processed.
+    # Estimators are given samples of (clock reading, records_seen), and each sample is O(1).
+    #
+    # By default, the tracker samples its estimator every time that it creates a report. Estimators whose rate only depends
+    # on the latest sample (ex. `CumulativeRate`) set `sampled` to False instead: the tracker then leaves them alone, and a
+    # report only calls `rate_at` if its smoothed values are used.
+    #
+    sampled = True
+
+    def start(self, now_ns: int, records_seen: int) -> None:
+        self.update(now_ns, records_seen)
+
+    @abc.abstractmethod
+    def update(self, now_ns: int, records_seen: int) -> None:
+        pass
+
+    @abc.abstractmethod
+    def rate(self) -> Optional[float]:
+        pass
+
+    def rate_at(self, now_ns: int, records_seen: int) -> Optional[float]:
+        # The rate, if the latest sample was (now_ns, records_seen). Only used when `sampled` is False.
+        self.update(now_ns, records_seen)
+        return self.rate()
+
+    # Used to checkpoint an estimator. Clock readings are saved relative to `now_ns`, since
+    # readings of a monotonic clock can't be compared between processes.
+    def get_state(self, now_ns: int) -> Dict[str, Any]:
+        return {}
+
+    def set_state(self, state: Dict[str, Any], now_ns: int) -> None:
+        pass
+
+
+class CumulativeRate(RateEstimator):
+    # The average rate since processing started.
+    sampled = False
+
+    def __init__(self) -> None:
+        self.start_ns: Optional[int] = None
+        self.start_records = 0
+        self.last_ns: Optional[int] = None
+        self.last_records = 0
+
+    def start(self, now_ns: int, records_seen: int) -> None:
+        self.start_ns = self.last_ns = now_ns
+        self.start_records = self.last_records = records_seen
+
+    def update(self, now_ns: int, records_seen: int) -> None:
+        if self.start_ns is None:
+            self.start(now_ns, records_seen)
+        self.last_ns = now_ns
+        self.last_records = records_seen
+
+    def rate(self) -> Optional[float]:
+        if self.start_ns is None or self.last_ns is None or self.last_ns == self.start_ns:
+            return None
+        return (self.last_records - self.start_records) / ns_to_seconds(self.last_ns - self.start_ns)
+
+    def rate_at(self, now_ns: int, records_seen: int) -> Optional[float]:
+        # Doesn't change the estimator, so reports can call it from any thread, in any order.
+        if self.start_ns is None or now_ns == self.start_ns:
+            return None
+        return (records_seen - self.start_records) / ns_to_seconds(now_ns - self.start_ns)
+
+    def get_state(self, now_ns: int) -> Dict[str, Any]:
+        if self.start_ns is None or self.last_ns is None:
+            return {}
+        return {"start_ago_ns": now_ns - self.start_ns, "start_records": self.start_records, "last_ago_ns": now_ns - self.last_ns, "last_records": self.last_records}
+
+    def set_state(self, state: Dict[str, Any], now_ns: int) -> None:
+        if state:
+            self.start_ns = now_ns - state["start_ago_ns"]
+            self.start_records = state["start_records"]
+            self.last_ns = now_ns - state["last_ago_ns"]
+            self.last_records = state["last_records"]
+
+
+class EWMARate(RateEstimator):
+    # An exponentially weighted moving average of the rate between samples.
+    # The weight of a sample depends on how much time it covers, so that irregularly spaced samples are handled correctly:
+    # the older rates lose half of their weight every `half_life` seconds.
+    def __init__(self, half_life: float = 60) -> None:
+        self.half_life_ns = seconds_to_ns(half_life)
+        self.last_ns: Optional[int] = None
+        self.last_records = 0
+        self.average: Optional[float] = None
+
+    def update(self, now_ns: int, records_seen: int) -> None:
+        if self.last_ns is not None:
+            elapsed_ns = now_ns - self.last_ns
+            if elapsed_ns <= 0:
+                return
+            sample_rate = (records_seen - self.last_records) / ns_to_seconds(elapsed_ns)
+            if self.average is None:
+                self.average = sample_rate
+            else:
+                weight = 1 - 0.5 ** (elapsed_ns / self.half_life_ns)
+                self.average += weight * (sample_rate - self.average)
+        self.last_ns = now_ns
+        self.last_records = records_seen
+
+    def rate(self) -> Optional[float]:
+        return self.average
+
+    def get_state(self, now_ns: int) -> Dict[str, Any]:
+        if self.last_ns is None:
+            return {}
+        return {"last_ago_ns": now_ns - self.last_ns, "last_records": self.last_records, "average": self.average}
+
+    def set_state(self, state: Dict[str, Any], now_ns: int) -> None:
+        if state:
+            self.last_ns = now_ns - state["last_ago_ns"]
+            self.last_records = state["last_records"]
+            self.average = state["average"]
+
+
+class SlidingWindowRate(RateEstimator):
+    # The rate over the last `size` samples, kept in a fixed-size ring buffer.
+    def __init__(self, size: int = 10) -> None:
+        if size < 2:
+            raise ValueError("A sliding window needs at least 2 samples.")
+        self.size = size
+        self.times_ns: List[int] = [0] * size
+        self.records: List[int] = [0] * size
+        self.samples = 0  # Total number of samples taken. The latest sample is at index (samples - 1) % size.
+
+    def update(self, now_ns: int, records_seen: int) -> None:
+        index = self.samples % self.size
+        self.times_ns[index] = now_ns
+        self.records[index] = records_seen
+        self.samples += 1
+
+    def rate(self) -> Optional[float]:
+        if self.samples < 2:
+            return None
+        newest = (self.samples - 1) % self.size
+        oldest = self.samples % self.size if self.samples >= self.size else 0
+        elapsed_ns = self.times_ns[newest] - self.times_ns[oldest]
+        if elapsed_ns <= 0:
+            return None
+        return (self.records[newest] - self.records[oldest]) / ns_to_seconds(elapsed_ns)
+
+    def get_state(self, now_ns: int) -> Dict[str, Any]:
+        # The samples that are still in the window, oldest first.
+        indexes = [index % self.size for index in range(max(0, self.samples - self.size), self.samples)]
+        return {"ago_ns": [now_ns - self.times_ns[index] for index in indexes], "records": [self.records[index] for index in indexes]}
+
+    def set_state(self, state: Dict[str, Any], now_ns: int) -> None:
+        self.samples = 0
+        for ago_ns, records in list(zip(state.get("ago_ns", []), state.get("records", [])))[-self.size:]:
+            self.update(now_ns - ago_ns, records)
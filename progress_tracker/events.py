@@ -0,0 +1,96 @@
+import itertools
+import struct
+import threading
+from types import TracebackType
+from typing import Iterator, List, NamedTuple, Optional, Tuple, Type
+
+# The first bytes of an event log file. The last byte is the version of the format.
+MAGIC = b"PTEVLOG\x01"
+
+# Each event is (clock reading in nanoseconds, records_seen, mask), little-endian, 20 bytes.
+EVENT = struct.Struct("<qQI")
+
+# The low bits of a mask are the reasons for a report (see `REASON_BITS`). Events that aren't reports use these bits instead.
+# A mask of 0 is a sample of the progress (see `every_n_records`).
+START_EVENT = 1 << 16
+END_EVENT = 1 << 17
+TOTAL_EVENT = 1 << 18  # The `records_seen` of this event is the (new) total.
+REASONS_MASK = START_EVENT - 1
+
+
+class Event(NamedTuple):
+    timestamp_ns: int
+    records_seen: int
+    mask: int
+
+
+class EventLog(object):
+    # A compact, append-only binary log of a tracker's activity, for analysing (and replaying) a run after the fact.
+    #
+    # The tracker logs when it starts and completes, each report (with its reasons), changes to its total, and
+    # with `every_n_records`, a sample of its progress every n records (folded into the tracker's record thresholds,
+    # so it costs nothing per record). Events are buffered, and written out (as fixed-size records) every `buffer_events`
+    # events and when the tracker completes, so memory use is bounded.
+    #
+    # See `read_events` and `replay.replay`.
+    #
+    def __init__(self, path: str, every_n_records: Optional[int] = None, buffer_events: int = 4096) -> None:
+        if every_n_records is not None and every_n_records < 1:
+            raise ValueError("every_n_records must be at least 1.")
+        if buffer_events < 1:
+            raise ValueError("buffer_events must be at least 1.")
+        self.path = path
+        self.every_n_records = every_n_records
+        self.buffer_events = buffer_events
+        # Appending to a list is atomic, so events can be logged from more than one thread (ex. reports from a watchdog's
+        # thread) without taking a lock. Only writing them out takes the lock, and only removes the events that it wrote.
+        self.events: List[Tuple[int, int, int]] = []
+        self.lock = threading.Lock()
+        self.file = open(path, "ab", buffering=0)  # The events are already buffered.
+        if self.file.tell() == 0:
+            self.file.write(MAGIC)
+
+    def record(self, timestamp_ns: int, records_seen: int, mask: int) -> None:
+        events = self.events
+        events.append((timestamp_ns, records_seen, mask))
+        if len(events) >= self.buffer_events:
+            self.write_events()
+
+    def write_events(self) -> None:
+        with self.lock:
+            events = self.events
+            count = len(events)
+            if count:
+                # Packed all at once: the same bytes as packing each event with `EVENT`, since "<" formats have no padding.
+                data = memoryview(struct.pack("<" + "qQI" * count, *itertools.chain.from_iterable(events[:count])))
+                while data:
+                    data = data[self.file.write(data):]  # An unbuffered write can be partial.
+                del events[:count]
+
+    def flush(self) -> None:
+        self.write_events()
+
+    def close(self) -> None:
+        if not self.file.closed:
+            self.write_events()
+            self.file.close()
+
+    def __enter__(self) -> 'EventLog':
+        return self
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]) -> None:
+        self.close()
+
+
+def read_events(path: str, chunk_events: int = 4096) -> Iterator[Event]:
+    # Reads the events of a log, `chunk_events` at a time. A partly written last event (ex. after a crash) is ignored.
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError("{!r} is not an event log (or is from an unsupported version).".format(path))
+        while True:
+            chunk = file.read(EVENT.size * chunk_events)
+            chunk = chunk[:len(chunk) - len(chunk) % EVENT.size]
+            if not chunk:
+                return
+            for values in EVENT.iter_unpack(chunk):
+                yield Event(*values)
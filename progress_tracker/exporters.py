@@ -0,0 +1,225 @@
+import http.server
+import re
+import socket
+import socketserver
+import threading
+from types import TracebackType
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, TypeVar
+
+from progress_tracker.clock import seconds_to_ns
+from progress_tracker.progress_tracker import ProgressTracker
+from progress_tracker.report import Report
+from progress_tracker.watchdog import Watchdog
+
+E = TypeVar("E", bound="Exporter")
+
+# The characters of a tracker's name that can't be used in a StatsD metric name (which are replaced by "_").
+STATSD_UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]")
+
+# The metrics that are exported for each tracker: (name, Prometheus type, help, value of a report).
+# Values that are `None` (ex. `percent_complete` when the total isn't known) are left out.
+METRICS: List[Tuple[str, str, str, Callable[[Report], Any]]] = [
+    ("records_seen_total", "counter", "The number of records processed so far.",
+     lambda report: report["records_seen"]),
+    ("total_records", "gauge", "The total number of records to process.",
+     lambda report: report["total"]),
+    ("percent_complete", "gauge", "The percentage of records processed so far.",
+     lambda report: report["percent_complete"]),
+    ("items_per_second", "gauge", "The number of records processed per second, since processing started.",
+     lambda report: report["items_per_second"]),
+    ("estimated_seconds_remaining", "gauge", "The estimated number of seconds needed to process the rest of the records.",
+     lambda report: report["estimated_time_remaining"].total_seconds() if report["estimated_time_remaining"] is not None else None),
+    ("elapsed_seconds", "gauge", "The number of seconds since processing started.",
+     lambda report: report["time_taken"].total_seconds()),
+]
+
+# A (metric, tracker name, value) triple.
+Sample = Tuple[str, str, Any]
+
+
+class Exporter(object):
+    # Publishes the progress of any number of named trackers as metrics.
+    #
+    # The trackers are only read when the metrics are collected (using `ProgressTracker.snapshot`), so exporting
+    # costs nothing per record, and a tracker's reports and callbacks are unaffected.
+    #
+    def __init__(self, prefix: str = "progress_tracker") -> None:
+        self.prefix = prefix
+        self.trackers: Dict[str, 'ProgressTracker[Any]'] = {}
+        self.lock = threading.Lock()
+
+    def register(self, tracker: 'ProgressTracker[Any]', name: str = "default") -> 'ProgressTracker[Any]':
+        tracker.counts_observed = True
+        with self.lock:
+            self.trackers[name] = tracker
+        return tracker
+
+    def unregister(self, name: str = "default") -> None:
+        with self.lock:
+            del self.trackers[name]
+
+    def samples(self) -> List[Sample]:
+        with self.lock:
+            trackers = list(self.trackers.items())
+        samples = []
+        for name, tracker in trackers:
+            report = tracker.snapshot()
+            for metric, _, _, value_of in METRICS:
+                value = value_of(report)
+                if value is not None:
+                    samples.append((metric, name, value))
+        return samples
+
+    def start(self: E) -> E:
+        return self
+
+    def stop(self) -> None:
+        pass
+
+    def __enter__(self: E) -> E:
+        return self.start()
+
+    def __exit__(self, exc_type: Optional[Type[BaseException]], exc_val: Optional[BaseException], exc_tb: Optional[TracebackType]) -> None:
+        self.stop()
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class MetricsServer(socketserver.ThreadingMixIn, http.server.HTTPServer):
+    # `http.server.ThreadingHTTPServer` is only available in Python 3.7+.
+    daemon_threads = True
+    exporter: 'PrometheusExporter'
+
+
+class MetricsHandler(http.server.BaseHTTPRequestHandler):
+    server: MetricsServer
+
+    def do_GET(self) -> None:
+        if self.path.split("?")[0] not in ("/", "/metrics"):
+            self.send_error(404)
+            return
+        body = self.server.exporter.render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass  # Don't write every scrape to stderr.
+
+
+class PrometheusExporter(Exporter):
+    # Serves the metrics of the registered trackers at `http://host:port/metrics`, in the Prometheus text format.
+    # Each tracker's samples are labelled with `tracker="<name>"`. Use port 0 to pick a free port (see `address`).
+    def __init__(self, port: int = 0, host: str = "127.0.0.1", prefix: str = "progress_tracker") -> None:
+        super().__init__(prefix)
+        self.host = host
+        self.port = port
+        self.server: Optional[MetricsServer] = None
+        self.thread: Optional[threading.Thread] = None
+
+    def render(self) -> str:
+        samples_by_metric: Dict[str, List[Sample]] = {}
+        for sample in self.samples():
+            samples_by_metric.setdefault(sample[0], []).append(sample)
+        lines = []
+        for metric, metric_type, help, _ in METRICS:
+            samples = samples_by_metric.get(metric)
+            if not samples:
+                continue
+            full_name = self.prefix + "_" + metric
+            lines.append("# HELP {} {}".format(full_name, help))
+            lines.append("# TYPE {} {}".format(full_name, metric_type))
+            for _, name, value in samples:
+                lines.append('{}{{tracker="{}"}} {!r}'.format(full_name, escape_label_value(name), value))
+        return "".join(line + "\n" for line in lines)
+
+    @property
+    def address(self) -> Tuple[str, int]:
+        assert self.server is not None, "The exporter has not been started."
+        host, port = self.server.server_address[:2]
+        return str(host), int(port)
+
+    def start(self) -> 'PrometheusExporter':
+        if self.server is None:
+            self.server = MetricsServer((self.host, self.port), MetricsHandler)
+            self.server.exporter = self
+            self.thread = threading.Thread(target=self.server.serve_forever, name="progress_tracker-metrics", daemon=True)
+            self.thread.start()
+        return self
+
+    def stop(self) -> None:
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+            self.thread = None
+
+
+class StatsDExporter(Exporter):
+    # Sends the metrics of the registered trackers to a StatsD server every `interval` seconds, as gauges
+    # named `<prefix>.<tracker name>.<metric>`, where characters other than letters, digits, "_", "." and "-" in the
+    # tracker's name are replaced by "_". Sending is done from the watchdog's thread.
+    #
+    # Datagrams are kept under `max_packet_size` bytes. As is usual for StatsD, sending is fire-and-forget:
+    # failures are only counted in `send_errors`.
+    #
+    def __init__(self, host: str = "127.0.0.1", port: int = 8125, prefix: str = "progress_tracker",
+                 interval: float = 10, watchdog: Optional[Watchdog] = None, max_packet_size: int = 1432) -> None:
+        super().__init__(prefix)
+        self.address = (host, port)
+        self.interval_ns = seconds_to_ns(interval)
+        self.watchdog = watchdog if watchdog is not None else Watchdog.shared()
+        self.max_packet_size = max_packet_size
+        self.socket = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_DGRAM)
+        self.handle: Optional[int] = None
+        self.send_errors = 0
+
+    def lines(self) -> List[str]:
+        return [
+            "{}.{}.{}:{}|g".format(self.prefix, STATSD_UNSAFE_CHARACTERS.sub("_", name), metric, value)
+            for metric, name, value in self.samples()
+        ]
+
+    def packets(self) -> List[bytes]:
+        packets = []
+        packet = b""
+        for line in self.lines():
+            encoded = line.encode("utf-8")
+            if packet and len(packet) + 1 + len(encoded) > self.max_packet_size:
+                packets.append(packet)
+                packet = b""
+            packet = packet + b"\n" + encoded if packet else encoded
+        if packet:
+            packets.append(packet)
+        return packets
+
+    def flush(self) -> None:
+        for packet in self.packets():
+            try:
+                self.socket.sendto(packet, self.address)
+            except OSError:
+                self.send_errors += 1
+
+    def check(self, now_ns: int) -> Optional[int]:
+        self.flush()
+        return now_ns + self.interval_ns
+
+    def start(self) -> 'StatsDExporter':
+        if self.handle is None:
+            self.handle = self.watchdog.schedule(self.watchdog.clock() + self.interval_ns, self.check)
+        return self
+
+    def stop(self) -> None:
+        # Sends the final values.
+        if self.handle is not None:
+            self.watchdog.cancel(self.handle)
+            self.handle = None
+        self.flush()
+
+    def close(self) -> None:
+        self.stop()
+        self.socket.close()
@@ -0,0 +1,193 @@
+import codecs
+import io
+import itertools
+import mmap
+import os
+import stat
+from typing import Any, AbstractSet, BinaryIO, Dict, Iterator, Mapping, Optional, Tuple, Union, cast
+
+from progress_tracker.progress_tracker import EVERY_N_SECONDS_IDLE, REPORT_LAST_RECORD, ProgressTracker
+from progress_tracker.report import CompiledFormat, Report, compile_format
+
+LINES = "lines"
+CHUNKS = "chunks"
+MMAP = "mmap"
+
+MEGABYTE = 1000000
+
+# The formats used by `file_format_callback`, indexed by (whether to show the total, whether the tracker was idle).
+FILE_TOTAL_FORMAT = "{megabytes_seen}/{total_megabytes} MB ({percent_complete:.1f}%) in {time_taken} at {megabytes_per_second} MB/s (Time left: {estimated_time_remaining})"
+FILE_NO_TOTAL_FORMAT = "{megabytes_seen} MB in {time_taken} at {megabytes_per_second} MB/s"
+IDLE_FORMAT = " (After being idle for {idle_time})"
+FILE_FORMATS: Dict[Tuple[bool, bool], CompiledFormat] = {
+    (False, False): compile_format(FILE_NO_TOTAL_FORMAT),
+    (False, True): compile_format(FILE_NO_TOTAL_FORMAT + IDLE_FORMAT),
+    (True, False): compile_format(FILE_TOTAL_FORMAT),
+    (True, True): compile_format(FILE_TOTAL_FORMAT + IDLE_FORMAT),
+}
+
+
+def file_format_callback(report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+    show_total = report["total"] is not None and REPORT_LAST_RECORD not in reasons
+    return FILE_FORMATS[show_total, EVERY_N_SECONDS_IDLE in reasons].render(report)
+
+
+def remaining_size(file: Any) -> Optional[int]:
+    # The number of bytes between the current position of `file` and its end, if it's a regular (seekable) file.
+    try:
+        status = os.fstat(file.fileno())
+        if stat.S_ISREG(status.st_mode):
+            return max(0, status.st_size - int(file.tell()))
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    try:
+        if file.seekable():
+            position = file.tell()
+            end = file.seek(0, io.SEEK_END)
+            file.seek(position)
+            return max(0, int(end) - int(position))
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        pass
+    return None
+
+
+class FileProgressTracker(ProgressTracker[Any]):
+    # Tracks the progress of reading a file (or binary file object) in bytes.
+    #
+    # `total` is the size of the rest of the file. The file is read in blocks of `chunk_size` bytes, and the tracker
+    # advances once per block (after the block has been processed), never per line. Iterating over the tracker yields:
+    #   - LINES: lines (as `bytes`, or `str` when an `encoding` is given). Each block is split into lines by C code
+    #     (`io.BytesIO`/`io.StringIO`), and the blocks are chained together by `itertools.chain`, so there is no per-line Python work.
+    #   - CHUNKS: `bytes` chunks of up to `chunk_size` bytes.
+    #   - MMAP: lines (as `bytes`), split out of `chunk_size` blocks of a memory map of the file.
+    #
+    def __init__(self, file: Union[str, 'os.PathLike[str]', BinaryIO], mode: str = LINES, chunk_size: int = MEGABYTE,
+                 encoding: Optional[str] = None, errors: str = "strict", newline: Optional[str] = None, **kwargs: Any) -> None:
+        if mode not in (LINES, CHUNKS, MMAP):
+            raise ValueError("Unknown mode {!r}. Expected one of {!r}, {!r} or {!r}.".format(mode, LINES, CHUNKS, MMAP))
+        if encoding is not None and mode != LINES:
+            raise ValueError("Only lines can be decoded. Use mode={!r} with an `encoding`.".format(LINES))
+        if "weight" in kwargs:
+            raise TypeError("FileProgressTracker counts bytes, so it does not take a `weight`.")
+        kwargs.setdefault("format_callback", file_format_callback)
+
+        self.owns_file = isinstance(file, (str, bytes, os.PathLike))
+        self.file = cast(Any, open(cast(str, file), "rb", buffering=0) if self.owns_file else file)
+        self.start_position = self.file.tell() if self.file.seekable() else 0
+        if "total" not in kwargs:
+            kwargs["total"] = remaining_size(self.file)
+        super().__init__(None, **kwargs)
+
+        self.mode = mode
+        self.chunk_size = chunk_size
+        self.encoding = encoding
+        self.errors = errors
+        self.newline = newline
+        self.completed = False
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.mode == CHUNKS:
+            chunks = self.chunks()
+            return chunks if self.used_as_context_manager else self.iter_in_context(chunks)
+        blocks = self.line_blocks() if self.mode == LINES else self.mmap_line_blocks()
+        if not self.used_as_context_manager:
+            # The lines are chained by a C iterator, so it's the generator of blocks that runs in the tracker's context.
+            # When the lines are discarded before the end of the file (ex. the loop breaks, or raises), the generator
+            # is closed with them, which completes the tracker (and closes the file).
+            blocks = self.iter_in_context(blocks)
+        return itertools.chain.from_iterable(blocks)
+
+    def chunks(self) -> Iterator[bytes]:
+        read = self.file.read
+        chunk_size = self.chunk_size
+        while True:
+            chunk = read(chunk_size)
+            if not chunk:
+                return
+            yield chunk
+            self.advance(len(chunk))
+
+    def line_blocks(self) -> Iterator[Iterator[Any]]:
+        # Yields an iterator over the lines of each block. Blocks are cut after their last line break, and the rest is carried over to the next block.
+        read = self.file.read
+        chunk_size = self.chunk_size
+        decoder = codecs.getincrementaldecoder(self.encoding)(self.errors) if self.encoding is not None else None
+        pending: Any = b"" if decoder is None else ""
+        unread_bytes = 0  # Read, but not yet handed out as lines.
+        while True:
+            data = read(chunk_size)
+            if not data:
+                break
+            unread_bytes += len(data)
+            if decoder is None:
+                block = pending + data
+                cut = block.rfind(b"\n") + 1
+            else:
+                block = pending + decoder.decode(data)
+                cut = block.rfind("\n") + 1
+            if cut == 0:
+                pending = block
+                continue
+            pending = block[cut:]
+            yield self.split_lines(block[:cut])
+            # The partial line that is carried over to the next block is counted early, since the
+            # number of bytes it was decoded from isn't known. That's less than one line's worth.
+            self.advance(unread_bytes)
+            unread_bytes = 0
+        if decoder is not None:
+            pending += decoder.decode(b"", final=True)
+        if pending:
+            yield self.split_lines(pending)
+        if unread_bytes:
+            self.advance(unread_bytes)
+
+    def split_lines(self, block: Any) -> Iterator[Any]:
+        if isinstance(block, bytes):
+            return iter(io.BytesIO(block))
+        return iter(io.StringIO(block, newline=self.newline))
+
+    def mmap_line_blocks(self) -> Iterator[Iterator[bytes]]:
+        position = self.file.tell()
+        size = os.fstat(self.file.fileno()).st_size
+        if position < size:
+            with mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+                while position < size:
+                    # Blocks end at the first line break after `chunk_size` bytes, so lines are never split between blocks.
+                    end = memory.find(b"\n", min(position + self.chunk_size, size) - 1)
+                    end = size if end == -1 else end + 1
+                    yield iter(io.BytesIO(memory[position:end]))
+                    self.advance(end - position)
+                    position = end
+            self.file.seek(position)
+
+    def update_position(self) -> None:
+        # For when the file is read directly, rather than by iterating over the tracker: advances to the file's current position.
+        self.advance(self.file.tell() - self.start_position - self.records_seen)
+
+    def add_byte_values(self, report: Report) -> Report:
+        items_per_second = report["items_per_second"]
+        report["bytes_seen"] = report.records_seen
+        report["megabytes_seen"] = round(report.records_seen / MEGABYTE, 1)
+        report["total_megabytes"] = round(report.total / MEGABYTE, 1) if report.total is not None else None
+        report["megabytes_per_second"] = round(items_per_second / MEGABYTE, 1) if items_per_second is not None else None
+        return report
+
+    def create_report(self) -> Report:
+        return self.add_byte_values(super().create_report())
+
+    def snapshot(self) -> Report:
+        return self.add_byte_values(super().snapshot())
+
+    def complete(self) -> None:
+        if self.completed:
+            return
+        self.completed = True
+        try:
+            super().complete()
+        finally:
+            if self.owns_file:
+                self.file.close()
+
+
+def track_file(file: Union[str, 'os.PathLike[str]', BinaryIO], **kwargs: Any) -> FileProgressTracker:
+    return FileProgressTracker(file, **kwargs)
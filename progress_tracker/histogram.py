@@ -0,0 +1,84 @@
+import bisect
+import itertools
+import operator
+from array import array
+from typing import List, Optional, Sequence
+
+# Values below 2 ** PRECISION_BITS are counted exactly. Above that, each power of two is split into
+# 2 ** (PRECISION_BITS - 1) buckets, so a value's bucket is within ~3% of the value.
+PRECISION_BITS = 6
+HALF_SUB_BUCKETS = 1 << (PRECISION_BITS - 1)
+
+# One hour, in nanoseconds. Larger values are counted as this value.
+DEFAULT_HIGHEST_VALUE = 3600 * 1000000000
+
+
+def bucket_index(value: int) -> int:
+    bits = value.bit_length()
+    if bits <= PRECISION_BITS:
+        return value
+    shift = bits - PRECISION_BITS
+    return shift * HALF_SUB_BUCKETS + (value >> shift)
+
+
+def bucket_highest_value(index: int) -> int:
+    if index < 2 * HALF_SUB_BUCKETS:
+        return index
+    shift = index // HALF_SUB_BUCKETS - 1
+    return ((index - shift * HALF_SUB_BUCKETS + 1) << shift) - 1
+
+
+class LogHistogram(object):
+    # A fixed-size histogram of non-negative integers (ex. durations in nanoseconds), with logarithmically sized buckets (like an HDR histogram).
+    # Recording a value does not allocate, and quantiles are accurate to within the size of a bucket (~3%).
+    # Values larger than `highest_value` are counted in the last bucket.
+    def __init__(self, highest_value: int = DEFAULT_HIGHEST_VALUE) -> None:
+        self.highest_value = highest_value
+        self.counts = array("Q", bytes(8 * (bucket_index(highest_value) + 1)))
+        self.max = 0
+
+    def record(self, value: int) -> None:
+        # `bucket_index`, inlined since this is called for every record.
+        bits = value.bit_length()
+        if bits > PRECISION_BITS:
+            shift = bits - PRECISION_BITS
+            index = shift * HALF_SUB_BUCKETS + (value >> shift)
+        else:
+            index = value
+        try:
+            self.counts[index] += 1
+        except IndexError:  # Larger than `highest_value`
+            self.counts[-1] += 1
+        if value > self.max:
+            self.max = value
+
+    @property
+    def count(self) -> int:
+        return sum(self.counts)
+
+    def add(self, other: 'LogHistogram') -> None:
+        assert len(other.counts) == len(self.counts), "Can only add histograms with the same highest value."
+        self.counts = array("Q", map(operator.add, self.counts, other.counts))
+        self.max = max(self.max, other.max)
+
+    def reset(self) -> None:
+        self.counts = array("Q", bytes(8 * len(self.counts)))
+        self.max = 0
+
+    def quantiles(self, quantiles: Sequence[float]) -> List[Optional[int]]:
+        return quantiles_of(self.counts, self.max, quantiles)
+
+    def quantile(self, quantile: float) -> Optional[int]:
+        return self.quantiles([quantile])[0]
+
+
+def quantiles_of(counts: Sequence[int], maximum: int, quantiles: Sequence[float]) -> List[Optional[int]]:
+    # For each quantile, the (highest value in the bucket of the) value that the quantile of the recorded values are less than or equal to.
+    cumulative_counts = list(itertools.accumulate(counts))
+    count = cumulative_counts[-1]
+    if count == 0:
+        return [None] * len(quantiles)
+    return [
+        min(bucket_highest_value(bisect.bisect_left(cumulative_counts, max(1, quantile * count))), maximum)
+        for quantile in quantiles
+    ]
@@ -0,0 +1,136 @@
+import multiprocessing
+import multiprocessing.sharedctypes
+import threading
+from typing import AbstractSet, Any, List, Mapping, Optional, Tuple
+
+from progress_tracker.clock import ns_to_seconds, seconds_to_ns
+from progress_tracker.progress_tracker import ProgressTracker, default_format_callback
+from progress_tracker.report import Report
+
+# The counters of the workers of the current process (if it is a worker).
+worker_counter: Optional['WorkerCounter'] = None
+
+
+class WorkerCounter(object):
+    # A worker's slot in the shared array of counters. Only the worker writes to its slot, so no locking is needed.
+    def __init__(self, counters: Any, slot: int) -> None:
+        self.counters = counters
+        self.slot = slot
+
+    def update(self, n: int = 1) -> None:
+        self.counters[self.slot] += n
+
+
+def initialize_worker(counters: Any, next_slot: Any) -> None:
+    # Used as the `initializer` of a `multiprocessing.Pool` or `ProcessPoolExecutor`. Claims the next free slot for this process.
+    global worker_counter
+    with next_slot.get_lock():
+        slot = next_slot.value
+        next_slot.value += 1
+    if slot >= len(counters):
+        raise ValueError("More worker processes were started than the {} that the tracker has slots for.".format(len(counters)))
+    worker_counter = WorkerCounter(counters, slot)
+
+
+def update(n: int = 1) -> None:
+    # Records that the current worker process has processed `n` more records.
+    assert worker_counter is not None, "This process was not initialized as a worker using `MultiprocessProgressTracker.initializer`."
+    worker_counter.update(n)
+
+
+def per_worker_format_callback(report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+    # The default format, followed by the rate of each worker since the previous report (to help spot stragglers).
+    rates = ", ".join("{:.1f}/s".format(rate) if rate is not None else "?" for rate in report["worker_items_per_second"])
+    return "{} [Per worker: {}]".format(default_format_callback(report, reasons), rates)
+
+
+class MultiprocessProgressTracker(ProgressTracker[Any]):
+    # Tracks the combined progress of a number of worker processes.
+    #
+    # Each worker counts its records in its own slot of an array in shared memory. The parent process polls
+    # the array (from the watchdog's thread) and reports on the combined total, so workers never need to send messages.
+    #
+    def __init__(self, workers: int, poll_interval: float = 0.1, **kwargs: Any) -> None:
+        kwargs.setdefault("watchdog", True)
+        if kwargs["watchdog"] is False:
+            raise ValueError("MultiprocessProgressTracker polls its workers using a watchdog, so `watchdog` can not be False.")
+        super().__init__(None, **kwargs)
+        self.workers = workers
+        self.poll_interval_ns = seconds_to_ns(poll_interval)
+        self.counters = multiprocessing.sharedctypes.RawArray("Q", workers)
+        self.next_slot = multiprocessing.Value("i", 0)
+        self.poll_handle: Optional[int] = None
+        self.poll_lock = threading.Lock()
+        self.last_report_worker_records = [0] * workers
+        self.last_report_ns: Optional[int] = None
+
+    @property
+    def initializer(self) -> Any:
+        return initialize_worker
+
+    @property
+    def initargs(self) -> Tuple[Any, Any]:
+        return (self.counters, self.next_slot)
+
+    def worker(self, slot: int) -> WorkerCounter:
+        # For passing to a `multiprocessing.Process` directly, rather than using `initializer`.
+        return WorkerCounter(self.counters, slot)
+
+    def __enter__(self) -> 'MultiprocessProgressTracker':
+        super().__enter__()
+        self.last_report_ns = self.start_ns
+        self.advancing = True
+        self.start_timers()
+        assert self.watchdog is not None
+        self.poll_handle = self.watchdog.schedule(self.clock() + self.poll_interval_ns, self.poll)
+        return self
+
+    def poll(self, now_ns: int) -> Optional[int]:
+        # Called from the watchdog's thread.
+        if self.poll_handle is None:
+            return None
+        try:
+            self.collect()
+        except Exception as error:
+            self.watchdog_error = error
+            return None
+        return now_ns + self.poll_interval_ns
+
+    def collect(self) -> None:
+        with self.poll_lock:
+            self.advance(sum(self.counters[:]) - self.records_seen)
+
+    def complete(self) -> None:
+        if self.poll_handle is not None:
+            assert self.watchdog is not None
+            self.watchdog.cancel(self.poll_handle)
+            self.poll_handle = None
+        self.collect()
+        super().complete()
+        if self.watchdog_error is not None:
+            raise self.watchdog_error
+
+    def worker_records(self) -> List[int]:
+        return list(self.counters[:])
+
+    def create_report(self) -> Report:
+        report = super().create_report()
+        worker_records = self.worker_records()
+        now_ns = self.clock()
+        assert self.last_report_ns is not None
+        elapsed_seconds = ns_to_seconds(now_ns - self.last_report_ns)
+        report["worker_records"] = worker_records
+        report["worker_items_per_second"] = [
+            (records - last_records) / elapsed_seconds if elapsed_seconds != 0 else None
+            for records, last_records in zip(worker_records, self.last_report_worker_records)
+        ]
+        return report
+
+    def send_report(self, reasons_to_report: AbstractSet[str]) -> None:
+        super().send_report(reasons_to_report)
+        self.last_report_worker_records = self.worker_records()
+        self.last_report_ns = self.clock()
+
+
+def track_progress_of_workers(workers: int, **kwargs: Any) -> MultiprocessProgressTracker:
+    return MultiprocessProgressTracker(workers, **kwargs)
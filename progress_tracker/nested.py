@@ -0,0 +1,187 @@
+from typing import AbstractSet, Any, Iterable, Iterator, List, Mapping, Optional, Sized, TypeVar, cast
+
+from progress_tracker.progress_tracker import EVERY_N_SECONDS, EVERY_N_SECONDS_IDLE, EVERY_N_SECONDS_SINCE_REPORT, NEVER, ProgressTracker, default_format_callback, records_needed_for_percent
+from progress_tracker.report import Report
+
+T = TypeVar("T")
+
+
+def nested_format_callback(report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+    # The default format, followed by the progress of each active child.
+    parts = [default_format_callback(report, reasons)]
+    for child in report["children"]:
+        progress = "{}/{}".format(child["records_seen"], child["total"]) if child["total"] is not None else str(child["records_seen"])
+        parts.append("{}: {}".format(child["name"], progress) if child["name"] is not None else progress)
+    return " | ".join(parts)
+
+
+class NestedProgressTracker(ProgressTracker[T]):
+    # Tracks the combined progress of nested loops (ex. files -> records), creating a single stream of reports.
+    #
+    # The inner loops are tracked by children (see `child()`), which don't report themselves. Each child has a share of
+    # the parent's total (1 by default), and adds its progress to the parent as it goes, in proportion to its share.
+    # When iterating over the parent, each item of the iterable has a share of 1 (so the parent's total is its length).
+    #
+    # Internally, the parent counts `resolution` records per share, so that the record-based conditions
+    # (ex. `every_n_percent`) can be met part way through a child. Reports are in shares.
+    #
+    # The time-based conditions are checked by a watchdog by default, since the parent only sees the children's progress in steps.
+    #
+    # Children are pooled: a completed child is reset and handed out again, so creating one doesn't allocate anything.
+    # Children must be used from the thread that uses the parent, and must not be used after they've completed.
+    #
+    def __init__(self, iterable: Optional[Iterable[T]] = None, resolution: int = 1000, **kwargs: Any) -> None:
+        if "weight" in kwargs:
+            raise TypeError("NestedProgressTracker does not take a `weight`. Use the `share` of each child instead.")
+        kwargs.setdefault("format_callback", nested_format_callback)
+        if any(kwargs.get(condition) is not None for condition in (EVERY_N_SECONDS, EVERY_N_SECONDS_IDLE, EVERY_N_SECONDS_SINCE_REPORT)):
+            kwargs.setdefault("watchdog", True)
+        if kwargs.get("every_n_records") is not None:
+            kwargs["every_n_records"] *= resolution
+        super().__init__(iterable, **kwargs)
+        self.resolution = resolution
+        self.total_shares = self.total
+        if self.total is not None:
+            self.total *= resolution
+            if self.every_n_percent is not None:
+                self.next_percent_record = records_needed_for_percent(self.every_n_percent, self.total)
+                self.update_next_check()
+        self.active_children: List['ChildProgressTracker'] = []
+        self.child_pool: List['ChildProgressTracker'] = []
+        self.counts_observed = True  # The children's progress is added with `advance()`, so the parent is never a pass-through.
+
+    def __iter__(self) -> Iterator[T]:
+        if self.iterable is None:
+            raise TypeError("This tracker was not given an iterable. Use `child()` or `advance()` to record progress instead.")
+        items = self.iter_items(self.iterable)
+        if self.used_as_context_manager:
+            return items
+        return self.iter_in_context(items)
+
+    def iter_items(self, items: Iterable[T]) -> Iterator[T]:
+        # Once an item has been processed, any of its share that its children didn't add (ex. when it had no children) is added.
+        resolution = self.resolution
+        done = self.records_seen
+        for item in items:
+            done += resolution
+            yield item  # Process item
+            if self.records_seen < done:
+                self.advance(done - self.records_seen)
+
+    def child(self, iterable: Optional[Iterable[Any]] = None, total: Optional[int] = None, share: float = 1, name: Optional[str] = None) -> 'ChildProgressTracker':
+        # A tracker for an inner loop. Iterate over it, or use it as a context manager and call `advance()`.
+        child = self.child_pool.pop() if self.child_pool else ChildProgressTracker(self)
+        child.reset(iterable, total, int(share * self.resolution), name)
+        if not self.is_pass_through():  # When tracking is disabled, iterating over a child doesn't complete it, so it's never pooled.
+            self.active_children.append(child)
+        return child
+
+    def release(self, child: 'ChildProgressTracker') -> None:
+        if child in self.active_children:
+            self.active_children.remove(child)
+            self.child_pool.append(child)
+
+    def add_share_values(self, report: Report) -> Report:
+        resolution = self.resolution
+        items_per_second = report["items_per_second"]
+        smoothed_items_per_second = report["smoothed_items_per_second"]
+        report["records_seen"] = round(report.records_seen / resolution, 2)
+        report["total"] = self.total_shares
+        report["items_per_second"] = items_per_second / resolution if items_per_second is not None else None
+        report["smoothed_items_per_second"] = smoothed_items_per_second / resolution if smoothed_items_per_second is not None else None
+        report["children"] = [child.snapshot() for child in list(self.active_children)]
+        return report
+
+    def create_report(self) -> Report:
+        return self.add_share_values(super().create_report())
+
+    def snapshot(self) -> Report:
+        return self.add_share_values(super().snapshot())
+
+
+class ChildProgressTracker(ProgressTracker[Any]):
+    # Tracks an inner loop of a `NestedProgressTracker` (see `NestedProgressTracker.child`). Only created by the parent.
+    #
+    # A child has no conditions of its own. Its progress is added to the parent's when it completes, and part way through
+    # whenever the parent would meet a record-based condition (using the same record threshold as the other conditions,
+    # so this costs nothing per record). Children with no total only add their progress when they complete.
+    #
+    def __init__(self, parent: NestedProgressTracker[Any]) -> None:
+        self.next_parent_record = NEVER
+        super().__init__(None, callback=lambda message: None, clock=parent.clock)
+        self.parent = parent
+        self.name: Optional[str] = None
+        self.share_units = 0
+        self.units_added = 0
+        self.counts_observed = True  # The parent reports on the child's progress.
+
+    def reset(self, iterable: Optional[Iterable[Any]], total: Optional[int], share_units: int, name: Optional[str]) -> None:
+        self.iterable = iterable
+        self.total = total
+        if iterable is not None:
+            try:
+                self.total = len(cast(Sized, iterable))
+            except TypeError:
+                pass
+        self.name = name
+        self.share_units = share_units
+        self.units_added = 0
+        self.records_seen = self.records_done = 0
+        self.reported_at_record = -1
+        self.used_as_context_manager = self.advancing = self.iteration_finished = self.failed = False
+        self.start_ns = self.end_ns = None
+        self.schedule_roll_up()
+
+    def update_next_check(self) -> None:
+        super().update_next_check()
+        self.next_other_check_at = min(self.next_other_check_at, self.next_parent_record)
+        self.next_check_at = min(self.next_check_at, self.next_parent_record)
+
+    def schedule_roll_up(self) -> None:
+        # The child next adds its progress when that would be enough for the parent to meet one of its record-based conditions.
+        # (So a child that is small compared to the parent only adds its progress once, when it completes).
+        units_needed = self.units_added + self.parent.next_check_at - self.parent.records_seen
+        if not self.total or units_needed > self.share_units:
+            self.next_parent_record = NEVER
+        else:
+            self.next_parent_record = -(-units_needed * self.total // self.share_units)
+        self.update_next_check()
+
+    def check_record_thresholds(self, records_seen: int) -> int:
+        mask = super().check_record_thresholds(records_seen)
+        if records_seen >= self.next_parent_record:
+            self.roll_up(records_seen)
+            self.schedule_roll_up()
+        return mask
+
+    def roll_up(self, records_seen: int) -> None:
+        if not self.total:
+            return
+        units = self.share_units * min(records_seen, self.total) // self.total
+        if units > self.units_added:
+            self.parent.advance(units - self.units_added)
+            self.units_added = units
+
+    def start(self) -> None:
+        self.start_ns = self.clock()
+
+    def complete(self) -> None:
+        if self.end_ns is not None:
+            return
+        self.end_ns = self.clock()
+        self.advancing = False
+        self.parent.release(self)  # First, so that the parent's reports no longer include the child.
+        if self.failed:
+            self.roll_up(self.records_seen)  # Only the records that were processed.
+        elif self.units_added < self.share_units:
+            self.parent.advance(self.share_units - self.units_added)
+            self.units_added = self.share_units
+
+    def snapshot(self) -> Report:
+        report = super().snapshot()
+        report["name"] = self.name
+        return report
+
+
+def track_nested(iterable: Optional[Iterable[T]] = None, **kwargs: Any) -> NestedProgressTracker[T]:
+    return NestedProgressTracker(iterable, **kwargs)
@@ -0,0 +1,113 @@
+from typing import AbstractSet, Any, Dict, Iterable, Iterator, List, Mapping
+
+from progress_tracker.clock import ns_to_seconds
+from progress_tracker.progress_tracker import ProgressTracker, default_format_callback
+from progress_tracker.report import Report
+
+
+def pipeline_format_callback(report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+    # The default format, followed by the share of the time taken by each stage, and the bottleneck.
+    shares = ", ".join("{}: {:.1f}%".format(stage["name"], stage["time_share"]) for stage in report["stages"])
+    return "{} [{}; Bottleneck: {}]".format(default_format_callback(report, reasons), shares, report["bottleneck"])
+
+
+class Stage(object):
+    # The time spent by one stage of a pipeline, as seen from the point where its output is handed to the next stage.
+    __slots__ = ("name", "records", "upstream_ns", "downstream_ns")
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.records = 0
+        self.upstream_ns = 0  # Time spent waiting for the next record: this stage's own time, plus the time of the stages before it.
+        self.downstream_ns = 0  # Time spent waiting for the rest of the pipeline to take the next record.
+
+
+class PipelineProgressTracker(ProgressTracker[Any]):
+    # Tracks a chain of generators (ex. read -> parse -> enrich -> loop body), and attributes the time taken to each stage.
+    #
+    # `stage(name, iterable)` is inserted between stages, after the stage that produced `iterable`. It times how long each
+    # `next()` takes (the time spent in this stage and the ones before it) and how long it takes for the next `next()` to
+    # come (the time spent in the stages after it). The difference between adjacent stages is the time spent in each stage.
+    # The progress (and the conditions) are tracked by the last stage, which is the one that the loop iterates over.
+    #
+    # Timing costs two clock readings per record per stage, so stages should be coarse (not every generator in a long chain).
+    #
+    def __init__(self, consumer_name: str = "loop", **kwargs: Any) -> None:
+        if "weight" in kwargs:
+            raise TypeError("PipelineProgressTracker does not take a `weight`.")
+        kwargs.setdefault("format_callback", pipeline_format_callback)
+        super().__init__(None, **kwargs)
+        self.consumer_name = consumer_name
+        self.stages: List[Stage] = []
+        self.counts_observed = True  # The stages are timed even when there's nothing to report.
+
+    def __iter__(self) -> Iterator[Any]:
+        if self.iterable is None:
+            raise TypeError("Iterate over the last stage of the pipeline (see `stage()`), rather than over the tracker.")
+        return super().__iter__()
+
+    def stage(self, name: str, iterable: Iterable[Any]) -> Iterator[Any]:
+        if self.is_pass_through():  # Tracking is disabled.
+            return iter(iterable)
+        stage = Stage(name)
+        self.stages.append(stage)
+        return self.probe(stage, iterable)
+
+    def probe(self, stage: Stage, iterable: Iterable[Any]) -> Iterator[Any]:
+        records = self.time_stage(stage, iterable)
+        if stage is self.stages[-1]:
+            # Stages are started from the last one, so the last stage is known by the time that any of them run.
+            self.iterable = records
+            records = super().__iter__()
+        yield from records
+
+    def time_stage(self, stage: Stage, iterable: Iterable[Any]) -> Iterator[Any]:
+        clock = self.clock
+        waiting_since_ns = clock()
+        for record in iterable:
+            received_ns = clock()
+            stage.upstream_ns += received_ns - waiting_since_ns
+            stage.records += 1
+            yield record
+            waiting_since_ns = clock()
+            stage.downstream_ns += waiting_since_ns - received_ns
+        stage.upstream_ns += clock() - waiting_since_ns  # Waiting to find out that there are no more records.
+
+    def stage_values(self) -> List[Dict[str, Any]]:
+        # Each stage's own time is the time spent waiting for its records, less the time that the stage before it spent waiting.
+        stages = list(self.stages)
+        if not stages:
+            return []
+        names = [stage.name for stage in stages] + [self.consumer_name]
+        records = [stage.records for stage in stages] + [stages[-1].records]
+        upstream_ns = [0] + [stage.upstream_ns for stage in stages]
+        downstream_ns = [stage.downstream_ns for stage in stages] + [0]
+        own_ns = [upstream_ns[index + 1] - upstream_ns[index] for index in range(len(stages))] + [stages[-1].downstream_ns]
+        total_ns = stages[-1].upstream_ns + stages[-1].downstream_ns
+        values = []
+        for index, name in enumerate(names):
+            values.append({
+                "name": name,
+                "records": records[index],
+                "items_per_second": records[index] / ns_to_seconds(own_ns[index]) if own_ns[index] > 0 else None,
+                "time_share": own_ns[index] * 100 / total_ns if total_ns > 0 else 0.0,
+                "waiting_upstream": upstream_ns[index] * 100 / total_ns if total_ns > 0 else 0.0,
+                "waiting_downstream": downstream_ns[index] * 100 / total_ns if total_ns > 0 else 0.0,
+            })
+        return values
+
+    def add_stage_values(self, report: Report) -> Report:
+        stages = self.stage_values()
+        report["stages"] = stages
+        report["bottleneck"] = max(stages, key=lambda stage: stage["time_share"])["name"] if stages else None
+        return report
+
+    def create_report(self) -> Report:
+        return self.add_stage_values(super().create_report())
+
+    def snapshot(self) -> Report:
+        return self.add_stage_values(super().snapshot())
+
+
+def track_pipeline(consumer_name: str = "loop", **kwargs: Any) -> PipelineProgressTracker:
+    return PipelineProgressTracker(consumer_name, **kwargs)
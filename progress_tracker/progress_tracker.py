@@ -1,8 +1,22 @@
+import itertools
+import math
+import os
+import sys
+import threading
 import warnings
 from datetime import datetime, timedelta
 
+from progress_tracker.checkpoint import Checkpoint
+from progress_tracker.clock import Clock, default_clock, ns_to_timedelta, seconds_to_ns
+from progress_tracker.estimators import CumulativeRate, RateEstimator
+from progress_tracker.events import END_EVENT, START_EVENT, TOTAL_EVENT, EventLog
+from progress_tracker.histogram import LogHistogram
+from progress_tracker.report import CompiledFormat, Report, compile_format, snapshot_latencies
+from progress_tracker.sinks import BackgroundSink
 from progress_tracker.timeout import Timeout
-from typing import Any, Callable, Dict, Generic, Iterable, Optional, Set, Sized, Type, TypeVar, cast
+from progress_tracker.totals import TotalEstimator
+from progress_tracker.watchdog import Watchdog
+from typing import AbstractSet, Any, Callable, Dict, FrozenSet, Generic, Iterable, Iterator, Mapping, Optional, Sized, Tuple, Type, TypeVar, Union, cast
 from types import TracebackType
 
 T = TypeVar("T")
@@ -15,16 +29,106 @@ EVERY_N_SECONDS_SINCE_REPORT = "every_n_seconds_since_report"
 REPORT_FIRST_RECORD = "report_first_record"
 REPORT_LAST_RECORD = "report_last_record"
 
-
-def default_format_callback(report: Dict[str, Any], reasons: Set[str]) -> str:
-    total = report["total"]
-    idle_message = " (After being idle for {idle_time})" if "every_n_seconds_idle" in reasons else ""
-    if total is None or REPORT_LAST_RECORD in reasons:
-        format_string = "{records_seen} in {time_taken}" + idle_message
-    else:
-        format_string = "{records_seen}/{total} ({percent_complete}%) in {time_taken} (Time left: {estimated_time_remaining})" + idle_message
-
-    return format_string.format(**report)
+# Each reason also has a bit, so that the reasons for a report can be accumulated into an int
+# and then mapped onto a shared, pre-built frozenset (rather than building a new set per record).
+REASON_BITS = {
+    REPORT_FIRST_RECORD: 1 << 0,
+    EVERY_N_SECONDS_IDLE: 1 << 1,
+    EVERY_N_SECONDS_SINCE_REPORT: 1 << 2,
+    EVERY_N_SECONDS: 1 << 3,
+    EVERY_N_PERCENT: 1 << 4,
+    EVERY_N_RECORDS: 1 << 5,
+    REPORT_LAST_RECORD: 1 << 6,
+}
+
+REASONS_BY_MASK: Tuple[FrozenSet[str], ...] = tuple(
+    frozenset(reason for reason, bit in REASON_BITS.items() if mask & bit)
+    for mask in range(1 << len(REASON_BITS))
+)
+
+NO_REASONS: FrozenSet[str] = REASONS_BY_MASK[0]
+
+# Record count used for thresholds that will never be reached.
+NEVER = sys.maxsize
+
+# Trackers can be turned into pass-throughs (that don't track or report anything) for production builds,
+# by setting the PROGRESS_TRACKER_DISABLED environment variable to anything but "" or "0", or by calling `disable()`.
+enabled = os.environ.get("PROGRESS_TRACKER_DISABLED", "") in ("", "0")
+
+# How many times per `every_n_seconds_idle` the watchdog checks whether the tracker is idle.
+IDLE_CHECKS_PER_TIMEOUT = 10
+
+
+def disable() -> None:
+    global enabled
+    enabled = False
+
+
+def enable() -> None:
+    global enabled
+    enabled = True
+
+
+def reasons_from_mask(mask: int) -> FrozenSet[str]:
+    return REASONS_BY_MASK[mask]
+
+
+def mask_from_reasons(reasons: AbstractSet[str]) -> int:
+    mask = 0
+    for reason in reasons:
+        mask |= REASON_BITS[reason]
+    return mask
+
+
+def records_needed_for_percent(percent: float, total: int) -> int:
+    # The smallest record count for which `(records_seen / total) * 100 >= percent`.
+    # The result is nudged until it agrees exactly with the float comparison done by `create_report`.
+    if total <= 0:
+        return NEVER
+    count = max(0, math.ceil(percent * total / 100))
+    while count > 0 and ((count - 1) / total) * 100 >= percent:
+        count -= 1
+    while (count / total) * 100 < percent:
+        count += 1
+    return count
+
+
+# The formats used by `default_format_callback`, indexed by (whether to show the total, whether the tracker was idle).
+TOTAL_FORMAT = "{records_seen}/{total} ({percent_complete}%) in {time_taken} (Time left: {estimated_time_remaining})"
+NO_TOTAL_FORMAT = "{records_seen} in {time_taken}"
+IDLE_FORMAT = " (After being idle for {idle_time})"
+DEFAULT_FORMATS: Dict[Tuple[bool, bool], CompiledFormat] = {
+    (False, False): compile_format(NO_TOTAL_FORMAT),
+    (False, True): compile_format(NO_TOTAL_FORMAT + IDLE_FORMAT),
+    (True, False): compile_format(TOTAL_FORMAT),
+    (True, True): compile_format(TOTAL_FORMAT + IDLE_FORMAT),
+}
+# The same, for when the total is an estimate (see `total_estimator`).
+ESTIMATED_TOTAL_FORMAT = TOTAL_FORMAT.replace("/{total}", "/~{total}")
+ESTIMATED_FORMATS: Dict[Tuple[bool, bool], CompiledFormat] = {
+    (False, False): DEFAULT_FORMATS[False, False],
+    (False, True): DEFAULT_FORMATS[False, True],
+    (True, False): compile_format(ESTIMATED_TOTAL_FORMAT),
+    (True, True): compile_format(ESTIMATED_TOTAL_FORMAT + IDLE_FORMAT),
+}
+# The default formats, rewritten over `Report.slot_values` (see `CompiledFormat`).
+DEFAULT_SLOT_TEMPLATES = {key: format.slot_template for key, format in DEFAULT_FORMATS.items()}
+
+
+def default_format_callback(report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+    if type(report) is Report and not report.overridden:
+        # Straight from the slots (as `CompiledFormat.render` would), since this is called for every report.
+        show_total = report.total is not None and REPORT_LAST_RECORD not in reasons
+        return DEFAULT_SLOT_TEMPLATES[show_total, EVERY_N_SECONDS_IDLE in reasons].format(*report.slot_values())
+    show_total = report["total"] is not None and REPORT_LAST_RECORD not in reasons
+    return DEFAULT_FORMATS[show_total, EVERY_N_SECONDS_IDLE in reasons].render(report)
+
+
+def estimated_format_callback(report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+    # The default format, with a "~" before the total while it's an estimate. The default for trackers with a `total_estimator`.
+    show_total = report["total"] is not None and REPORT_LAST_RECORD not in reasons
+    formats = ESTIMATED_FORMATS if report["estimated"] else DEFAULT_FORMATS
+    return formats[show_total, EVERY_N_SECONDS_IDLE in reasons].render(report)
 
 
 class ProgressTracker(Generic[T]):
@@ -34,36 +138,61 @@ class ProgressTracker(Generic[T]):
     # For example, you often want to print out your processing progress every x percent of completion, but also every y seconds.
     # This class allows you to not have to do all of this tracking in your code. It will call its callback function with a formatted string.
     #
-    def __init__(self, iterable: Iterable[T],
+    def __init__(self, iterable: Optional[Iterable[T]] = None,
                  total: Optional[int] = None,
                  callback: Callable[[str], Any] = print,
-                 format_callback: Callable[[Dict[str, Any], Set[str]], str] = default_format_callback,
+                 format_callback: Callable[[Mapping[str, Any], AbstractSet[str]], str] = default_format_callback,
                  every_n_percent: Optional[float] = None,
                  every_n_records: Optional[int] = None,
                  every_n_seconds: Optional[float] = None,
                  every_n_seconds_idle: Optional[float] = None,
                  every_n_seconds_since_report: Optional[float] = None,
                  report_first_record: bool = False,
-                 report_last_record: bool = False) -> None:
+                 report_last_record: bool = False,
+                 clock: Clock = default_clock,
+                 watchdog: Union[bool, Watchdog] = False,
+                 weight: Optional[Callable[[T], int]] = None,
+                 sink: Optional[BackgroundSink] = None,
+                 rate_estimator: Optional[RateEstimator] = None,
+                 track_latency: bool = False,
+                 checkpoint: Optional[Checkpoint] = None,
+                 sample_tolerance: Optional[float] = None,
+                 total_estimator: Optional[TotalEstimator] = None,
+                 event_log: Optional[EventLog] = None) -> None:
 
         self.iterable = iterable
+        self.weight = weight
 
         self.used_as_context_manager = False
+        self.advancing = False
 
-        self.total: Optional[int]
-        try:
-            self.total = len(cast(Sized, self.iterable))
-        except TypeError:
-            self.total = None
+        self.total: Optional[int] = None
+        if weight is None:  # When records are weighted, the length of the iterable is not the total.
+            try:
+                self.total = len(cast(Sized, self.iterable))
+            except TypeError:
+                pass
 
         if self.total is None and total is not None:
             self.total = total
 
-        if self.total is None and every_n_percent is not None:
+        # Without a total, the total can be estimated (and refined as records are seen). Reports then say that it's `estimated`.
+        self.total_estimator = total_estimator if self.total is None else None
+        self.total_estimated = self.total_estimator is not None
+        if self.total_estimator is not None and format_callback is default_format_callback:
+            format_callback = estimated_format_callback
+
+        if self.total is None and every_n_percent is not None and self.total_estimator is None:
             warnings.warn("Asked to report 'every_n_percent', but total length is not available.", RuntimeWarning)
 
         self.callback = callback
         self.format_callback = format_callback
+        self.sink = sink
+        self.rate_estimator = rate_estimator if rate_estimator is not None else CumulativeRate()
+
+        # The time taken to process each record is recorded in `interval_latencies`, which is added to `latencies` (and reset) after each report.
+        self.latencies: Optional[LogHistogram] = LogHistogram() if track_latency else None
+        self.interval_latencies: Optional[LogHistogram] = LogHistogram() if track_latency else None
 
         self.every_n_percent = every_n_percent
         self.next_percent = every_n_percent
@@ -71,126 +200,605 @@ class ProgressTracker(Generic[T]):
         self.every_n_records = every_n_records
         self.next_record_count = every_n_records
 
-        self.timeout = Timeout(timedelta(seconds=every_n_seconds)) if every_n_seconds is not None else None
-        self.idle_timeout = Timeout(timedelta(seconds=every_n_seconds_idle)) if every_n_seconds_idle is not None else None
-        self.last_report_timeout = Timeout(timedelta(seconds=every_n_seconds_since_report)) if every_n_seconds_since_report is not None else None
+        self.watchdog: Optional[Watchdog] = None
+        if watchdog is True:
+            self.watchdog = Watchdog.shared()
+        elif isinstance(watchdog, Watchdog):
+            self.watchdog = watchdog
+        if self.watchdog is not None:
+            if clock is not default_clock and clock is not self.watchdog.clock:
+                raise ValueError("A tracker that uses a watchdog must use the same clock as the watchdog.")
+            clock = self.watchdog.clock
+
+        self.clock = clock
+        self.timeout = Timeout(seconds_to_ns(every_n_seconds), clock) if every_n_seconds is not None else None
+        self.idle_timeout = Timeout(seconds_to_ns(every_n_seconds_idle), clock) if every_n_seconds_idle is not None else None
+        self.last_report_timeout = Timeout(seconds_to_ns(every_n_seconds_since_report), clock) if every_n_seconds_since_report is not None else None
 
         self.report_first_record = report_first_record
         self.report_last_record = report_last_record
 
+        # `start_time` and `end_time` are wall-clock labels. All durations are measured using `clock`.
         self.start_time: Optional[datetime] = None
         self.end_time: Optional[datetime] = None
         self.total_time: Optional[timedelta] = None
+        self.start_ns: Optional[int] = None
+        self.end_ns: Optional[int] = None
 
         self.records_seen = 0
         self.reports_raised = 0
-        self.report_raised_this_record = False
-
-    def __iter__(self) -> Iterable[T]:
-        def iter_helper() -> Iterable[T]:
-            if self.timeout is not None:
-                self.timeout.reset()
-            if self.idle_timeout is not None:
-                self.idle_timeout.reset()
-
-            for record in self.iterable:
-                if self.idle_timeout is not None and self.idle_timeout.is_overdue():
-                    # Pause elapsed time here. Report will want this value.
-                    self.idle_timeout.stop()
-
-                self.records_seen += 1
-                self.report_raised_this_record = False
-                yield record  # Process record
-
-                reasons_to_report = self.should_report()
-                if reasons_to_report:
-                    self.raise_report(reasons_to_report)
-
-                if self.idle_timeout is not None:
-                    self.idle_timeout.reset()
+        self.reported_at_record = -1
+        self.report_lock = threading.Lock()
+
+        # State used when the time-based conditions are checked by a watchdog thread, rather than on every record.
+        self.records_done = 0  # The number of records that have finished being processed (and been reported on).
+        self.idle_observed_records_done = 0
+        self.idle_reported = False
+        self.deferred_mask = 0  # Time-based reasons that are left for the next report raised by the loop (see `offer_time_report`).
+        self.watchdog_handle: Optional[int] = None
+        self.watchdog_error: Optional[BaseException] = None
+
+        # The record-based conditions are compiled down to integer record counts, so that the
+        # per-record check is a single comparison against `next_check_at`.
+        # The clock only needs to be consulted on every record if a time-based condition is configured.
+        self.has_time_conditions = self.timeout is not None or self.idle_timeout is not None or self.last_report_timeout is not None
+        self.check_clock = self.has_time_conditions and self.watchdog is None
+
+        # With a `sample_tolerance`, the clock is only read every `sample_step` records instead. The step is chosen from the
+        # observed rate, so that the time-based conditions are met at most (roughly) `sample_tolerance` seconds late.
+        self.sampling = sample_tolerance is not None and self.check_clock
+        if self.sampling and self.idle_timeout is not None:
+            raise ValueError("Idleness can't be detected by sampling the clock. Use `watchdog=True` instead of `sample_tolerance`.")
+        self.sample_tolerance_ns = seconds_to_ns(sample_tolerance) if sample_tolerance is not None else 0
+        self.sample_step = 1
+        self.last_sample_ns = 0
+        self.last_sample_records = 0
+        self.next_sample_record = NEVER
+        if self.sampling:
+            self.check_clock = False
+        self.next_first_record = 1 if report_first_record else NEVER
+        self.next_percent_record = NEVER
+        if self.total is not None and every_n_percent is not None:
+            self.next_percent_record = records_needed_for_percent(every_n_percent, self.total)
+        self.next_records_record = every_n_records if every_n_records is not None else NEVER
+        self.next_checkpoint_record = NEVER
+        self.event_log = event_log
+        self.next_log_record = NEVER
+        if event_log is not None and event_log.every_n_records is not None:
+            self.next_log_record = event_log.every_n_records
+        self.next_estimate_record = NEVER
+        self.next_check_at = NEVER
+        if self.total_estimator is not None:
+            self.estimate_total(0)
+        self.update_next_check()
+
+        # When resuming from a checkpoint, the records that were already processed are skipped.
+        if checkpoint is not None and weight is not None:
+            raise ValueError("Weighted records can't be resumed from a `checkpoint`, since the weighted count doesn't say how many records to skip.")
+        self.checkpoint = checkpoint
+        self.checkpoint_due = False  # Saved after the report for the same record (if any), so that the saved `reports_raised` includes it.
+        self.resumed_records = 0
+        self.records_to_skip = 0
+        self.iteration_finished = False
+        self.failed = False
+
+        # Set when something other than reports reads the tracker's counts (ex. an exporter), so it can't be a pass-through.
+        self.counts_observed = False
+
+    def is_pass_through(self) -> bool:
+        # Whether iterating can skip tracking altogether (and hand out the underlying iterator), since there's nothing to report.
+        if not enabled:
+            return True
+        if self.used_as_context_manager or self.counts_observed:
+            return False
+        nothing_to_report = self.next_check_at == NEVER and not self.has_time_conditions and not self.report_last_record
+        return nothing_to_report and self.weight is None and self.latencies is None and self.checkpoint is None and self.event_log is None
+
+    @property
+    def report_raised_this_record(self) -> bool:
+        return self.reported_at_record == self.records_seen
+
+    def update_next_check(self) -> None:
+        # The `every_n_records` threshold is kept apart from the others, since it's the one that moves on every report when
+        # reporting often, and `should_report` can then skip the rest.
+        self.next_other_check_at = min(self.next_first_record, self.next_percent_record, self.next_checkpoint_record, self.next_sample_record, self.next_estimate_record, self.next_log_record)
+        self.next_check_at = min(self.next_other_check_at, self.next_records_record)
+
+    def set_total(self, total: int) -> None:
+        # Changes the total part way through (ex. when it's estimated), keeping the percentage-based condition in step.
+        self.total = total
+        if self.every_n_percent is not None:
+            self.next_percent_record = records_needed_for_percent(self.next_percent, total)
+        self.update_next_check()
+        if self.event_log is not None and self.start_ns is not None:
+            self.event_log.record(self.clock(), total, TOTAL_EVENT)
+
+    def estimate_total(self, records_seen: int) -> None:
+        # Refines the estimated total. It's re-estimated after roughly another 1% of the estimated total has been seen
+        # (or, while there's no estimate, each time that the number of records seen doubles), so this is cheap.
+        assert self.total_estimator is not None
+        estimate = self.total_estimator(records_seen)
+        if estimate is not None:
+            estimate = max(estimate, records_seen)
+            if estimate != self.total:
+                self.set_total(estimate)
+        if not self.total:
+            self.next_estimate_record = max(1, 2 * records_seen)
+        elif self.total > records_seen:
+            # Also as soon as the estimate is passed.
+            self.next_estimate_record = min(records_seen + max(1, self.total // 100), self.total + 1)
+        else:
+            # The estimate has been passed (so it was raised to the records seen). Until the estimator catches up, it's
+            # re-estimated after another 1% of the records seen, rather than on every record.
+            self.next_estimate_record = records_seen + max(1, records_seen // 100)
+
+    def __iter__(self) -> Iterator[T]:
+        if self.iterable is None:
+            raise TypeError("This tracker was not given an iterable. Use `advance()` to record progress instead.")
+        iterable = self.iterable
+
+        def iter_helper() -> Iterator[T]:
+            records = iterable
+            records_to_skip = self.take_records_to_skip()
+            if records_to_skip:
+                records = itertools.islice(records, records_to_skip, None)
+            self.start_timers()
+            check_clock = self.check_clock
+            weight = self.weight
+            report: Callable[[AbstractSet[str]], Any] = self.raise_report
+            # When using a watchdog, the per-record loop never reads the clock. It only records when each record is done, so that idleness can be detected.
+            idle_timeout = None
+            track_records_done = False
+            if self.watchdog is None:
+                idle_timeout = self.idle_timeout
+            elif self.has_time_conditions:
+                report = self.offer_report
+                track_records_done = True
+            if weight is not None:
+                # A record with no weight does not change `records_seen`, so it can't be reported on separately.
+                report = self.offer_report
+            latencies = self.interval_latencies
+
+            if weight is None and latencies is None:
+                for record in records:
+                    if idle_timeout is not None and idle_timeout.is_overdue():
+                        # Pause elapsed time here. Report will want this value.
+                        idle_timeout.stop()
+
+                    self.records_seen += 1
+                    yield record  # Process record
+
+                    if check_clock or self.records_seen >= self.next_check_at:
+                        reasons_to_report = self.should_report()
+                        if reasons_to_report:
+                            report(reasons_to_report)
+
+                    if idle_timeout is not None:
+                        idle_timeout.reset()
+                    elif track_records_done:
+                        self.records_done = self.records_seen
+            else:
+                # The same loop, but with weighted records and/or timing of the processing of each record.
+                clock = self.clock
+                for record in records:
+                    if idle_timeout is not None and idle_timeout.is_overdue():
+                        idle_timeout.stop()
+
+                    if weight is None:
+                        self.records_seen += 1
+                    else:
+                        self.records_seen += weight(record)
+                    if latencies is None:
+                        yield record  # Process record
+                    else:
+                        started_ns = clock()
+                        yield record  # Process record
+                        latencies.record(clock() - started_ns)
+
+                    if check_clock or self.records_seen >= self.next_check_at:
+                        reasons_to_report = self.should_report()
+                        if reasons_to_report:
+                            report(reasons_to_report)
+
+                    if idle_timeout is not None:
+                        idle_timeout.reset()
+                    elif track_records_done:
+                        self.records_done = self.records_seen
+
+            self.iteration_finished = True
+            self.stop_watchdog()
+            if self.watchdog_error is not None:
+                raise self.watchdog_error
 
             if self.report_last_record and self.records_seen > 0 and not self.report_raised_this_record:  # Ensure that we don't break the "Report Creation Invariants".
-                self.raise_report(set([REPORT_LAST_RECORD]))
+                report(reasons_from_mask(REASON_BITS[REPORT_LAST_RECORD]))
 
+        if self.is_pass_through():
+            return iter(iterable)
         if self.used_as_context_manager:
-            yield from iter_helper()
-        else:
-            with self:
-                yield from iter_helper()
+            return iter_helper()
+        return self.iter_in_context(iter_helper())
 
-    def __enter__(self) -> 'ProgressTracker':  # https://stackoverflow.com/questions/33533148/how-do-i-specify-that-the-return-type-of-a-method-is-the-same-as-the-class-itsel
-        self.start_time = datetime.utcnow()
+    def iter_in_context(self, iterator: Iterator[T]) -> Iterator[T]:
+        with self:
+            yield from iterator
+
+    def __enter__(self) -> 'ProgressTracker[T]':  # https://stackoverflow.com/questions/33533148/how-do-i-specify-that-the-return-type-of-a-method-is-the-same-as-the-class-itsel
+        self.start()
         self.used_as_context_manager = True
         return self
 
+    def start(self) -> None:
+        self.start_time = datetime.utcnow()
+        self.start_ns = self.clock()
+        self.rate_estimator.start(self.start_ns, self.records_seen)
+        if self.checkpoint is not None:
+            state = self.checkpoint.load()
+            if state is not None:
+                self.restore_state(state, self.start_ns)
+            self.checkpoint.start(self.records_seen, self.start_ns)
+            self.next_checkpoint_record = self.checkpoint.next_check_at
+            self.update_next_check()
+        if self.event_log is not None:
+            if self.total is not None:
+                self.event_log.record(self.start_ns, self.total, TOTAL_EVENT)  # First, so that a replay knows the total from the start.
+            self.event_log.record(self.start_ns, self.records_seen, START_EVENT)
+
+    def checkpoint_state(self, now_ns: int) -> Dict[str, Any]:
+        assert self.start_ns is not None
+        return {
+            'records_seen': self.records_seen,
+            'total': self.total,
+            'elapsed_ns': now_ns - self.start_ns,
+            'reports_raised': self.reports_raised,
+            'next_first_record': self.next_first_record,
+            'next_percent': self.next_percent,
+            'next_records_record': self.next_records_record,
+            'rate_estimator': self.rate_estimator.get_state(now_ns),
+        }
+
+    def restore_state(self, state: Dict[str, Any], now_ns: int) -> None:
+        # Fast-forwards the tracker to a checkpoint. Time spent while the job wasn't running is not counted.
+        assert self.start_time is not None
+        self.records_seen = self.records_done = self.resumed_records = self.records_to_skip = state['records_seen']
+        self.reports_raised = state['reports_raised']
+        self.start_ns = now_ns - state['elapsed_ns']
+        self.start_time -= ns_to_timedelta(state['elapsed_ns'])
+        self.next_first_record = state['next_first_record']
+        self.next_records_record = state['next_records_record']
+        if self.next_records_record != NEVER:
+            self.next_record_count = self.next_records_record
+        if self.total is not None and self.every_n_percent is not None and state['next_percent'] is not None:
+            # Recalculated, in case the total has changed since the checkpoint.
+            self.next_percent = state['next_percent']
+            self.next_percent_record = records_needed_for_percent(self.next_percent, self.total)
+        self.rate_estimator.set_state(state['rate_estimator'], now_ns)
+        self.update_next_check()
+
+    def save_checkpoint(self) -> None:
+        assert self.checkpoint is not None
+        self.checkpoint_due = False
+        self.checkpoint.save(self.checkpoint_state(self.clock()))
+
+    def take_records_to_skip(self) -> int:
+        records_to_skip = self.records_to_skip
+        self.records_to_skip = 0
+        return records_to_skip
+
+    def start_timers(self) -> None:
+        if self.timeout is not None:
+            self.timeout.reset()
+        if self.idle_timeout is not None:
+            self.idle_timeout.reset()
+        if self.sampling:
+            self.last_sample_ns = self.clock()
+            self.last_sample_records = self.records_seen
+            self.sample_step = 1
+            self.next_sample_record = self.records_seen + 1
+            self.update_next_check()
+        if self.watchdog is not None and self.has_time_conditions:
+            self.start_watchdog()
+
+    def advance(self, n: int = 1) -> None:
+        # Records that `n` more records have been processed, without iterating (ex. when processing records in batches).
+        # However many conditions are met by the jump in `records_seen`, at most a single report is created.
+        if not enabled:
+            return
+        if not self.advancing:
+            if self.start_ns is None:
+                self.start()
+            self.start_timers()
+            self.advancing = True
+
+        idle_timeout = self.idle_timeout if self.watchdog is None else None
+        if idle_timeout is not None and idle_timeout.is_overdue():
+            idle_timeout.stop()
+
+        self.records_seen += n
+
+        if self.check_clock or self.records_seen >= self.next_check_at:
+            reasons_to_report = self.should_report()
+            if reasons_to_report:
+                self.offer_report(reasons_to_report)
+
+        if idle_timeout is not None:
+            idle_timeout.reset()
+        else:
+            self.records_done = self.records_seen
+
     def __exit__(self, exc_type: Optional[Type[Exception]], value: Optional[Exception], traceback: Optional[TracebackType]) -> None:
+        if exc_type is not None:
+            self.failed = True
         self.complete()
 
-    def raise_report(self, reasons_to_report: Set[str]) -> None:
-        assert not self.report_raised_this_record, "`raise_report` called multiple times for a single record."
-        self.callback(self.format_callback(self.create_report(), reasons_to_report))
+    def raise_report(self, reasons_to_report: AbstractSet[str]) -> None:
+        assert self.reported_at_record != self.records_seen, "`raise_report` called multiple times for a single record."
+        self.reported_at_record = self.records_seen
+        if self.event_log is not None:
+            self.event_log.record(self.clock(), self.records_seen, mask_from_reasons(reasons_to_report))
+        self.send_report(reasons_to_report)
         self.reports_raised += 1
-        self.report_raised_this_record = True
         if self.last_report_timeout is not None:
             self.last_report_timeout.reset()
+        if self.checkpoint_due:
+            self.save_checkpoint()
 
-    def should_report(self) -> Set[str]:
-        reasons_to_report: Set[str] = set()
+    def send_report(self, reasons_to_report: AbstractSet[str]) -> None:
+        if self.sink is not None:
+            self.sink.emit(self.create_report(), reasons_to_report, self.format_callback, self.callback)
+        else:
+            self.callback(self.format_callback(self.create_report(), reasons_to_report))
+
+    def offer_report(self, reasons_to_report: AbstractSet[str]) -> bool:
+        # Raises a report, unless one has already been raised for this record.
+        # Used when reports can be raised from more than one thread.
+        with self.report_lock:
+            if self.report_raised_this_record:
+                if self.checkpoint_due:
+                    self.save_checkpoint()
+                return False
+            self.raise_report(reasons_to_report)
+            return True
+
+    def start_watchdog(self) -> None:
+        assert self.watchdog is not None
+        self.reset_time_condition_checks()
+        self.watchdog_handle = self.watchdog.schedule(self.next_time_condition_deadline(self.clock()), self.watchdog_check)
+
+    def stop_watchdog(self) -> None:
+        if self.watchdog is not None and self.watchdog_handle is not None:
+            self.watchdog.cancel(self.watchdog_handle)
+            self.watchdog_handle = None
+
+    def watchdog_check(self, now_ns: int) -> Optional[int]:
+        # Called from the watchdog's thread.
+        if self.watchdog_handle is None:
+            return None
+        return self.check_time_conditions(now_ns)
+
+    def reset_time_condition_checks(self) -> None:
+        self.records_done = self.records_seen
+        self.idle_observed_records_done = self.records_done
+        self.idle_reported = False
+
+    def next_time_condition_deadline(self, now_ns: int) -> int:
+        deadlines = []
+        resolutions = []
+        for timeout in [self.timeout, self.last_report_timeout]:
+            if timeout is not None:
+                deadlines.append(timeout.deadline_ns)
+                resolutions.append(timeout.delta_ns)
+        if self.idle_timeout is not None:
+            idle_check_interval_ns = max(1, self.idle_timeout.delta_ns // IDLE_CHECKS_PER_TIMEOUT)
+            deadlines.append(now_ns + idle_check_interval_ns)
+            resolutions.append(idle_check_interval_ns)
+        next_deadline_ns = min(deadlines)
+        if next_deadline_ns <= now_ns:
+            # A deadline has passed, but its report could not be raised (since there already was a report for this record).
+            next_deadline_ns = now_ns + max(1, min(resolutions))
+        return next_deadline_ns
+
+    def check_time_conditions(self, now_ns: int) -> Optional[int]:
+        # Checks the time-based conditions from outside of the per-record loop (ex. from a watchdog's thread).
+        # Returns when the conditions should next be checked, or None if checking should stop.
+        try:
+            mask = 0
+            if self.idle_timeout is not None:
+                records_done = self.records_done
+                if records_done != self.idle_observed_records_done or self.records_seen != records_done:
+                    # Still busy, so idleness is measured from now.
+                    self.idle_observed_records_done = records_done
+                    self.idle_timeout.reset()
+                    self.idle_reported = False
+                elif not self.idle_reported and self.idle_timeout.is_overdue():
+                    mask |= REASON_BITS[EVERY_N_SECONDS_IDLE]
+                    self.idle_reported = True
 
-        if self.report_first_record and self.records_seen == 1:
-            reasons_to_report.add(REPORT_FIRST_RECORD)
+            if self.last_report_timeout is not None and self.last_report_timeout.is_overdue():
+                mask |= REASON_BITS[EVERY_N_SECONDS_SINCE_REPORT]
 
-        if self.idle_timeout is not None and self.idle_timeout.is_overdue():
-            reasons_to_report.add(EVERY_N_SECONDS_IDLE)
+            if self.timeout is not None and self.timeout.is_overdue():
+                mask |= REASON_BITS[EVERY_N_SECONDS]
+                self.timeout.reset()
 
+            if mask or self.deferred_mask:
+                self.offer_time_report(mask)
+        except Exception as error:
+            # Hand the error over to the thread that is consuming the iterable.
+            self.watchdog_error = error
+            self.next_check_at = 0
+            return None
+        return self.next_time_condition_deadline(now_ns)
+
+    def offer_time_report(self, mask: int) -> None:
+        # Raises a report for time-based conditions that were met outside of the per-record loop, unless a record is being
+        # processed (or has already been reported on). Those reasons are then left for the loop's next report (which is
+        # raised after the record), so that a watchdog's report never takes the place of the loop's report for a record.
+        with self.report_lock:
+            mask |= self.deferred_mask
+            if self.records_seen != self.records_done or self.report_raised_this_record:
+                self.deferred_mask = mask
+                self.next_check_at = 0  # So that the loop checks (and reports) after the next record.
+            else:
+                self.deferred_mask = 0
+                self.raise_report(REASONS_BY_MASK[mask])
+
+    def should_report(self) -> FrozenSet[str]:
+        if self.watchdog_error is not None:
+            raise self.watchdog_error
+        mask = 0
+        records_seen = self.records_seen
+
+        if self.deferred_mask:
+            with self.report_lock:
+                mask = self.deferred_mask
+                self.deferred_mask = 0
+            self.update_next_check()
+
+        if records_seen >= self.next_other_check_at:
+            mask = self.check_record_thresholds(records_seen)
+
+        if records_seen >= self.next_records_record:
+            # Checked here rather than in `check_record_thresholds`, since it's the one that's met on every report when reporting often.
+            assert self.every_n_records is not None
+            mask |= REASON_BITS[EVERY_N_RECORDS]
+            next_records_record = self.next_record_count = ((records_seen // self.every_n_records) + 1) * self.every_n_records
+            self.next_records_record = next_records_record
+            next_other_check_at = self.next_other_check_at
+            self.next_check_at = next_records_record if next_records_record < next_other_check_at else next_other_check_at
+
+        if self.check_clock:
+            if self.idle_timeout is not None and self.idle_timeout.is_overdue():
+                mask |= REASON_BITS[EVERY_N_SECONDS_IDLE]
+
+            if self.last_report_timeout is not None and self.last_report_timeout.is_overdue():
+                mask |= REASON_BITS[EVERY_N_SECONDS_SINCE_REPORT]
+
+            if self.timeout is not None and self.timeout.is_overdue():
+                mask |= REASON_BITS[EVERY_N_SECONDS]
+                self.timeout.reset()
+        elif records_seen >= self.next_sample_record:
+            mask |= self.sample_time_conditions(records_seen)
+
+        if self.checkpoint_due and not mask:
+            self.save_checkpoint()
+        return REASONS_BY_MASK[mask]
+
+    def sample_time_conditions(self, records_seen: int) -> int:
+        mask = 0
+        now_ns = self.clock()
         if self.last_report_timeout is not None and self.last_report_timeout.is_overdue():
-            reasons_to_report.add(EVERY_N_SECONDS_SINCE_REPORT)
+            mask |= REASON_BITS[EVERY_N_SECONDS_SINCE_REPORT]
 
         if self.timeout is not None and self.timeout.is_overdue():
-            reasons_to_report.add(EVERY_N_SECONDS)
+            mask |= REASON_BITS[EVERY_N_SECONDS]
             self.timeout.reset()
 
-        if self.total is not None and self.every_n_percent is not None and self.next_percent is not None:
-            percent_complete: float = (self.records_seen / self.total) * 100
-            if percent_complete >= self.next_percent:
-                reasons_to_report.add(EVERY_N_PERCENT)
-                self.next_percent = ((int(percent_complete) // self.every_n_percent) + 1) * self.every_n_percent
-
-        if self.every_n_records is not None and self.next_record_count is not None and self.records_seen >= self.next_record_count:
-            reasons_to_report.add(EVERY_N_RECORDS)
-            self.next_record_count = ((self.records_seen // self.every_n_records) + 1) * self.every_n_records
-
-        return reasons_to_report
-
-    def create_report(self) -> Dict[str, Any]:
-        assert self.start_time is not None
-        time_taken = datetime.utcnow() - self.start_time
-        percent_complete: Optional[float]
-        estimated_time_remaining: Optional[timedelta]
-        if self.total is not None:
-            percent_complete = (self.records_seen / self.total) * 100
-            estimated_time_remaining = timedelta(seconds=((100 - percent_complete) / percent_complete) * time_taken.total_seconds()) if percent_complete != 0 else None
+        # Sample again after roughly `sample_tolerance` seconds' worth of records. The step can only double each time,
+        # so that a burst of fast records can't push the next sample far into the future.
+        elapsed_ns = now_ns - self.last_sample_ns
+        if elapsed_ns > 0:
+            estimate = (records_seen - self.last_sample_records) * self.sample_tolerance_ns // elapsed_ns
+            self.sample_step = max(1, min(estimate, 2 * self.sample_step))
         else:
-            percent_complete = None
-            estimated_time_remaining = None
-
-        items_per_second = self.records_seen / time_taken.total_seconds() if time_taken.total_seconds() != 0 else None
-
-        return {
-            'records_seen': self.records_seen,
-            'total': self.total,
-            'percent_complete': percent_complete,
-            'time_taken': time_taken,
-            'estimated_time_remaining': estimated_time_remaining,
-            'items_per_second': items_per_second,
-            'idle_time': self.idle_timeout.time_elapsed() if self.idle_timeout is not None else None
-        }
+            self.sample_step *= 2
+        self.last_sample_ns = now_ns
+        self.last_sample_records = records_seen
+        self.next_sample_record = records_seen + self.sample_step
+        self.update_next_check()
+        return mask
+
+    def check_record_thresholds(self, records_seen: int) -> int:
+        # The record-based conditions other than `every_n_records` (which `should_report` checks itself).
+        mask = 0
+        if records_seen >= self.next_estimate_record:
+            self.estimate_total(records_seen)  # First, so that the percentage is checked against the latest estimate.
+
+        if records_seen >= self.next_first_record:
+            # When advancing by more than one record at a time, the first step may go past the first record.
+            mask |= REASON_BITS[REPORT_FIRST_RECORD]
+            self.next_first_record = NEVER
+
+        if records_seen >= self.next_percent_record:
+            assert self.total is not None and self.every_n_percent is not None
+            percent_complete: float = (records_seen / self.total) * 100
+            mask |= REASON_BITS[EVERY_N_PERCENT]
+            self.next_percent = ((int(percent_complete) // self.every_n_percent) + 1) * self.every_n_percent
+            self.next_percent_record = records_needed_for_percent(self.next_percent, self.total)
+
+        if records_seen >= self.next_log_record:
+            assert self.event_log is not None and self.event_log.every_n_records is not None
+            self.event_log.record(self.clock(), records_seen, 0)
+            self.next_log_record = ((records_seen // self.event_log.every_n_records) + 1) * self.event_log.every_n_records
+
+        if records_seen >= self.next_checkpoint_record:
+            assert self.checkpoint is not None
+            if self.checkpoint.check(records_seen, self.clock()):
+                self.checkpoint_due = True
+            self.next_checkpoint_record = self.checkpoint.next_check_at
+
+        self.update_next_check()
+        return mask
+
+    def create_report(self) -> Report:
+        # Only the values that everything else is calculated from are captured here; see `Report`.
+        assert self.start_ns is not None
+        now_ns = self.clock()
+        rate_estimator = self.rate_estimator
+        idle_ns = self.idle_timeout.elapsed_ns() if self.idle_timeout is not None else None
+        if rate_estimator.sampled:
+            rate_estimator.update(now_ns, self.records_seen)
+            report = Report(self.records_seen, self.total, now_ns - self.start_ns, idle_ns, rate_estimator.rate())
+        else:
+            # Left to the report, so that it only costs anything when the smoothed rate is used.
+            report = Report(self.records_seen, self.total, now_ns - self.start_ns, idle_ns, None, None, None, rate_estimator, now_ns)
+        if self.latencies is not None and self.interval_latencies is not None:
+            self.latencies.add(self.interval_latencies)
+            report.latencies = snapshot_latencies(self.latencies)
+            report.interval_latencies = snapshot_latencies(self.interval_latencies)
+            self.interval_latencies.reset()
+        if self.total_estimator is not None:
+            report["estimated"] = self.total_estimated
+        return report
+
+    def snapshot(self) -> Report:
+        # A report on the current progress, without the side effects of `create_report` (the rate estimator and the
+        # latency histograms are left alone), so that it can be taken at any time, from any thread (ex. by an exporter).
+        if self.start_ns is None:
+            report = Report(self.records_seen, self.total, 0)
+        else:
+            report = Report(self.records_seen, self.total, (self.end_ns if self.end_ns is not None else self.clock()) - self.start_ns)
+        if self.total_estimator is not None:
+            report["estimated"] = self.total_estimated
+        return report
 
     def complete(self) -> None:
-        assert self.start_time is not None
-        self.end_time = datetime.utcnow()
-        self.total_time = self.end_time - self.start_time
-
-
-def track_progress(iterable: Iterable[T], **kwargs: Any) -> ProgressTracker[T]:
+        assert self.start_time is not None and self.start_ns is not None
+        if self.total_estimated and not self.failed and (self.advancing or self.iteration_finished):
+            # All of the records have been seen, so the total is known.
+            self.total = self.records_seen
+            self.total_estimated = False
+        if self.checkpoint is not None:
+            if not self.failed and (self.advancing or self.iteration_finished):
+                self.checkpoint.remove()  # Done, so a restart should start from scratch.
+            elif self.advancing:
+                # Only the records that were advanced past have been processed. When iterating,
+                # the last record may not have been processed, so the last periodic checkpoint is kept.
+                self.save_checkpoint()
+        if self.advancing:
+            self.advancing = False
+            if self.report_last_record and self.records_seen > 0:
+                self.offer_report(reasons_from_mask(REASON_BITS[REPORT_LAST_RECORD]))
+        self.stop_watchdog()
+        self.end_ns = self.clock()
+        self.total_time = ns_to_timedelta(self.end_ns - self.start_ns)
+        self.end_time = self.start_time + self.total_time
+        if self.event_log is not None:
+            self.event_log.record(self.end_ns, self.records_seen, END_EVENT)
+            self.event_log.flush()
+        if self.sink is not None:
+            self.sink.flush()  # Ensure that the final report is delivered
+
+
+def track_progress(iterable: Optional[Iterable[T]] = None, **kwargs: Any) -> ProgressTracker[T]:
     return ProgressTracker(iterable, **kwargs)
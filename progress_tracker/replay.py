@@ -0,0 +1,56 @@
+from typing import AbstractSet, Any, Callable, Mapping, Optional
+
+from progress_tracker.clock import FakeClock
+from progress_tracker.events import END_EVENT, REASONS_MASK, START_EVENT, TOTAL_EVENT, read_events
+from progress_tracker.progress_tracker import ProgressTracker, default_format_callback, reasons_from_mask
+from progress_tracker.report import Report
+
+
+def replay(path: str,
+           callback: Callable[[str], Any] = print,
+           format_callback: Callable[[Mapping[str, Any], AbstractSet[str]], str] = default_format_callback,
+           **kwargs: Any) -> None:
+    # Replays an event log (see `EventLog`) through `format_callback` and `callback`.
+    #
+    # Without any other arguments, the reports that were logged are created again. Otherwise, the run is re-run by a tracker
+    # with the given arguments (the same as `track_progress`, ex. different conditions, or a different `total`), which is
+    # advanced to each event's `records_seen` at the time it was logged, using a `FakeClock`. So the re-run only sees the
+    # progress at the logged events: log with `every_n_records` for a finer-grained replay.
+    #
+    if kwargs:
+        rerun(path, callback, format_callback, **kwargs)
+        return
+    total: Optional[int] = None
+    start_ns = 0
+    for event in read_events(path):
+        if event.mask & TOTAL_EVENT:
+            total = event.records_seen
+        elif event.mask & START_EVENT:
+            start_ns = event.timestamp_ns
+        elif event.mask & REASONS_MASK:
+            report = Report(event.records_seen, total, event.timestamp_ns - start_ns)
+            callback(format_callback(report, reasons_from_mask(event.mask & REASONS_MASK)))
+
+
+def rerun(path: str, callback: Callable[[str], Any], format_callback: Callable[[Mapping[str, Any], AbstractSet[str]], str], **kwargs: Any) -> None:
+    clock = FakeClock()
+    total: Optional[int] = None
+    tracker: Optional[ProgressTracker[Any]] = None
+    for event in read_events(path):
+        clock.set(max(clock(), event.timestamp_ns))
+        if event.mask & TOTAL_EVENT:
+            total = event.records_seen
+            if tracker is not None and "total" not in kwargs:
+                tracker.set_total(total)
+        elif event.mask & START_EVENT:
+            tracker = ProgressTracker(None, **dict({"total": total}, callback=callback, format_callback=format_callback, clock=clock, **kwargs))
+            tracker.records_seen = event.records_seen  # When the run resumed from a checkpoint.
+            tracker.advance(0)
+        elif tracker is None:
+            continue
+        elif event.mask & END_EVENT:
+            tracker.advance(event.records_seen - tracker.records_seen)
+            tracker.complete()
+            tracker = None
+        else:
+            tracker.advance(event.records_seen - tracker.records_seen)
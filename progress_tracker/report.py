@@ -0,0 +1,234 @@
+import operator
+import re
+import string
+from array import array  # noqa: F401  (Used in type annotations)
+from datetime import timedelta
+from typing import AbstractSet, Any, Callable, Dict, Iterator, List, Mapping, Optional, Tuple
+
+from progress_tracker.clock import MICROSECOND, ns_to_seconds, ns_to_timedelta
+from progress_tracker.estimators import RateEstimator
+from progress_tracker.histogram import LogHistogram, quantiles_of
+
+# The quantiles of the time taken to process each record that are included in reports, when `track_latency` is used.
+LATENCY_QUANTILES = (0.5, 0.95, 0.99)
+LATENCY_SUFFIXES = ("p50", "p95", "p99", "max")
+
+# A snapshot of a latency histogram: its counts and its maximum. The tracker never modifies the counts of a snapshot
+# (`LogHistogram.add` and `LogHistogram.reset` replace the array), so snapshots are safe to keep.
+LatencySnapshot = Tuple['array[int]', int]
+
+
+class Report(Mapping[str, Any]):
+    # A snapshot of a tracker's progress.
+    #
+    # Creating a report only copies a handful of numbers. Each value (ex. `estimated_time_remaining`) is only
+    # calculated the first time that it is looked up, so formats that only use a few values don't pay for the rest.
+    # Since everything is calculated from the snapshot, a report can safely be formatted later, or on another thread.
+    #
+    __slots__ = ("records_seen", "total", "elapsed_ns", "idle_ns", "smoothed_items_per_second", "latencies", "interval_latencies",
+                 "rate_estimator", "now_ns", "calculated", "extra_keys", "overridden")
+
+    def __init__(self, records_seen: int, total: Optional[int], elapsed_ns: int,
+                 idle_ns: Optional[int] = None,
+                 smoothed_items_per_second: Optional[float] = None,
+                 latencies: Optional[LatencySnapshot] = None,
+                 interval_latencies: Optional[LatencySnapshot] = None,
+                 rate_estimator: Optional[RateEstimator] = None, now_ns: int = 0) -> None:
+        self.records_seen = records_seen
+        self.total = total
+        self.elapsed_ns = elapsed_ns
+        self.idle_ns = idle_ns
+        self.smoothed_items_per_second = smoothed_items_per_second
+        self.latencies = latencies
+        self.interval_latencies = interval_latencies
+        # An estimator that isn't sampled for every report (see `RateEstimator.sampled`), which gives the smoothed rate as of `now_ns`.
+        self.rate_estimator = rate_estimator
+        self.now_ns = now_ns
+        # The values that have been calculated so far, and any values that have been added with `report[key] = value`.
+        self.calculated: Dict[str, Any] = {}
+        self.extra_keys: Tuple[str, ...] = ()
+        self.overridden = False  # Whether any of the values calculated from the slots have been replaced.
+
+    def __getitem__(self, key: str) -> Any:
+        calculated = self.calculated
+        if key in calculated:
+            return calculated[key]
+        field = FIELDS.get(key)
+        if field is None or (self.latencies is None and key in LATENCY_FIELDS):
+            raise KeyError(key)
+        value = calculated[key] = field(self)
+        return value
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        # Allows subclasses of `ProgressTracker` to add their own values to reports.
+        if key in FIELDS:
+            self.overridden = True
+        if key not in self:
+            self.extra_keys += (key,)
+        self.calculated[key] = value
+
+    def field_names(self) -> List[str]:
+        return BASE_FIELD_NAMES if self.latencies is None else BASE_AND_LATENCY_FIELD_NAMES
+
+    def __iter__(self) -> Iterator[str]:
+        yield from self.field_names()
+        yield from self.extra_keys
+
+    def __len__(self) -> int:
+        return len(self.field_names()) + len(self.extra_keys)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.field_names() or key in self.extra_keys
+
+    def __repr__(self) -> str:
+        return "Report({!r})".format(dict(self))
+
+    def slot_values(self) -> Tuple[Any, ...]:
+        # The values of `SLOT_FIELDS`, calculated straight from the slots, without the lookups (and caching) of `__getitem__`.
+        records_seen = self.records_seen
+        total = self.total
+        elapsed_ns = self.elapsed_ns
+        idle_ns = self.idle_ns
+        percent_complete = None
+        estimated_time_remaining = None
+        # The timedeltas are made as by `ns_to_timedelta`, inlined.
+        if total is not None:
+            percent_complete = (records_seen / total) * 100
+            if percent_complete != 0:
+                estimated_time_remaining = MICROSECOND * ((int(((100 - percent_complete) / percent_complete) * elapsed_ns) + 500) // 1000)
+        return (records_seen, total, percent_complete, MICROSECOND * ((elapsed_ns + 500) // 1000), estimated_time_remaining,
+                MICROSECOND * ((idle_ns + 500) // 1000) if idle_ns is not None else None)
+
+    def percent_complete(self) -> Optional[float]:
+        return (self.records_seen / self.total) * 100 if self.total is not None else None
+
+    def estimated_time_remaining(self) -> Optional[timedelta]:
+        percent_complete = self["percent_complete"]
+        if percent_complete is None or percent_complete == 0:
+            return None
+        return ns_to_timedelta(int(((100 - percent_complete) / percent_complete) * self.elapsed_ns))
+
+    def items_per_second(self) -> Optional[float]:
+        return self.records_seen / ns_to_seconds(self.elapsed_ns) if self.elapsed_ns != 0 else None
+
+    def smoothed_rate(self) -> Optional[float]:
+        if self.rate_estimator is not None:
+            return self.rate_estimator.rate_at(self.now_ns, self.records_seen)
+        return self.smoothed_items_per_second
+
+    def smoothed_estimated_time_remaining(self) -> Optional[timedelta]:
+        smoothed_items_per_second = self["smoothed_items_per_second"]
+        if self.total is None or not smoothed_items_per_second:
+            return None
+        return timedelta(seconds=max(0, self.total - self.records_seen) / smoothed_items_per_second)
+
+    def latency_quantiles(self, prefix: str) -> None:
+        # The quantiles all come from one pass over the histogram, so they are calculated (and stored) together.
+        snapshot = self.latencies if prefix == "latency" else self.interval_latencies
+        assert snapshot is not None
+        counts, maximum = snapshot
+        quantiles = quantiles_of(counts, maximum, LATENCY_QUANTILES)
+        quantiles.append(maximum if quantiles[0] is not None else None)
+        for suffix, value in zip(LATENCY_SUFFIXES, quantiles):
+            self.calculated[prefix + "_" + suffix] = ns_to_timedelta(value) if value is not None else None
+
+
+def latency_field(prefix: str, suffix: str) -> Callable[[Report], Any]:
+    def field(report: Report) -> Any:
+        report.latency_quantiles(prefix)
+        return report.calculated[prefix + "_" + suffix]
+    return field
+
+
+FIELDS: Dict[str, Callable[[Report], Any]] = {
+    'records_seen': lambda report: report.records_seen,
+    'total': lambda report: report.total,
+    'percent_complete': Report.percent_complete,
+    'time_taken': lambda report: ns_to_timedelta(report.elapsed_ns),
+    'estimated_time_remaining': Report.estimated_time_remaining,
+    'items_per_second': Report.items_per_second,
+    'idle_time': lambda report: ns_to_timedelta(report.idle_ns) if report.idle_ns is not None else None,
+    'smoothed_items_per_second': Report.smoothed_rate,
+    'smoothed_estimated_time_remaining': Report.smoothed_estimated_time_remaining,
+}
+BASE_FIELD_NAMES = list(FIELDS)
+
+# The values that `Report.slot_values` calculates, in order (the values used by the default formats).
+SLOT_FIELDS = ("records_seen", "total", "percent_complete", "time_taken", "estimated_time_remaining", "idle_time")
+
+for prefix in ["latency", "interval_latency"]:
+    for suffix in LATENCY_SUFFIXES:
+        FIELDS[prefix + "_" + suffix] = latency_field(prefix, suffix)
+BASE_AND_LATENCY_FIELD_NAMES = list(FIELDS)
+LATENCY_FIELDS = frozenset(BASE_AND_LATENCY_FIELD_NAMES) - frozenset(BASE_FIELD_NAMES)
+
+
+def snapshot_latencies(histogram: LogHistogram) -> LatencySnapshot:
+    return (histogram.counts, histogram.max)
+
+
+FIELD_NAME = re.compile(r"[^.\[]*")
+
+
+class CompiledFormat(object):
+    # A `str.format` style template (ex. "{records_seen}/{total} in {time_taken}"), parsed once.
+    #
+    # The template is rewritten to use positional fields (ex. "{0}/{1} in {2}"), and the values it uses are fetched with
+    # a single `itemgetter`. With a lazy `Report`, values that the template doesn't use are never calculated.
+    # Templates that only use `SLOT_FIELDS` (like the default formats) are rendered from `Report.slot_values` instead,
+    # unless the report's values have been replaced. Instances can be used directly as a `format_callback`.
+    #
+    def __init__(self, template: str) -> None:
+        self.template = template
+        names: List[str] = []
+        positional_template = []
+        slot_template: Optional[List[str]] = []
+        for literal, field, format_spec, conversion in string.Formatter().parse(template):
+            positional_template.append(literal.replace("{", "{{").replace("}", "}}"))
+            if slot_template is not None:
+                slot_template.append(positional_template[-1])
+            if field is None:
+                continue
+            name = FIELD_NAME.match(field).group()
+            if name == "" or name.isdigit():
+                raise ValueError("Report formats can only use named fields, not positional fields: {!r}".format(template))
+            if name not in names:
+                names.append(name)
+            replacement = field[len(name):]
+            if conversion is not None:
+                replacement += "!" + conversion
+            if format_spec:
+                if "{" in format_spec:
+                    raise ValueError("Report formats can not use nested fields in format specs: {!r}".format(template))
+                replacement += ":" + format_spec
+            positional_template.append("{" + str(names.index(name)) + replacement + "}")
+            if slot_template is not None:
+                slot_template.append("{" + str(SLOT_FIELDS.index(name)) + replacement + "}" if name in SLOT_FIELDS else "")
+                if name not in SLOT_FIELDS:
+                    slot_template = None
+        self.fields: Tuple[str, ...] = tuple(names)
+        self.positional_template = "".join(positional_template)
+        self.slot_template = "".join(slot_template) if slot_template is not None else None
+        self.get_values: Callable[[Mapping[str, Any]], Tuple[Any, ...]]
+        if len(names) == 0:
+            self.get_values = lambda report: ()
+        elif len(names) == 1:
+            get_value = operator.itemgetter(names[0])
+            self.get_values = lambda report: (get_value(report),)
+        else:
+            self.get_values = operator.itemgetter(*names)
+
+    def render(self, report: Mapping[str, Any]) -> str:
+        if self.slot_template is not None and type(report) is Report and not report.overridden:
+            return self.slot_template.format(*report.slot_values())
+        return self.positional_template.format(*self.get_values(report))
+
+    def __call__(self, report: Mapping[str, Any], reasons: AbstractSet[str]) -> str:
+        return self.render(report)
+
+    def __repr__(self) -> str:
+        return "compile_format({!r})".format(self.template)
+
+
+def compile_format(template: str) -> CompiledFormat:
+    return CompiledFormat(template)
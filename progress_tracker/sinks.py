@@ -0,0 +1,165 @@
+import collections
+import shutil
+import sys
+import threading
+import time
+from typing import AbstractSet, Any, Callable, Deque, Mapping, Optional, TextIO, Tuple
+
+BLOCK = "block"
+DROP_OLDEST = "drop_oldest"
+COALESCE = "coalesce"
+
+FormatCallback = Callable[[Mapping[str, Any], AbstractSet[str]], str]
+Callback = Callable[[str], Any]
+
+
+class BackgroundSink(object):
+    # Formats and delivers reports on a background thread, so that a slow `callback` does not hold up processing.
+    #
+    # Reports are queued in a bounded queue. When the queue is full, `overflow` decides what happens:
+    #   - BLOCK: wait for the background thread to make room.
+    #   - DROP_OLDEST: drop the oldest queued report.
+    #   - COALESCE: only the latest report is ever queued (ie. any report that hasn't been delivered yet is replaced).
+    # Dropped reports are counted in `dropped`.
+    #
+    def __init__(self, maxsize: int = 1000, overflow: str = BLOCK) -> None:
+        if overflow not in (BLOCK, DROP_OLDEST, COALESCE):
+            raise ValueError("Unknown overflow behaviour {!r}. Expected one of {!r}, {!r} or {!r}.".format(overflow, BLOCK, DROP_OLDEST, COALESCE))
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1.")
+        self.maxsize = 1 if overflow == COALESCE else maxsize
+        self.overflow = overflow
+        self.condition = threading.Condition()
+        self.pending: Deque[Tuple[Mapping[str, Any], AbstractSet[str], FormatCallback, Callback]] = collections.deque()
+        self.delivering = False
+        self.closed = False
+        self.thread: Optional[threading.Thread] = None
+        self.error: Optional[BaseException] = None
+        self.delivered = 0
+        self.dropped = 0
+        self.flushes_waiting = 0
+
+    def emit(self, report: Mapping[str, Any], reasons: AbstractSet[str], format_callback: FormatCallback, callback: Callback) -> None:
+        with self.condition:
+            self.raise_error()
+            if self.closed:
+                raise RuntimeError("Can not emit reports to a closed sink.")
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="progress_tracker-sink", daemon=True)
+                self.thread.start()
+            while len(self.pending) >= self.maxsize:
+                if self.overflow == BLOCK:
+                    self.condition.wait()
+                    self.raise_error()
+                else:
+                    self.pending.popleft()
+                    self.dropped += 1
+            self.pending.append((report, reasons, format_callback, callback))
+            self.condition.notify_all()
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                while not self.pending and not self.closed:
+                    self.condition.wait()
+                if not self.pending:
+                    return
+                self.throttle()
+                report, reasons, format_callback, callback = self.pending.popleft()
+                self.delivering = True
+                self.condition.notify_all()  # There is now room in the queue
+
+            try:
+                self.deliver(report, reasons, format_callback, callback)
+            except BaseException as error:
+                with self.condition:
+                    if self.error is None:
+                        self.error = error
+            finally:
+                with self.condition:
+                    self.delivering = False
+                    self.delivered += 1
+                    self.condition.notify_all()
+
+    def throttle(self) -> None:
+        # Called (holding `condition`) before taking the next report from the queue. Subclasses can wait here to limit the rate of delivery.
+        pass
+
+    def deliver(self, report: Mapping[str, Any], reasons: AbstractSet[str], format_callback: FormatCallback, callback: Callback) -> None:
+        callback(format_callback(report, reasons))
+
+    def flush(self) -> None:
+        # Waits until every queued report has been delivered. Raises the first error raised while delivering a report (if any).
+        with self.condition:
+            self.flushes_waiting += 1
+            self.condition.notify_all()
+            try:
+                while self.pending or self.delivering:
+                    if self.error is not None:
+                        break
+                    self.condition.wait()
+            finally:
+                self.flushes_waiting -= 1
+            self.raise_error()
+
+    def close(self) -> None:
+        try:
+            self.flush()
+        finally:
+            with self.condition:
+                self.closed = True
+                self.condition.notify_all()
+            if self.thread is not None:
+                self.thread.join()
+
+    def raise_error(self) -> None:
+        # Must hold `condition`.
+        if self.error is not None:
+            error, self.error = self.error, None
+            raise error
+
+
+class TerminalSink(BackgroundSink):
+    # Draws reports on a single line of a terminal, redrawing it in place, at most `frames_per_second` times per second.
+    #
+    # Reports are coalesced (see COALESCE), so reports that arrive between two frames are never formatted: only the
+    # latest one is drawn. When `stream` is not a terminal (ex. it's redirected to a file), each frame is written as a line instead.
+    # The tracker's `callback` is not used, since the sink writes to `stream` itself.
+    #
+    def __init__(self, stream: Optional[TextIO] = None, frames_per_second: float = 10) -> None:
+        super().__init__(overflow=COALESCE)
+        self.stream = stream if stream is not None else sys.stdout
+        self.frame_interval = 1 / frames_per_second
+        self.next_frame_at = 0.0
+        self.is_terminal = self.stream.isatty()
+        self.line_length = 0  # The length of the line drawn on the terminal so far (or 0 if there is none).
+
+    def throttle(self) -> None:
+        # Waits for the next frame, unless the reports are being flushed (ex. because the tracker has completed).
+        while not self.closed and not self.flushes_waiting:
+            remaining = self.next_frame_at - time.monotonic()
+            if remaining <= 0:
+                break
+            self.condition.wait(remaining)
+
+    def deliver(self, report: Mapping[str, Any], reasons: AbstractSet[str], format_callback: FormatCallback, callback: Callback) -> None:
+        message = format_callback(report, reasons)
+        if self.is_terminal:
+            # Lines that wrap can't be redrawn in place. The old line is overwritten with spaces, rather than cleared with an escape code, since not all terminals support them.
+            message = message[:shutil.get_terminal_size().columns - 1]
+            self.stream.write("\r" + message + " " * max(0, self.line_length - len(message)))
+            self.line_length = len(message)
+        else:
+            self.stream.write(message + "\n")
+        self.stream.flush()
+        self.next_frame_at = time.monotonic() + self.frame_interval
+
+    def flush(self) -> None:
+        # Once everything has been drawn, ends the line, so that whatever is written next starts on a line of its own.
+        try:
+            super().flush()
+        finally:
+            if self.line_length:
+                self.stream.write("\n")
+                self.stream.flush()
+                self.line_length = 0
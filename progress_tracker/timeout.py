@@ -1,27 +1,37 @@
-from datetime import datetime, timedelta
+from datetime import timedelta
 from typing import Optional
 
+from progress_tracker.clock import Clock, default_clock, ns_to_timedelta
+
 
 class Timeout(object):
-    def __init__(self, delta: timedelta, start_time: Optional[datetime] = None) -> None:
-        self.delta = delta
-        self.start_time = start_time if start_time else datetime.utcnow()
-        self.stop_time: Optional[datetime] = None
-        self.deadline = self.start_time + self.delta
+    # All times are integer nanosecond readings of `clock`. `timedelta`s are only built on request.
+    def __init__(self, delta_ns: int, clock: Clock = default_clock, start_ns: Optional[int] = None) -> None:
+        self.clock = clock
+        self.delta_ns = delta_ns
+        self.start_ns = start_ns if start_ns is not None else clock()
+        self.stop_ns: Optional[int] = None
+        self.deadline_ns = self.start_ns + self.delta_ns
 
     def reset(self) -> None:
-        self.start_time = datetime.utcnow()
-        self.stop_time = None
-        self.deadline = self.start_time + self.delta
+        self.start_ns = self.clock()
+        self.stop_ns = None
+        self.deadline_ns = self.start_ns + self.delta_ns
 
     def is_overdue(self) -> bool:
-        return self.deadline < datetime.utcnow()
+        return self.deadline_ns < self.clock()
+
+    def remaining_ns(self) -> int:
+        return self.deadline_ns - self.clock()
+
+    def elapsed_ns(self) -> int:
+        return (self.clock() if self.stop_ns is None else self.stop_ns) - self.start_ns
 
     def time_remaining(self) -> timedelta:
-        return self.deadline - datetime.utcnow()
+        return ns_to_timedelta(self.remaining_ns())
 
     def time_elapsed(self) -> timedelta:
-        return datetime.utcnow() - self.start_time if self.stop_time is None else (self.stop_time - self.start_time)
+        return ns_to_timedelta(self.elapsed_ns())
 
     def stop(self) -> None:
-        self.stop_time = datetime.utcnow()
+        self.stop_ns = self.clock()
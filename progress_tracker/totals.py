@@ -0,0 +1,36 @@
+import operator
+from typing import Any, Callable, Iterable, Optional, Union
+
+# Estimates the total number of records, given the number of records seen so far (or returns None when it can't tell yet).
+# Any such function can be used as the `total_estimator` of a tracker (ex. `lambda records_seen: estimated_row_count`).
+TotalEstimator = Callable[[int], Optional[int]]
+
+
+class LengthHint(object):
+    # Estimates the total using the iterable's `__length_hint__` (see `operator.length_hint`).
+    # The hint of an iterator is the number of records it has left, so it's added to the records seen so far.
+    def __init__(self, iterable: Iterable[Any]) -> None:
+        self.iterable = iterable
+        self.hints_remaining = iter(iterable) is iterable
+
+    def __call__(self, records_seen: int) -> Optional[int]:
+        hint = operator.length_hint(self.iterable, -1)
+        if hint < 0:
+            return None
+        return records_seen + hint if self.hints_remaining else hint
+
+
+class AverageSizeTotal(object):
+    # Estimates the total from the size of the input (ex. a file's size in bytes) and the average size of the records seen
+    # so far, which is the `position` in the input (ex. a binary file's `tell`) divided by the number of records seen.
+    # The `size` can be a function, for inputs that are still growing.
+    def __init__(self, size: Union[int, Callable[[], int]], position: Callable[[], int]) -> None:
+        self.size = size
+        self.position = position
+
+    def __call__(self, records_seen: int) -> Optional[int]:
+        position = self.position()
+        if records_seen == 0 or position <= 0:
+            return None
+        size = self.size() if callable(self.size) else self.size
+        return round(records_seen * size / position)
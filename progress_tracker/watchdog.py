@@ -0,0 +1,83 @@
+import heapq
+import itertools
+import threading
+import warnings
+from typing import Callable, List, Optional, Set, Tuple
+
+from progress_tracker.clock import Clock, default_clock, ns_to_seconds
+
+# A check is called with the current clock reading, and returns the clock reading at which it wants to be called next (or None to stop).
+Check = Callable[[int], Optional[int]]
+
+
+class Watchdog(object):
+    # A single daemon thread that runs the scheduled checks of any number of trackers.
+    #
+    # This allows the time-based conditions to be met (and reported) while the thread that is
+    # consuming the iterable is blocked, and without that thread having to read the clock for every record.
+    #
+    shared_instance: Optional['Watchdog'] = None
+    shared_instance_lock = threading.Lock()
+
+    def __init__(self, clock: Clock = default_clock) -> None:
+        self.clock = clock
+        self.condition = threading.Condition()
+        self.queue: List[Tuple[int, int, Check]] = []
+        self.handles = itertools.count()
+        self.active: Set[int] = set()  # Handles that are either queued, or currently being checked.
+        self.cancelled: Set[int] = set()
+        self.thread: Optional[threading.Thread] = None
+
+    @classmethod
+    def shared(cls) -> 'Watchdog':
+        with cls.shared_instance_lock:
+            if cls.shared_instance is None:
+                cls.shared_instance = cls()
+            return cls.shared_instance
+
+    def schedule(self, deadline_ns: int, check: Check) -> int:
+        with self.condition:
+            handle = next(self.handles)
+            self.active.add(handle)
+            heapq.heappush(self.queue, (deadline_ns, handle, check))
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, name="progress_tracker-watchdog", daemon=True)
+                self.thread.start()
+            self.condition.notify()
+            return handle
+
+    def cancel(self, handle: int) -> None:
+        with self.condition:
+            if handle in self.active:
+                self.cancelled.add(handle)
+
+    def run(self) -> None:
+        while True:
+            with self.condition:
+                if not self.queue:
+                    self.condition.wait()
+                    continue
+                deadline_ns, handle, check = self.queue[0]
+                now_ns = self.clock()
+                if deadline_ns > now_ns:
+                    self.condition.wait(ns_to_seconds(deadline_ns - now_ns))
+                    continue
+                heapq.heappop(self.queue)
+                if handle in self.cancelled:
+                    self.cancelled.remove(handle)
+                    self.active.remove(handle)
+                    continue
+
+            # Run the check without holding the lock, so that it can schedule or cancel other checks.
+            # A check that fails is dropped, rather than stopping the thread (and so every other check) with it.
+            try:
+                next_deadline_ns = check(now_ns)
+            except Exception as error:
+                warnings.warn("Dropped a watchdog check that raised {!r}.".format(error), RuntimeWarning)
+                next_deadline_ns = None
+            with self.condition:
+                if next_deadline_ns is None or handle in self.cancelled:
+                    self.cancelled.discard(handle)
+                    self.active.remove(handle)
+                else:
+                    heapq.heappush(self.queue, (next_deadline_ns, handle, check))
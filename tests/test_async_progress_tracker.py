@@ -0,0 +1,140 @@
+import asyncio
+import time
+import unittest
+from datetime import timedelta
+
+from progress_tracker import FakeClock, track_progress_async
+from progress_tracker.progress_tracker import EVERY_N_SECONDS_IDLE
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+async def async_range(n, delay=0, stall_at=None, stall_seconds=0):
+    for i in range(n):
+        if i == stall_at:
+            await asyncio.sleep(stall_seconds)
+        elif delay:
+            await asyncio.sleep(delay)
+        yield i
+
+
+class AsyncProgressTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.reports = []
+
+    def record_report(self, report, reasons):
+        self.reports.append((report["records_seen"], reasons))
+        return ""
+
+    def test_every_n_records(self):
+        async def consume():
+            return [record async for record in track_progress_async(async_range(101), every_n_records=5, callback=lambda _: None, format_callback=self.record_report)]
+
+        results = run(consume())
+        self.assertEqual(results, list(range(101)))
+        self.assertEqual(len(self.reports), 20)
+
+    def test_every_n_percent_with_total(self):
+        async def consume():
+            async with track_progress_async(async_range(100), total=100, every_n_percent=10, report_last_record=True, callback=lambda _: None) as tracker:
+                async for _ in tracker:
+                    continue
+            return tracker
+
+        tracker = run(consume())
+        self.assertEqual(tracker.records_seen, 100)
+        self.assertEqual(tracker.reports_raised, 10)
+        self.assertIsNotNone(tracker.total_time)
+
+    def test_idle_report_while_awaiting(self):
+        IDLE_SECONDS_TRIGGER = 0.02
+
+        async def consume():
+            async for _ in track_progress_async(async_range(3, stall_at=1, stall_seconds=IDLE_SECONDS_TRIGGER * 4), every_n_seconds_idle=IDLE_SECONDS_TRIGGER, callback=lambda _: None, format_callback=self.record_report):
+                continue
+
+        run(consume())
+        # Reported while waiting for the second record
+        self.assertEqual(self.reports, [(1, frozenset([EVERY_N_SECONDS_IDLE]))])
+
+    def test_async_callbacks_do_not_block(self):
+        CALLBACK_SECONDS = 0.05
+        delivered = []
+
+        async def slow_callback(message):
+            await asyncio.sleep(CALLBACK_SECONDS)
+            delivered.append(message)
+
+        async def consume():
+            start = time.monotonic()
+            async for _ in track_progress_async(async_range(5), every_n_records=1, callback=slow_callback, format_callback=lambda report, _reasons: report["records_seen"]):
+                continue
+            return time.monotonic() - start
+
+        elapsed = run(consume())
+        self.assertEqual(sorted(delivered), [1, 2, 3, 4, 5])  # Delivered before the iteration finished
+        self.assertLess(elapsed, CALLBACK_SECONDS * 5)
+
+    def test_async_callback_errors(self):
+        async def failing_callback(_message):
+            raise ValueError("Sink is broken")
+
+        async def consume():
+            async for _ in track_progress_async(async_range(2), every_n_records=1, callback=failing_callback):
+                continue
+
+        with self.assertRaises(ValueError):
+            run(consume())
+
+    def test_weight(self):
+        async def consume():
+            async for _ in track_progress_async(async_range(10), weight=lambda record: record % 2, every_n_records=2, callback=lambda _: None, format_callback=self.record_report):
+                continue
+
+        run(consume())
+        self.assertEqual([records_seen for records_seen, _ in self.reports], [2, 4])
+
+    def test_track_latency(self):
+        clock = FakeClock()
+        reports = []
+
+        async def consume():
+            async for record in track_progress_async(async_range(4), track_latency=True, every_n_records=2, clock=clock, callback=lambda _: None,
+                                                     format_callback=lambda report, _reasons: reports.append(report)):
+                clock.advance(seconds=record + 1)
+
+        run(consume())
+        self.assertEqual([report["interval_latency_max"] for report in reports], [timedelta(seconds=2), timedelta(seconds=4)])
+
+    def test_completes_when_the_loop_stops_early(self):
+        async def consume(tracker, error):
+            try:
+                async for record in tracker:
+                    if record == 2:
+                        if error:
+                            raise ValueError("Bad record")
+                        break
+            except ValueError:
+                pass
+            await asyncio.sleep(0)  # The event loop closes the abandoned generator.
+
+        for error in [False, True]:
+            tracker = track_progress_async(async_range(10), every_n_seconds=60, callback=lambda _: None)
+            run(consume(tracker, error))
+            self.assertIsNotNone(tracker.total_time, error)
+            self.assertTrue(tracker.failed, error)
+            self.assertIsNone(tracker.timer_handle, error)
+
+    def test_rejects_watchdog(self):
+        with self.assertRaises(TypeError):
+            track_progress_async(async_range(2), watchdog=True)
+
+
+if __name__ == '__main__':
+    unittest.main()
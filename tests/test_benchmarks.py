@@ -0,0 +1,33 @@
+import unittest
+
+from benchmarks import suite
+
+
+def result(overhead_ns, retained_bytes=0.0):
+    return {"ns_per_record": overhead_ns + 30, "overhead_ns_per_record": overhead_ns, "peak_bytes_per_record": 0.0, "retained_bytes_per_record": retained_bytes}
+
+
+class BenchmarkSuiteTests(unittest.TestCase):
+    def test_compare(self):
+        baseline = {"results": {"a": result(100), "b": result(-5), "c": result(100), "d": result(100)}}
+        results = {"results": {"a": result(140), "b": result(14), "c": result(150), "d": result(100, retained_bytes=2), "e": result(1000)}}
+        self.assertEqual(suite.compare(results, baseline), [
+            "c: 150.0 ns/record overhead (baseline: 100.0)",
+            "d: 2.00 retained bytes/record (baseline: 0.00)",
+        ])
+        self.assertEqual(suite.compare(results, baseline, tolerance=1), ["d: 2.00 retained bytes/record (baseline: 0.00)"])
+
+    def test_run(self):
+        results = suite.run(records=1000, repeats=1, name_filter="every_n_records=1000 ")
+        self.assertEqual(sorted(results["results"]), ["every_n_records=1000 [sized, cheap callback]", "every_n_records=1000 [unsized, cheap callback]"])
+        self.assertEqual(suite.compare(results, results), [])
+
+    def test_configurations(self):
+        names = [name for name, _, _, _ in suite.configurations()]
+        self.assertEqual(len(names), len(set(names)))
+        self.assertIn("every_n_records=1 [unsized, slow callback]", names)
+        self.assertNotIn("every_n_percent=10 [unsized, cheap callback]", names)
+
+
+if __name__ == '__main__':
+    unittest.main()
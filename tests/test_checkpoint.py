@@ -0,0 +1,133 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from datetime import timedelta
+
+from progress_tracker import Checkpoint, EWMARate, FakeClock, SlidingWindowRate, track_progress
+from progress_tracker.clock import seconds_to_ns
+
+
+class Interrupted(Exception):
+    pass
+
+
+class CheckpointTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "progress.json")
+
+    def load(self):
+        with open(self.path) as file:
+            return json.load(file)
+
+    def run_until(self, records, stop_after, clock, **kwargs):
+        # Processes records, until it "crashes" while processing record `stop_after`.
+        processed = []
+        reports = []
+        try:
+            for record in track_progress(records, clock=clock, callback=reports.append, **kwargs):
+                if record == stop_after:
+                    raise Interrupted()
+                processed.append(record)
+                clock.advance(seconds=1)
+        except Interrupted:
+            pass
+        return processed, reports
+
+    def test_resume_skips_processed_records(self):
+        clock = FakeClock()
+        records = list(range(100))
+        processed, _ = self.run_until(records, 45, clock, checkpoint=Checkpoint(self.path, every_n_records=10))
+        self.assertEqual(self.load()["records_seen"], 40)
+        self.assertEqual(self.load()["elapsed_ns"], seconds_to_ns(40))
+
+        clock.advance(seconds=3600)  # Time while the job was down isn't counted.
+        processed, reports = self.run_until(records, None, clock, checkpoint=Checkpoint(self.path, every_n_records=10),
+                                            every_n_percent=50, report_last_record=True)
+        self.assertEqual(processed, list(range(40, 100)))
+        self.assertEqual(reports, [
+            "50/100 (50.0%) in 0:00:50 (Time left: 0:00:50)",
+            "100/100 (100.0%) in 0:01:40 (Time left: 0:00:00)",
+        ])
+        self.assertFalse(os.path.exists(self.path))  # Finished, so the next run starts from scratch.
+
+    def test_thresholds_are_restored(self):
+        clock = FakeClock()
+        records = list(range(20))
+        _, reports = self.run_until(records, 7, clock, every_n_records=5, checkpoint=Checkpoint(self.path, every_n_records=3))
+        self.assertEqual(reports, ["5/20 (25.0%) in 0:00:05 (Time left: 0:00:15)"])
+        state = self.load()
+        self.assertEqual(state["records_seen"], 6)
+        self.assertEqual(state["next_records_record"], 10)
+        self.assertEqual(state["reports_raised"], 1)
+
+        _, reports = self.run_until(records, 12, clock, every_n_records=5, checkpoint=Checkpoint(self.path, every_n_records=3))
+        self.assertEqual(reports, ["10/20 (50.0%) in 0:00:10 (Time left: 0:00:10)"])
+
+    def test_saved_after_the_report_for_the_same_record(self):
+        clock = FakeClock()
+        _, reports = self.run_until(list(range(20)), 7, clock, every_n_records=5, checkpoint=Checkpoint(self.path, every_n_records=5))
+        self.assertEqual(len(reports), 1)
+        state = self.load()
+        self.assertEqual(state["records_seen"], 5)
+        self.assertEqual(state["reports_raised"], 1)
+
+        with track_progress(total=20, clock=clock, every_n_records=5, checkpoint=Checkpoint(self.path, every_n_records=5), callback=reports.append) as tracker:
+            tracker.advance(5)
+            self.assertEqual(self.load()["reports_raised"], 2)
+
+    def test_advance_saves_on_failure(self):
+        clock = FakeClock()
+        with self.assertRaises(Interrupted):
+            with track_progress(total=1000, clock=clock, checkpoint=Checkpoint(self.path, every_n_records=1000)) as tracker:
+                tracker.advance(300)
+                clock.advance(seconds=3)
+                raise Interrupted()
+        self.assertEqual(self.load()["records_seen"], 300)
+
+        tracker = track_progress(total=1000, clock=clock, checkpoint=Checkpoint(self.path, every_n_records=1000))
+        tracker.start()
+        self.assertEqual(tracker.records_seen, 300)
+        self.assertEqual(tracker.resumed_records, 300)
+        self.assertEqual(tracker.snapshot()["time_taken"], timedelta(seconds=3))
+
+    def test_weighted_records_are_rejected(self):
+        with self.assertRaises(ValueError):
+            track_progress(["a", "b"], weight=len, checkpoint=Checkpoint(self.path, every_n_records=100))
+
+    def test_time_cadence_does_not_check_every_record(self):
+        clock = FakeClock()
+        checkpoint = Checkpoint(self.path, every_n_seconds=10)
+        tracker = track_progress(range(10000), clock=clock, checkpoint=checkpoint)
+        checks = 0
+        for _ in tracker:
+            clock.advance(nanoseconds=10000000)  # 100 records per second
+            if tracker.records_seen >= tracker.next_checkpoint_record:
+                checks += 1
+        self.assertIn(checkpoint.saves, range(8, 11))
+        self.assertLess(checks, 200)
+
+    def test_estimator_state(self):
+        for estimator_type in [EWMARate, SlidingWindowRate]:
+            estimator = estimator_type()
+            for second in range(20):
+                estimator.update(seconds_to_ns(second), second * 3)
+            restored = estimator_type()
+            restored.set_state(json.loads(json.dumps(estimator.get_state(seconds_to_ns(25)))), seconds_to_ns(1000))
+            self.assertEqual(restored.rate(), estimator.rate())
+            estimator.update(seconds_to_ns(30), 100)
+            restored.update(seconds_to_ns(1005), 100)
+            self.assertEqual(restored.rate(), estimator.rate())
+
+    def test_unsupported_version(self):
+        with open(self.path, "w") as file:
+            json.dump({"version": 99}, file)
+        with self.assertRaises(ValueError):
+            Checkpoint(self.path).load()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,107 @@
+import concurrent.futures
+import threading
+import unittest
+
+from progress_tracker import ConcurrentProgressTracker, disable, enable, track_progress_concurrently
+from progress_tracker.progress_tracker import REPORT_LAST_RECORD
+
+NUMBER_OF_THREADS = 8
+
+
+class ConcurrentProgressTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.reports = []
+
+    def record_report(self, report, reasons):
+        self.reports.append((report["records_seen"], reasons))
+        return ""
+
+    def test_update_from_many_threads(self):
+        NUMBER_OF_ITERATIONS = 20000
+
+        with ConcurrentProgressTracker(total=NUMBER_OF_ITERATIONS * NUMBER_OF_THREADS, every_n_percent=10, callback=lambda _: None, format_callback=self.record_report) as tracker:
+            def work():
+                for _ in range(NUMBER_OF_ITERATIONS):
+                    tracker.update()
+
+            threads = [threading.Thread(target=work) for _ in range(NUMBER_OF_THREADS)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(tracker.records_seen, NUMBER_OF_ITERATIONS * NUMBER_OF_THREADS)
+        records_reported = [records_seen for records_seen, _ in self.reports]
+        self.assertEqual(records_reported, sorted(set(records_reported)))
+        self.assertGreaterEqual(len(self.reports), 5)
+        self.assertLessEqual(len(self.reports), 10)
+        self.assertEqual(tracker.reports_raised, len(self.reports))
+
+    def test_unbalanced_load(self):
+        # The thread that does most of the work finishes while the other thread is still short of its merge point.
+        with ConcurrentProgressTracker(total=163, every_n_percent=10, callback=lambda _: None, format_callback=self.record_report) as tracker:
+            registered = threading.Barrier(2)
+            busy_thread_done = threading.Event()
+
+            def work(updates, busy):
+                tracker.register_thread()
+                registered.wait()
+                if not busy:
+                    busy_thread_done.wait()
+                for _ in range(updates):
+                    tracker.update()
+                if busy:
+                    busy_thread_done.set()
+
+            threads = [threading.Thread(target=work, args=(159, True)), threading.Thread(target=work, args=(4, False))]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(tracker.records_seen, 163)
+        self.assertEqual(self.reports[-1][0], 163)
+
+    def test_map(self):
+        with concurrent.futures.ThreadPoolExecutor(NUMBER_OF_THREADS) as executor:
+            with track_progress_concurrently(total=1000, every_n_records=100, report_last_record=True, callback=lambda _: None, format_callback=self.record_report) as tracker:
+                results = list(tracker.map(executor, lambda x: x * 2, range(1000)))
+        self.assertEqual(results, [x * 2 for x in range(1000)])
+        self.assertEqual(tracker.records_seen, 1000)
+        self.assertEqual(self.reports[-1][0], 1000)
+
+    def test_as_completed(self):
+        with concurrent.futures.ThreadPoolExecutor(NUMBER_OF_THREADS) as executor:
+            futures = [executor.submit(pow, x, 2) for x in range(50)]
+            with track_progress_concurrently(total=50, report_last_record=True, callback=lambda _: None, format_callback=self.record_report) as tracker:
+                results = sorted(future.result() for future in tracker.as_completed(futures))
+        self.assertEqual(results, [x ** 2 for x in range(50)])
+        self.assertEqual(self.reports, [(50, frozenset([REPORT_LAST_RECORD]))])
+
+    def test_iteration(self):
+        results = list(track_progress_concurrently(range(10), every_n_records=5, callback=lambda _: None, format_callback=self.record_report))
+        self.assertEqual(results, list(range(10)))
+        self.assertEqual([records_seen for records_seen, _ in self.reports], [5, 10])
+
+    def test_time_conditions_need_a_watchdog(self):
+        for condition in ["every_n_seconds", "every_n_seconds_idle", "every_n_seconds_since_report"]:
+            with self.assertRaises(ValueError):
+                track_progress_concurrently(watchdog=False, **{condition: 1})
+        tracker = track_progress_concurrently(watchdog=False, every_n_seconds=1, sample_tolerance=0.1)
+        self.assertIsNone(tracker.watchdog)
+
+    def test_disabled(self):
+        disable()
+        self.addCleanup(enable)
+        with concurrent.futures.ThreadPoolExecutor(NUMBER_OF_THREADS) as executor:
+            tracker = track_progress_concurrently(total=100, every_n_records=1, callback=lambda _: None, format_callback=self.record_report)
+            results = list(tracker.map(executor, lambda x: x * 2, range(100)))
+        self.assertEqual(results, [x * 2 for x in range(100)])
+        self.assertEqual(tracker.records_seen, 0)
+        self.assertEqual(tracker.cells, [])
+        self.assertIsNone(tracker.start_ns)
+        self.assertEqual(self.reports, [])
+
+
+if __name__ == '__main__':
+    unittest.main()
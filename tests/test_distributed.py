@@ -0,0 +1,107 @@
+import os
+import socket
+import tempfile
+import threading
+import time
+import unittest
+
+from progress_tracker import FakeClock, Watchdog, track_shard, track_shards
+from progress_tracker.distributed import per_shard_format_callback
+
+
+def records_seen(report, reasons):
+    return report["records_seen"]
+
+
+class DistributedProgressTrackerTests(unittest.TestCase):
+    def run_shard(self, address, name, records, interval=60):
+        for _ in track_shard(range(records), address, shard=name, interval=interval):
+            pass
+
+    def wait_until_done(self, aggregator, name):
+        # The aggregator receives the batches on its own thread.
+        deadline = time.monotonic() + 10
+        while name not in aggregator.shards_done and time.monotonic() < deadline:
+            time.sleep(0.001)
+
+    def test_combined_progress(self):
+        reports = []
+        with track_shards(shards=2, total=100, every_n_percent=25, callback=reports.append, format_callback=records_seen) as aggregator:
+            # With a long interval, each shard only sends a single batch, when it completes.
+            self.run_shard(aggregator.address, "a", 40)
+            self.wait_until_done(aggregator, "a")
+            self.run_shard(aggregator.address, "b", 60)
+            self.assertTrue(aggregator.wait(10))
+        self.assertEqual(reports, [40, 100])
+        self.assertEqual(aggregator.snapshot()["shard_records"], {"a": 40, "b": 60})
+
+    def test_shards_in_parallel(self):
+        with track_shards(shards=4) as aggregator:
+            threads = [
+                threading.Thread(target=self.run_shard, args=(aggregator.address, "shard{}".format(index), 1000), kwargs={"interval": 0.001})
+                for index in range(4)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            self.assertTrue(aggregator.wait(10))
+        report = aggregator.snapshot()
+        self.assertEqual(report["records_seen"], 4000)
+        self.assertEqual(report["total"], 4000)  # The sum of the totals that the shards sent.
+        self.assertEqual(sorted(report["shard_items_per_second"]), ["shard0", "shard1", "shard2", "shard3"])
+
+    def test_batches_are_sent_at_an_interval(self):
+        watchdog = Watchdog()
+        with track_shards(shards=1) as aggregator:
+            with track_shard(address=aggregator.address, shard="a", interval=60, watchdog=watchdog) as shard:
+                for _ in range(1000):
+                    shard.advance()
+                self.assertEqual(shard.records_sent, 0)
+                self.assertEqual(aggregator.records_seen, 0)
+            self.assertTrue(aggregator.wait(10))
+        self.assertEqual(shard.batches_sent, 2)  # Connecting, then the final batch.
+        self.assertEqual(aggregator.records_seen, 1000)
+
+    def test_batches_are_not_sent_from_the_trackers_watchdog(self):
+        watchdog = Watchdog()
+        shard = track_shard(address=("127.0.0.1", 1), watchdog=watchdog)
+        self.assertIsNot(shard.sender, watchdog)
+        self.assertIsNot(shard.sender, Watchdog.shared())
+        self.assertIs(shard.sender, track_shard(address=("127.0.0.1", 1)).sender)
+
+    def test_per_shard_rates(self):
+        clock = FakeClock()
+        reports = []
+        with track_shards(shards=1, every_n_percent=50, clock=clock, callback=reports.append, format_callback=per_shard_format_callback) as aggregator:
+            clock.advance(seconds=2)
+            self.run_shard(aggregator.address, "a", 10)
+            self.assertTrue(aggregator.wait(10))
+        self.assertEqual(reports, ["10/10 (100.0%) in 0:00:02 (Time left: 0:00:00) [Per shard: a: 5.0/s]"])
+
+    @unittest.skipUnless(hasattr(socket, "AF_UNIX"), "Unix domain sockets are not available.")
+    def test_unix_domain_socket(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "progress.sock")
+            with track_shards(path, shards=1) as aggregator:
+                self.assertEqual(aggregator.address, path)
+                self.run_shard(path, "a", 10)
+                self.assertTrue(aggregator.wait(10))
+            self.assertEqual(aggregator.records_seen, 10)
+            self.assertFalse(os.path.exists(path))
+
+    def test_unreachable_aggregator(self):
+        with track_shards() as aggregator:
+            address = aggregator.address
+        shard = track_shard(range(10), address, interval=60)
+        self.assertEqual(list(shard), list(range(10)))
+        self.assertEqual(shard.send_errors, 2)
+        self.assertEqual(shard.records_sent, 0)
+
+    def test_address_is_required(self):
+        with self.assertRaises(TypeError):
+            track_shard(range(3))
+
+
+if __name__ == '__main__':
+    unittest.main()
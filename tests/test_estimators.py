@@ -0,0 +1,92 @@
+import unittest
+from datetime import timedelta
+
+from progress_tracker import FakeClock, track_progress
+from progress_tracker.estimators import CumulativeRate, EWMARate, RateEstimator, SlidingWindowRate
+
+SECOND = 1000000000
+
+
+class EstimatorTests(unittest.TestCase):
+    def test_cumulative(self):
+        estimator = CumulativeRate()
+        self.assertIsNone(estimator.rate())
+        estimator.start(0, 0)
+        self.assertIsNone(estimator.rate())
+        estimator.update(2 * SECOND, 10)
+        estimator.update(4 * SECOND, 100)
+        self.assertEqual(estimator.rate(), 25)
+
+    def test_ewma_follows_changes_in_rate(self):
+        estimator = EWMARate(half_life=1)
+        estimator.start(0, 0)
+        estimator.update(SECOND, 100)
+        self.assertEqual(estimator.rate(), 100)
+        estimator.update(2 * SECOND, 100 + 300)  # Rate of 300 for one half life
+        self.assertEqual(estimator.rate(), 200)
+        for second in range(3, 20):
+            estimator.update(second * SECOND, 400 + (second - 2) * 300)
+        self.assertAlmostEqual(estimator.rate(), 300, places=2)
+
+    def test_ewma_ignores_samples_without_elapsed_time(self):
+        estimator = EWMARate()
+        estimator.start(0, 0)
+        estimator.update(0, 10)
+        self.assertIsNone(estimator.rate())
+
+    def test_sliding_window(self):
+        estimator = SlidingWindowRate(size=3)
+        estimator.start(0, 0)
+        self.assertIsNone(estimator.rate())
+        estimator.update(SECOND, 1000)
+        self.assertEqual(estimator.rate(), 1000)
+        estimator.update(2 * SECOND, 1010)
+        estimator.update(3 * SECOND, 1020)  # The sample at 0 seconds has left the window
+        self.assertEqual(estimator.rate(), 10)
+
+    def test_sliding_window_size(self):
+        with self.assertRaises(ValueError):
+            SlidingWindowRate(size=1)
+
+
+class SmoothedReportTests(unittest.TestCase):
+    def test_defaults_to_cumulative(self):
+        clock = FakeClock()
+        reports = []
+        for _ in track_progress(range(4), every_n_records=2, clock=clock, callback=reports.append, format_callback=lambda report, _reasons: report):
+            clock.advance(seconds=1)
+        self.assertEqual(reports[0]["smoothed_items_per_second"], reports[0]["items_per_second"])
+        self.assertEqual(reports[0]["smoothed_estimated_time_remaining"], timedelta(seconds=2))
+
+    def test_sliding_window_reacts_to_slowdown(self):
+        clock = FakeClock()
+        reports = []
+        for i in track_progress(range(100), total=100, every_n_records=10, rate_estimator=SlidingWindowRate(size=2), clock=clock, callback=reports.append, format_callback=lambda report, _reasons: report):
+            clock.advance(seconds=0.01 if i < 50 else 1)
+        last_report = reports[-2]  # At 90 records
+        self.assertAlmostEqual(last_report["smoothed_items_per_second"], 1)
+        self.assertAlmostEqual(last_report["smoothed_estimated_time_remaining"].total_seconds(), 10)
+        self.assertGreater(last_report["items_per_second"], 1.5)
+
+    def test_cumulative_rate_is_only_calculated_when_used(self):
+        clock = FakeClock()
+        estimator = CumulativeRate()
+        estimator.update = estimator.rate = None  # Not called.
+        reports = []
+        for _ in track_progress(range(4), every_n_records=2, rate_estimator=estimator, clock=clock, callback=reports.append):
+            clock.advance(seconds=1)
+        self.assertEqual(len(reports), 2)
+
+    def test_estimators_must_implement_update_and_rate(self):
+        class NoRate(RateEstimator):
+            def update(self, now_ns, records_seen):
+                pass
+
+        with self.assertRaises(TypeError):
+            RateEstimator()
+        with self.assertRaises(TypeError):
+            NoRate()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from progress_tracker import EventLog, FakeClock, read_events, track_progress
+from progress_tracker.events import END_EVENT, EVENT, MAGIC, START_EVENT, TOTAL_EVENT, Event
+from progress_tracker.progress_tracker import EVERY_N_PERCENT, REASON_BITS
+
+
+class EventLogTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "events.log")
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_round_trip(self):
+        with EventLog(self.path) as log:
+            log.record(1, 2, 3)
+            log.record(-4, 2 ** 64 - 1, 2 ** 32 - 1)
+        self.assertEqual(list(read_events(self.path)), [Event(1, 2, 3), Event(-4, 2 ** 64 - 1, 2 ** 32 - 1)])
+        self.assertEqual(os.path.getsize(self.path), len(MAGIC) + 2 * EVENT.size)
+
+    def test_events_are_buffered(self):
+        log = EventLog(self.path, buffer_events=3)
+        log.record(1, 1, 0)
+        log.record(2, 2, 0)
+        self.assertEqual(list(read_events(self.path)), [])
+        log.record(3, 3, 0)
+        self.assertEqual(len(log.events), 0)
+        self.assertEqual([event.records_seen for event in read_events(self.path)], [1, 2, 3])
+        log.record(4, 4, 0)
+        log.close()
+        self.assertEqual([event.records_seen for event in read_events(self.path)], [1, 2, 3, 4])
+
+    def test_appends_to_an_existing_log(self):
+        for records_seen in [1, 2]:
+            with EventLog(self.path) as log:
+                log.record(0, records_seen, 0)
+        self.assertEqual([event.records_seen for event in read_events(self.path)], [1, 2])
+
+    def test_partly_written_event_is_ignored(self):
+        with EventLog(self.path) as log:
+            log.record(1, 1, 0)
+        with open(self.path, "ab") as file:
+            file.write(EVENT.pack(2, 2, 0)[:7])
+        self.assertEqual(list(read_events(self.path)), [Event(1, 1, 0)])
+
+    def test_not_an_event_log(self):
+        with open(self.path, "wb") as file:
+            file.write(b"records_seen,time\n")
+        with self.assertRaises(ValueError):
+            list(read_events(self.path))
+
+    def test_tracker_activity(self):
+        clock = FakeClock()
+        with EventLog(self.path, every_n_records=30) as log:
+            for _ in track_progress(range(100), every_n_percent=50, report_last_record=True, clock=clock, event_log=log, callback=lambda message: None):
+                clock.advance(seconds=1)
+        self.assertEqual(list(read_events(self.path)), [
+            Event(0, 100, TOTAL_EVENT),
+            Event(0, 0, START_EVENT),
+            Event(30000000000, 30, 0),
+            Event(50000000000, 50, REASON_BITS[EVERY_N_PERCENT]),
+            Event(60000000000, 60, 0),
+            Event(90000000000, 90, 0),
+            Event(100000000000, 100, REASON_BITS[EVERY_N_PERCENT]),  # The last record was already reported.
+            Event(100000000000, 100, END_EVENT),
+        ])
+
+    def test_estimated_totals_are_logged(self):
+        with EventLog(self.path) as log:
+            for _ in track_progress(iter(range(300)), total_estimator=lambda records_seen: 100 if records_seen < 100 else 300, event_log=log):
+                pass
+        totals = [event.records_seen for event in read_events(self.path) if event.mask & TOTAL_EVENT]
+        self.assertEqual(totals, [100, 300])
+
+    def test_not_a_pass_through(self):
+        with EventLog(self.path) as log:
+            tracker = track_progress(range(10), event_log=log)
+            for _ in tracker:
+                pass
+        self.assertEqual([event.mask for event in read_events(self.path)], [TOTAL_EVENT, START_EVENT, END_EVENT])
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            EventLog(self.path, every_n_records=0)
+        with self.assertRaises(ValueError):
+            EventLog(self.path, buffer_events=0)
+
+
+if __name__ == '__main__':
+    unittest.main()
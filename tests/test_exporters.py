@@ -0,0 +1,126 @@
+import socket
+import unittest
+import urllib.error
+import urllib.request
+
+from progress_tracker import FakeClock, PrometheusExporter, StatsDExporter, Watchdog, track_progress
+
+
+def started_tracker(records_seen, total=None):
+    clock = FakeClock()
+    tracker = track_progress(total=total, callback=lambda message: None, clock=clock)
+    tracker.start()
+    tracker.advance(records_seen)
+    clock.advance(seconds=10)
+    return tracker
+
+
+class PrometheusExporterTests(unittest.TestCase):
+    def test_render(self):
+        exporter = PrometheusExporter()
+        exporter.register(started_tracker(25, total=100), name="load")
+        exporter.register(started_tracker(7), name='say "hi"')
+        self.assertEqual(exporter.render(), "".join(line + "\n" for line in [
+            "# HELP progress_tracker_records_seen_total The number of records processed so far.",
+            "# TYPE progress_tracker_records_seen_total counter",
+            'progress_tracker_records_seen_total{tracker="load"} 25',
+            'progress_tracker_records_seen_total{tracker="say \\"hi\\""} 7',
+            "# HELP progress_tracker_total_records The total number of records to process.",
+            "# TYPE progress_tracker_total_records gauge",
+            'progress_tracker_total_records{tracker="load"} 100',
+            "# HELP progress_tracker_percent_complete The percentage of records processed so far.",
+            "# TYPE progress_tracker_percent_complete gauge",
+            'progress_tracker_percent_complete{tracker="load"} 25.0',
+            "# HELP progress_tracker_items_per_second The number of records processed per second, since processing started.",
+            "# TYPE progress_tracker_items_per_second gauge",
+            'progress_tracker_items_per_second{tracker="load"} 2.5',
+            'progress_tracker_items_per_second{tracker="say \\"hi\\""} 0.7',
+            "# HELP progress_tracker_estimated_seconds_remaining The estimated number of seconds needed to process the rest of the records.",
+            "# TYPE progress_tracker_estimated_seconds_remaining gauge",
+            'progress_tracker_estimated_seconds_remaining{tracker="load"} 30.0',
+            "# HELP progress_tracker_elapsed_seconds The number of seconds since processing started.",
+            "# TYPE progress_tracker_elapsed_seconds gauge",
+            'progress_tracker_elapsed_seconds{tracker="load"} 10.0',
+            'progress_tracker_elapsed_seconds{tracker="say \\"hi\\""} 10.0',
+        ]))
+
+    def test_scrape_reads_the_current_counters(self):
+        tracker = started_tracker(1)
+        with PrometheusExporter() as exporter:
+            exporter.register(tracker)
+            url = "http://{}:{}/metrics".format(*exporter.address)
+            with urllib.request.urlopen(url) as response:
+                self.assertIn('progress_tracker_records_seen_total{tracker="default"} 1\n', response.read().decode("utf-8"))
+            tracker.advance(41)
+            with urllib.request.urlopen(url) as response:
+                self.assertIn('progress_tracker_records_seen_total{tracker="default"} 42\n', response.read().decode("utf-8"))
+            with self.assertRaises(urllib.error.HTTPError):
+                urllib.request.urlopen("http://{}:{}/nonsense".format(*exporter.address))
+
+    def test_snapshot_has_no_side_effects(self):
+        reports = []
+        tracker = track_progress(list(range(10)), every_n_records=5, callback=lambda message: None,
+                                 format_callback=lambda report, reasons: reports.append(report) or "")
+        exporter = PrometheusExporter()
+        exporter.register(tracker)
+        exporter.render()
+        for _ in tracker:
+            exporter.render()
+        self.assertEqual([report["records_seen"] for report in reports], [5, 10])
+        self.assertIn('progress_tracker_records_seen_total{tracker="default"} 10\n', exporter.render())
+
+
+class StatsDExporterTests(unittest.TestCase):
+    def setUp(self):
+        self.listener = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.listener.bind(("127.0.0.1", 0))
+        self.listener.settimeout(5)
+        self.addCleanup(self.listener.close)
+
+    def receive(self):
+        return self.listener.recv(65536).decode("utf-8").split("\n")
+
+    def test_flush(self):
+        exporter = StatsDExporter(port=self.listener.getsockname()[1], watchdog=Watchdog())
+        self.addCleanup(exporter.close)
+        exporter.register(started_tracker(25, total=100), name="load")
+        exporter.flush()
+        self.assertEqual(self.receive(), [
+            "progress_tracker.load.records_seen_total:25|g",
+            "progress_tracker.load.total_records:100|g",
+            "progress_tracker.load.percent_complete:25.0|g",
+            "progress_tracker.load.items_per_second:2.5|g",
+            "progress_tracker.load.estimated_seconds_remaining:30.0|g",
+            "progress_tracker.load.elapsed_seconds:10.0|g",
+        ])
+
+    def test_names_are_sanitized(self):
+        exporter = StatsDExporter(port=self.listener.getsockname()[1], watchdog=Watchdog())
+        self.addCleanup(exporter.close)
+        exporter.register(started_tracker(7), name='say "hi":|#1')
+        exporter.flush()
+        self.assertEqual(self.receive()[0], "progress_tracker.say__hi____1.records_seen_total:7|g")
+
+    def test_splits_packets(self):
+        exporter = StatsDExporter(port=self.listener.getsockname()[1], watchdog=Watchdog(), max_packet_size=100)
+        self.addCleanup(exporter.close)
+        exporter.register(started_tracker(25, total=100), name="load")
+        exporter.flush()
+        lines = []
+        while len(lines) < 6:
+            lines.extend(self.receive())
+        self.assertEqual(len(lines), 6)
+
+    def test_sends_periodically(self):
+        exporter = StatsDExporter(port=self.listener.getsockname()[1], watchdog=Watchdog(), interval=0.01)
+        self.addCleanup(exporter.close)
+        tracker = exporter.register(started_tracker(1))
+        with exporter:
+            self.assertIn("progress_tracker.default.records_seen_total:1|g", self.receive())
+            tracker.advance(1)
+            while "progress_tracker.default.records_seen_total:2|g" not in self.receive():
+                pass
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import gc
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import warnings
+
+from progress_tracker import FakeClock, track_file
+
+LINES = [("line %d\n" % index).encode("ascii") for index in range(1000)]
+
+
+class FileProgressTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.path = os.path.join(self.directory, "records.txt")
+        with open(self.path, "wb") as file:
+            file.write(b"".join(LINES) + b"no line break at the end")
+        self.size = os.path.getsize(self.path)
+
+    def test_lines(self):
+        tracker = track_file(self.path, chunk_size=100)
+        self.assertEqual(tracker.total, self.size)
+        self.assertEqual(list(tracker), LINES + [b"no line break at the end"])
+        self.assertEqual(tracker.records_seen, self.size)
+        self.assertTrue(tracker.file.closed)
+        self.assertIsNotNone(tracker.total_time)
+
+    def test_modes_read_the_whole_file(self):
+        with open(self.path, "rb") as file:
+            contents = file.read()
+        for mode in ["lines", "chunks", "mmap"]:
+            for chunk_size in [1, 7, 100, 1000000]:
+                tracker = track_file(self.path, mode=mode, chunk_size=chunk_size)
+                self.assertEqual(b"".join(tracker), contents, (mode, chunk_size))
+                self.assertEqual(tracker.records_seen, self.size)
+
+    def test_decoded_lines(self):
+        with open(self.path, "w", encoding="utf-16", newline="") as file:
+            file.write("café\r\nnaïve\rend\n")
+        self.assertEqual(list(track_file(self.path, encoding="utf-16", chunk_size=3)), ["café\n", "naïve\n", "end\n"])
+        self.assertEqual(list(track_file(self.path, encoding="utf-16", newline="", chunk_size=3)), ["café\r\n", "naïve\r", "end\n"])
+
+    def test_counts_once_per_block(self):
+        tracker = track_file(self.path, chunk_size=1000, every_n_records=1)
+        advances = []
+        advance = tracker.advance
+        tracker.advance = lambda n: (advances.append(n), advance(n))
+        lines = list(tracker)
+        self.assertEqual(len(lines), 1001)
+        self.assertEqual(len(advances), -(-self.size // 1000))  # One per 1000 byte block.
+        self.assertEqual(sum(advances), self.size)
+
+    def test_reports(self):
+        clock = FakeClock()
+        reports = []
+        tracker = track_file(io.BytesIO(bytes(4000000)), mode="chunks", every_n_percent=50, clock=clock, callback=reports.append)
+        for _ in tracker:
+            clock.advance(seconds=1)
+        self.assertEqual(reports, [
+            "2.0/4.0 MB (50.0%) in 0:00:02 at 1.0 MB/s (Time left: 0:00:02)",
+            "4.0/4.0 MB (100.0%) in 0:00:04 at 1.0 MB/s (Time left: 0:00:00)",
+        ])
+        report = tracker.snapshot()
+        self.assertEqual(report["bytes_seen"], 4000000)
+        self.assertEqual(report["total_megabytes"], 4.0)
+
+    def test_break_early(self):
+        for mode in ["lines", "chunks", "mmap"]:
+            tracker = track_file(self.path, mode=mode, chunk_size=100)
+            with warnings.catch_warnings():
+                warnings.simplefilter("error", ResourceWarning)
+                for _ in tracker:
+                    break
+                gc.collect()
+            self.assertTrue(tracker.file.closed, mode)
+            self.assertIsNotNone(tracker.end_ns, mode)
+            self.assertTrue(tracker.failed, mode)
+
+    def test_file_object(self):
+        stream = io.BytesIO(b"skipped\n" + b"".join(LINES))
+        stream.readline()
+        tracker = track_file(stream)
+        self.assertEqual(tracker.total, self.size - len(b"no line break at the end"))
+        self.assertEqual(list(tracker), LINES)
+        self.assertFalse(stream.closed)
+
+    def test_unknown_size(self):
+        stream = io.BufferedReader(io.BytesIO(b"".join(LINES)))
+        stream.seekable = lambda: False
+        tracker = track_file(stream, every_n_records=1000)
+        self.assertIsNone(tracker.total)
+        self.assertEqual(len(list(tracker)), len(LINES))
+
+    def test_update_position(self):
+        with open(self.path, "rb") as file:
+            file.readline()
+            with track_file(file) as tracker:
+                file.read(100)
+                tracker.update_position()
+                self.assertEqual(tracker.records_seen, 100)
+                self.assertEqual(tracker.total, self.size - len(LINES[0]))
+
+    def test_invalid_arguments(self):
+        with self.assertRaises(ValueError):
+            track_file(io.BytesIO(), mode="words")
+        with self.assertRaises(ValueError):
+            track_file(io.BytesIO(), mode="chunks", encoding="utf-8")
+        with self.assertRaises(TypeError):
+            track_file(io.BytesIO(), weight=len)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import random
+import unittest
+from datetime import timedelta
+
+from progress_tracker import FakeClock, track_progress
+from progress_tracker.histogram import DEFAULT_HIGHEST_VALUE, LogHistogram, bucket_highest_value, bucket_index
+
+
+class LogHistogramTests(unittest.TestCase):
+    def test_buckets_cover_every_value(self):
+        values = list(range(0, 5000)) + [random.randrange(DEFAULT_HIGHEST_VALUE) for _ in range(10000)]
+        for value in values:
+            index = bucket_index(value)
+            self.assertGreaterEqual(bucket_highest_value(index), value)
+            if index > 0:
+                self.assertLess(bucket_highest_value(index - 1), value)
+
+    def test_quantiles(self):
+        histogram = LogHistogram()
+        self.assertEqual(histogram.quantiles([0.5]), [None])
+        for value in range(1, 10001):
+            histogram.record(value * 1000)
+        self.assertEqual(histogram.count, 10000)
+        self.assertEqual(histogram.max, 10000000)
+        p50, p99, p100 = histogram.quantiles([0.5, 0.99, 1])
+        self.assertAlmostEqual(p50 / 5000000, 1, delta=0.035)
+        self.assertAlmostEqual(p99 / 9900000, 1, delta=0.035)
+        self.assertEqual(p100, 10000000)
+
+    def test_values_above_highest_value(self):
+        histogram = LogHistogram(highest_value=1000)
+        histogram.record(10 ** 9)
+        self.assertEqual(histogram.count, 1)
+        self.assertEqual(histogram.max, 10 ** 9)
+
+    def test_add_and_reset(self):
+        first, second = LogHistogram(), LogHistogram()
+        first.record(10)
+        second.record(20)
+        second.record(30)
+        first.add(second)
+        self.assertEqual(first.count, 3)
+        self.assertEqual(first.max, 30)
+        second.reset()
+        self.assertEqual(second.count, 0)
+        self.assertEqual(second.quantile(0.5), None)
+
+
+class LatencyReportTests(unittest.TestCase):
+    def test_latency_quantiles(self):
+        clock = FakeClock()
+        reports = []
+        for i in track_progress(range(200), every_n_records=100, track_latency=True, clock=clock, callback=reports.append, format_callback=lambda report, _reasons: report):
+            clock.advance(seconds=0.001 if i < 100 else 0.1)
+
+        first, second = reports
+        self.assertEqual(first["latency_max"], timedelta(milliseconds=1))
+        self.assertAlmostEqual(first["interval_latency_p50"] / timedelta(milliseconds=1), 1, delta=0.035)
+        self.assertAlmostEqual(second["interval_latency_p50"] / timedelta(milliseconds=100), 1, delta=0.035)
+        self.assertAlmostEqual(second["latency_p50"] / timedelta(milliseconds=1), 1, delta=0.035)
+        self.assertAlmostEqual(second["latency_p95"] / timedelta(milliseconds=100), 1, delta=0.035)
+        self.assertEqual(second["latency_max"], timedelta(milliseconds=100))
+
+    def test_not_reported_by_default(self):
+        reports = []
+        list(track_progress(range(2), every_n_records=1, callback=reports.append, format_callback=lambda report, _reasons: report))
+        self.assertNotIn("latency_p50", reports[0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+import multiprocessing
+import unittest
+
+from progress_tracker import multiprocess
+from progress_tracker.multiprocess import MultiprocessProgressTracker, per_worker_format_callback
+from progress_tracker.progress_tracker import REPORT_LAST_RECORD
+
+RECORDS_PER_TASK = 1000
+
+
+def process_task(_task):
+    for _ in range(RECORDS_PER_TASK):
+        multiprocess.update()
+    return multiprocess.worker_counter.slot
+
+
+def process_in_process(counter, records):
+    for _ in range(records):
+        counter.update()
+
+
+class MultiprocessProgressTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.reports = []
+
+    def record_report(self, report, reasons):
+        self.reports.append((report, reasons))
+        return ""
+
+    def test_pool(self):
+        NUMBER_OF_WORKERS = 3
+        NUMBER_OF_TASKS = 12
+
+        with MultiprocessProgressTracker(NUMBER_OF_WORKERS, poll_interval=0.01, total=NUMBER_OF_TASKS * RECORDS_PER_TASK, every_n_percent=50, report_last_record=True, callback=lambda _: None, format_callback=self.record_report) as tracker:
+            with multiprocessing.Pool(NUMBER_OF_WORKERS, initializer=tracker.initializer, initargs=tracker.initargs) as pool:
+                slots = pool.map(process_task, range(NUMBER_OF_TASKS))
+
+        self.assertTrue(set(slots) <= set(range(NUMBER_OF_WORKERS)))
+        self.assertEqual(tracker.records_seen, NUMBER_OF_TASKS * RECORDS_PER_TASK)
+        self.assertEqual(sum(tracker.worker_records()), NUMBER_OF_TASKS * RECORDS_PER_TASK)
+        final_report, _ = self.reports[-1]
+        self.assertEqual(final_report["records_seen"], NUMBER_OF_TASKS * RECORDS_PER_TASK)
+        self.assertEqual(final_report["worker_records"], tracker.worker_records())
+        self.assertEqual(len(final_report["worker_items_per_second"]), NUMBER_OF_WORKERS)
+
+    def test_processes(self):
+        with MultiprocessProgressTracker(2, poll_interval=0.01, report_last_record=True, callback=lambda _: None, format_callback=self.record_report) as tracker:
+            processes = [multiprocessing.Process(target=process_in_process, args=(tracker.worker(slot), 100 * (slot + 1))) for slot in range(2)]
+            for process in processes:
+                process.start()
+            for process in processes:
+                process.join()
+
+        self.assertEqual(tracker.worker_records(), [100, 200])
+        self.assertEqual(len(self.reports), 1)
+        report, reasons = self.reports[0]
+        self.assertEqual(report["records_seen"], 300)
+        self.assertEqual(reasons, frozenset([REPORT_LAST_RECORD]))
+        self.assertIn("[Per worker: ", per_worker_format_callback(report, reasons))
+
+    def test_requires_watchdog(self):
+        with self.assertRaises(ValueError):
+            MultiprocessProgressTracker(2, watchdog=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+import unittest
+
+from progress_tracker import FakeClock, disable, enable, track_nested
+
+
+class NestedProgressTrackerTests(unittest.TestCase):
+    def test_children_roll_up_into_the_parent(self):
+        clock = FakeClock()
+        reports = []
+        files = {"a": list(range(100)), "b": list(range(300)), "c": []}
+        parent = track_nested(files, every_n_percent=10, clock=clock, callback=reports.append)
+        for name in parent:
+            for _ in parent.child(files[name], name=name):
+                clock.advance(seconds=1)
+        self.assertEqual(reports, [
+            "0.3/3 (10.0%) in 0:00:30 (Time left: 0:04:30) | a: 30/100",
+            "0.6/3 (20.0%) in 0:01:00 (Time left: 0:04:00) | a: 60/100",
+            "0.9/3 (30.0%) in 0:01:30 (Time left: 0:03:30) | a: 90/100",
+            "1.2/3 (40.0%) in 0:02:40 (Time left: 0:04:00) | b: 60/300",
+            "1.5/3 (50.0%) in 0:04:10 (Time left: 0:04:10) | b: 150/300",
+            "1.8/3 (60.0%) in 0:05:40 (Time left: 0:03:46.666667) | b: 240/300",
+            "3.0/3 (100.0%) in 0:06:40 (Time left: 0:00:00)",
+        ])
+
+    def test_shares(self):
+        clock = FakeClock()
+        reports = []
+        with track_nested(total=10, every_n_percent=25, clock=clock, callback=reports.append) as parent:
+            for index in range(3):
+                with parent.child(total=1000, share=3, name="part{}".format(index)) as child:
+                    for _ in range(10):
+                        child.advance(100)
+                        clock.advance(seconds=1)
+            parent.advance(1000)  # The last share, without a child.
+        self.assertEqual(reports, [
+            "2.7/10 (27.0%) in 0:00:08 (Time left: 0:00:21.629630) | part0: 900/1000",
+            "5.1/10 (51.0%) in 0:00:16 (Time left: 0:00:15.372549) | part1: 700/1000",
+            "7.5/10 (75.0%) in 0:00:24 (Time left: 0:00:08) | part2: 500/1000",
+            "10.0/10 (100.0%) in 0:00:30 (Time left: 0:00:00)",
+        ])
+        self.assertEqual(parent.snapshot()["records_seen"], 10)
+
+    def test_every_n_records_counts_shares(self):
+        reports = []
+        parent = track_nested(range(10), every_n_records=4, callback=reports.append, format_callback=lambda report, reasons: report["records_seen"])
+        for _ in parent:
+            pass
+        self.assertEqual(reports, [4, 8])
+
+    def test_children_are_pooled(self):
+        parent = track_nested(range(1000))
+        children = set()
+        for item in parent:
+            child = parent.child(range(item))
+            children.add(id(child))
+            self.assertEqual(sum(1 for _ in child), item)
+            self.assertEqual(child.records_seen, item)
+        self.assertEqual(len(children), 1)
+        self.assertEqual(parent.active_children, [])
+        self.assertEqual(parent.records_seen, 1000 * parent.resolution)
+
+    def test_small_children_only_roll_up_when_complete(self):
+        parent = track_nested(total=1000, every_n_percent=10, callback=lambda message: None)
+        advances = []
+        advance = parent.advance
+        parent.advance = lambda n: (advances.append(n), advance(n))
+        with parent:
+            for _ in range(20):
+                for _ in parent.child(range(1000)):
+                    pass
+        self.assertEqual(advances, [1000] * 20)
+
+    def test_failed_child_only_adds_processed_records(self):
+        parent = track_nested(total=2)
+        with self.assertRaises(KeyError):
+            with parent:
+                with parent.child(total=10) as child:
+                    child.advance(4)
+                    raise KeyError()
+        self.assertEqual(parent.records_seen, 400)
+
+    def test_unsized_children(self):
+        reports = []
+        parent = track_nested(total=2, every_n_percent=10, callback=reports.append, format_callback=lambda report, reasons: report["records_seen"])
+        with parent:
+            for _ in range(2):
+                for _ in parent.child(iter(range(100))):
+                    pass
+        self.assertEqual(reports, [1, 2])
+
+    def test_disabled(self):
+        disable()
+        try:
+            parent = track_nested(range(3), every_n_records=1)
+            for _ in parent:
+                self.assertEqual(list(parent.child(range(5))), list(range(5)))
+            self.assertEqual(parent.records_seen, 0)
+            self.assertEqual(parent.active_children, [])
+        finally:
+            enable()
+
+    def test_weight_is_rejected(self):
+        with self.assertRaises(TypeError):
+            track_nested(range(3), weight=len)
+
+
+if __name__ == '__main__':
+    unittest.main()
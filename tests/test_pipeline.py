@@ -0,0 +1,71 @@
+import unittest
+
+from progress_tracker import FakeClock, disable, enable, track_pipeline
+
+
+class PipelineProgressTrackerTests(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def read(self, n):
+        for record in range(n):
+            self.clock.advance(seconds=1)
+            yield record
+
+    def parse(self, records):
+        for record in records:
+            self.clock.advance(seconds=3)
+            yield record
+
+    def keep_even(self, records):
+        for record in records:
+            if record % 2 == 0:
+                self.clock.advance(seconds=1)
+                yield record
+
+    def run_pipeline(self, tracker, n=100):
+        records = tracker.stage("read", self.read(n))
+        records = tracker.stage("parse", self.parse(records))
+        for _ in tracker.stage("filter", self.keep_even(records)):
+            self.clock.advance(seconds=2)
+
+    def test_time_is_attributed_to_stages(self):
+        tracker = track_pipeline(consumer_name="write", clock=self.clock)
+        self.run_pipeline(tracker)
+        stages = tracker.snapshot()["stages"]
+        self.assertEqual([stage["name"] for stage in stages], ["read", "parse", "filter", "write"])
+        self.assertEqual([stage["records"] for stage in stages], [100, 100, 50, 50])
+        # 100s reading, 300s parsing, 50s filtering and 100s writing.
+        self.assertEqual([round(stage["time_share"], 2) for stage in stages], [18.18, 54.55, 9.09, 18.18])
+        self.assertEqual([stage["items_per_second"] for stage in stages], [1.0, 100 / 300, 1.0, 0.5])
+        self.assertEqual([round(stage["waiting_upstream"], 2) for stage in stages], [0.0, 18.18, 72.73, 81.82])
+        self.assertEqual([round(stage["waiting_downstream"], 2) for stage in stages], [81.82, 27.27, 18.18, 0.0])
+        self.assertEqual(tracker.snapshot()["bottleneck"], "parse")
+
+    def test_reports(self):
+        reports = []
+        tracker = track_pipeline(clock=self.clock, total=50, every_n_percent=50, callback=reports.append)
+        self.run_pipeline(tracker)
+        self.assertEqual(reports, [
+            "25/50 (50.0%) in 0:04:31 (Time left: 0:04:31) [read: 18.2%, parse: 54.6%, filter: 9.3%, loop: 17.8%; Bottleneck: parse]",
+            "50/50 (100.0%) in 0:09:06 (Time left: 0:00:00) [read: 18.2%, parse: 54.6%, filter: 9.2%, loop: 18.0%; Bottleneck: parse]",
+        ])
+        self.assertEqual(tracker.records_seen, 50)
+        self.assertIsNotNone(tracker.total_time)
+
+    def test_iterating_over_the_tracker(self):
+        with self.assertRaises(TypeError):
+            iter(track_pipeline())
+
+    def test_disabled(self):
+        disable()
+        try:
+            tracker = track_pipeline(every_n_records=1)
+            self.assertEqual(list(tracker.stage("read", range(3))), [0, 1, 2])
+            self.assertEqual(tracker.stages, [])
+        finally:
+            enable()
+
+
+if __name__ == '__main__':
+    unittest.main()
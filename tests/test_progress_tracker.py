@@ -1,9 +1,14 @@
+import os
+import subprocess
+import sys
 import time
 import unittest
 import warnings
 
 from collections import Counter
-from progress_tracker import track_progress
+from datetime import timedelta
+from progress_tracker import FakeClock, disable, enable, track_progress
+from progress_tracker.progress_tracker import EVERY_N_PERCENT, EVERY_N_RECORDS, REPORT_FIRST_RECORD, REPORT_LAST_RECORD, records_needed_for_percent
 
 
 class CustomFormatStrings(unittest.TestCase):
@@ -269,5 +274,178 @@ class UnboundedTests(unittest.TestCase):
             continue
 
 
+class CompiledThresholdTests(unittest.TestCase):
+    def test_records_needed_for_percent_matches_float_comparison(self):
+        for total in [1, 3, 7, 99, 100, 101, 1000, 12345]:
+            for percent in [0.1, 1, 3.3, 5, 10, 33.3, 50, 99.9, 100]:
+                expected = next(i for i in range(total + 1) if (i / total) * 100 >= percent) if percent <= 100 else None
+                self.assertEqual(records_needed_for_percent(percent, total), expected, (percent, total))
+
+    def test_reasons_are_shared_frozensets(self):
+        reasons_seen = []
+        for _ in track_progress(range(10), every_n_records=2, report_first_record=True, callback=lambda _: None, format_callback=lambda _report, reasons: reasons_seen.append(reasons) or ""):
+            continue
+        self.assertEqual(reasons_seen[0], frozenset([REPORT_FIRST_RECORD]))
+        self.assertEqual(reasons_seen[1:], [frozenset([EVERY_N_RECORDS])] * 5)
+        self.assertIs(reasons_seen[1], reasons_seen[2])
+
+
+class BatchTests(unittest.TestCase):
+    def setUp(self):
+        self.reports = []
+
+    def record_report(self, report, reasons):
+        self.reports.append((report["records_seen"], reasons))
+        return ""
+
+    def test_advance_crosses_several_boundaries(self):
+        with track_progress(total=100, every_n_records=10, every_n_percent=25, callback=lambda _: None, format_callback=self.record_report) as tracker:
+            tracker.advance(5)
+            tracker.advance(37)  # Crosses 10, 20, 30, 40 and 25%
+            tracker.advance(3)
+            tracker.advance(5)  # Crosses 50 and 50%
+        self.assertEqual(self.reports, [
+            (42, frozenset([EVERY_N_RECORDS, EVERY_N_PERCENT])),
+            (50, frozenset([EVERY_N_RECORDS, EVERY_N_PERCENT])),
+        ])
+        self.assertEqual(tracker.records_seen, 50)
+        self.assertEqual(tracker.next_record_count, 60)
+        self.assertEqual(tracker.next_percent, 75)
+
+    def test_advance_reports_last_record_on_completion(self):
+        with track_progress(every_n_records=10, report_last_record=True, callback=lambda _: None, format_callback=self.record_report) as tracker:
+            tracker.advance(10)
+            tracker.advance(5)
+        self.assertEqual(self.reports, [(10, frozenset([EVERY_N_RECORDS])), (15, frozenset([REPORT_LAST_RECORD]))])
+
+    def test_advance_without_context_manager(self):
+        tracker = track_progress(every_n_records=2, callback=lambda _: None, format_callback=self.record_report)
+        tracker.advance(3)
+        self.assertEqual(self.reports, [(3, frozenset([EVERY_N_RECORDS]))])
+
+    def test_weighted_iteration(self):
+        batches = [list(range(n)) for n in [4, 0, 7, 3, 6]]
+        results = list(track_progress(batches, weight=len, total=20, every_n_percent=50, every_n_records=10, report_last_record=True, callback=lambda _: None, format_callback=self.record_report))
+        self.assertEqual(results, batches)
+        self.assertEqual(self.reports, [
+            (11, frozenset([EVERY_N_PERCENT, EVERY_N_RECORDS])),
+            (20, frozenset([EVERY_N_PERCENT, EVERY_N_RECORDS])),  # Already reported, so no separate last record report
+        ])
+
+    def test_weighted_iteration_ignores_length_of_iterable(self):
+        tracker = track_progress([[1, 2], [3]], weight=len)
+        self.assertIsNone(tracker.total)
+
+    def test_iterating_without_iterable(self):
+        with self.assertRaises(TypeError):
+            list(track_progress(total=10))
+
+
+class FakeClockTests(unittest.TestCase):
+    def setUp(self):
+        self.reports = []
+
+    def test_every_n_seconds(self):
+        clock = FakeClock()
+        for _ in track_progress(range(5), every_n_seconds=1, clock=clock, callback=self.reports.append, format_callback=lambda report, _reasons: report):
+            clock.advance(seconds=0.6)
+        self.assertEqual([report["records_seen"] for report in self.reports], [2, 4])
+        self.assertEqual(self.reports[0]["time_taken"], timedelta(seconds=1.2))
+        self.assertEqual(self.reports[0]["items_per_second"], 2 / 1.2)
+
+    def test_every_n_seconds_idle(self):
+        clock = FakeClock()
+
+        def stalling_source():
+            for i in range(4):
+                if i == 2:
+                    clock.advance(seconds=5)
+                yield i
+
+        for _ in track_progress(stalling_source(), every_n_seconds_idle=2, clock=clock, callback=self.reports.append, format_callback=lambda report, _reasons: report):
+            clock.advance(seconds=0.1)
+        self.assertEqual([report["records_seen"] for report in self.reports], [3])
+        self.assertEqual(self.reports[0]["idle_time"], timedelta(seconds=5))
+
+    def test_total_time(self):
+        clock = FakeClock()
+        # A tracker with nothing to report is a pass-through, which doesn't keep time.
+        tracker = track_progress(range(3), clock=clock, report_last_record=True, callback=lambda message: None)
+        for _ in tracker:
+            clock.advance(seconds=1)
+        self.assertEqual(tracker.total_time, timedelta(seconds=3))
+        self.assertEqual(tracker.end_time - tracker.start_time, timedelta(seconds=3))
+
+
+class PassThroughTests(unittest.TestCase):
+    def test_nothing_to_report(self):
+        records = [1, 2, 3]
+        self.assertIs(type(iter(track_progress(records))), type(iter(records)))
+        self.assertIsNot(type(iter(track_progress(records, report_last_record=True))), type(iter(records)))
+        self.assertIsNot(type(iter(track_progress(records, weight=lambda record: record))), type(iter(records)))
+        with track_progress(records) as tracker:
+            self.assertEqual(list(tracker), records)
+            self.assertEqual(tracker.records_seen, 3)
+
+    def test_disable(self):
+        reports = []
+        disable()
+        self.addCleanup(enable)
+        tracker = track_progress(range(10), every_n_records=1, callback=reports.append)
+        self.assertEqual(list(tracker), list(range(10)))
+        with track_progress(total=10, every_n_records=1, callback=reports.append) as tracker:
+            tracker.advance(5)
+        self.assertEqual(reports, [])
+
+        enable()
+        self.assertEqual(list(track_progress(range(2), every_n_records=1, callback=reports.append)), [0, 1])
+        self.assertEqual(len(reports), 2)
+
+    def test_environment_variable(self):
+        environment = dict(os.environ, PROGRESS_TRACKER_DISABLED="1")
+        output = subprocess.check_output([sys.executable, "-c", "import progress_tracker.progress_tracker as p; print(p.enabled)"], env=environment)
+        self.assertEqual(output.strip(), b"False")
+
+
+class SamplingTests(unittest.TestCase):
+    def test_clock_is_sampled(self):
+        clock = FakeClock()
+        readings = []
+
+        def counting_clock():
+            readings.append(None)
+            return clock()
+
+        reports = []
+        for _ in track_progress(range(10000), every_n_seconds=10, sample_tolerance=0.5, clock=counting_clock,
+                                callback=reports.append, format_callback=lambda report, _reasons: report):
+            clock.advance(seconds=0.01)
+        times = [0] + [report["time_taken"].total_seconds() for report in reports]
+        self.assertEqual(len(reports), 9)
+        for previous, time_taken in zip(times, times[1:]):
+            self.assertGreaterEqual(time_taken - previous, 10)
+            self.assertLessEqual(time_taken - previous, 10.51)
+        self.assertLess(len(readings), 500)
+
+    def test_rate_changes(self):
+        clock = FakeClock()
+        reports = []
+        tracker = track_progress(range(2000), every_n_seconds=1, sample_tolerance=0.1, clock=clock,
+                                 callback=reports.append, format_callback=lambda report, _reasons: report)
+        for i in tracker:
+            clock.advance(seconds=0.001 if i < 1000 else 0.01)
+        # When the rate drops 10x, the next sample can be up to 10x the tolerance late. The step then adapts to the new rate.
+        times = [0] + [report["time_taken"].total_seconds() for report in reports]
+        gaps = [time_taken - previous for previous, time_taken in zip(times, times[1:])]
+        self.assertEqual(len(gaps), 9)
+        self.assertLessEqual(max(gaps), 2.01)
+        for gap in gaps[-5:]:
+            self.assertLessEqual(gap, 1.11)
+
+    def test_idle_is_not_sampled(self):
+        with self.assertRaises(ValueError):
+            track_progress(range(10), every_n_seconds_idle=1, sample_tolerance=0.5)
+
+
 if __name__ == '__main__':
     unittest.main()
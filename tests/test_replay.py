@@ -0,0 +1,53 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from progress_tracker import EventLog, FakeClock, replay, track_progress
+
+
+class ReplayTests(unittest.TestCase):
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, "events.log")
+        self.reports = []
+        clock = FakeClock()
+        with EventLog(self.path, every_n_records=10) as log:
+            for _ in track_progress(range(100), every_n_percent=25, clock=clock, event_log=log, callback=self.reports.append):
+                clock.advance(seconds=1)
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_logged_reports(self):
+        replayed = []
+        replay(self.path, callback=replayed.append)
+        self.assertEqual(replayed, self.reports)
+
+    def test_other_format_callback(self):
+        replayed = []
+        replay(self.path, callback=replayed.append, format_callback=lambda report, reasons: (report["records_seen"], sorted(reasons)))
+        self.assertEqual(replayed, [(25, ["every_n_percent"]), (50, ["every_n_percent"]), (75, ["every_n_percent"]), (100, ["every_n_percent"])])
+
+    def test_other_conditions(self):
+        replayed = []
+        replay(self.path, callback=replayed.append, every_n_percent=40, report_last_record=True)
+        self.assertEqual(replayed, [
+            "40/100 (40.0%) in 0:00:40 (Time left: 0:01:00)",
+            "80/100 (80.0%) in 0:01:20 (Time left: 0:00:20)",
+            "100 in 0:01:40",
+        ])
+
+    def test_time_based_conditions_are_checked_at_the_logged_events(self):
+        replayed = []
+        replay(self.path, callback=replayed.append, format_callback=lambda report, reasons: report["records_seen"], every_n_seconds=15)
+        self.assertEqual(replayed, [20, 40, 60, 80, 100])
+
+    def test_other_total(self):
+        replayed = []
+        replay(self.path, callback=replayed.append, format_callback=lambda report, reasons: report["percent_complete"], total=200, every_n_percent=20)
+        self.assertEqual(replayed, [20.0, 40.0])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,117 @@
+import unittest
+from datetime import timedelta
+
+from progress_tracker import FakeClock, Report, compile_format, track_progress
+from progress_tracker.progress_tracker import default_format_callback
+from progress_tracker.report import SLOT_FIELDS
+
+
+class ReportTests(unittest.TestCase):
+    def test_values(self):
+        report = Report(25, 100, 5000000000, idle_ns=2000000000)
+        self.assertEqual(report["records_seen"], 25)
+        self.assertEqual(report["total"], 100)
+        self.assertEqual(report["percent_complete"], 25.0)
+        self.assertEqual(report["time_taken"], timedelta(seconds=5))
+        self.assertEqual(report["estimated_time_remaining"], timedelta(seconds=15))
+        self.assertEqual(report["items_per_second"], 5.0)
+        self.assertEqual(report["idle_time"], timedelta(seconds=2))
+        self.assertEqual(report["smoothed_items_per_second"], None)
+        self.assertEqual(report["smoothed_estimated_time_remaining"], None)
+        self.assertNotIn("latency_p50", report)
+        with self.assertRaises(KeyError):
+            report["latency_p50"]
+        with self.assertRaises(KeyError):
+            report["nonsense"]
+
+    def test_values_are_only_calculated_when_used(self):
+        report = Report(25, 100, 5000000000)
+        report["records_seen"]
+        self.assertEqual(set(report.calculated), {"records_seen"})
+        first = report["estimated_time_remaining"]
+        self.assertIs(report["estimated_time_remaining"], first)
+        self.assertEqual(set(report.calculated), {"records_seen", "estimated_time_remaining", "percent_complete"})
+
+    def test_behaves_like_the_old_dict(self):
+        report = Report(0, None, 0)
+        self.assertEqual(dict(report), {
+            'records_seen': 0,
+            'total': None,
+            'percent_complete': None,
+            'time_taken': timedelta(0),
+            'estimated_time_remaining': None,
+            'items_per_second': None,
+            'idle_time': None,
+            'smoothed_items_per_second': None,
+            'smoothed_estimated_time_remaining': None,
+        })
+        self.assertEqual("{records_seen} in {time_taken}".format(**report), "0 in 0:00:00")
+
+    def test_extra_values(self):
+        report = Report(1, None, 0)
+        report["worker_records"] = [1, 0]
+        report["records_seen"] = 2
+        self.assertEqual(report["worker_records"], [1, 0])
+        self.assertEqual(report["records_seen"], 2)
+        self.assertEqual(list(report)[-1], "worker_records")
+        self.assertEqual(len(report), 10)
+
+    def test_slot_values_match_the_fields(self):
+        for report in [Report(25, 100, 5000000000, idle_ns=2000000000), Report(0, 100, 1499), Report(3, None, 1234567891), Report(7, 9, 1500)]:
+            self.assertEqual(report.slot_values(), tuple(Report(report.records_seen, report.total, report.elapsed_ns, report.idle_ns)[name] for name in SLOT_FIELDS))
+        self.assertEqual(Report(3, None, 1234567891)["time_taken"], timedelta(seconds=1, microseconds=234568))  # Rounded to the nearest microsecond.
+
+    def test_snapshot_does_not_change(self):
+        clock = FakeClock()
+        reports = []
+        tracker = track_progress(list(range(10)), every_n_records=5, clock=clock, track_latency=True,
+                                 callback=lambda message: None, format_callback=lambda report, reasons: reports.append(report) or "")
+        for _ in tracker:
+            clock.advance(seconds=1)
+        self.assertEqual([report["records_seen"] for report in reports], [5, 10])
+        self.assertEqual(reports[0]["time_taken"], timedelta(seconds=5))
+        self.assertEqual(reports[0]["latency_max"], timedelta(seconds=1))
+        self.assertEqual(reports[1]["interval_latency_max"], timedelta(seconds=1))
+
+
+class CompiledFormatTests(unittest.TestCase):
+    def test_render(self):
+        report = Report(25, 100, 5000000000)
+        self.assertEqual(compile_format("{records_seen}/{total}").render(report), "25/100")
+        self.assertEqual(compile_format("{percent_complete:.1f}% {{done}}").render(report), "25.0% {done}")
+        self.assertEqual(compile_format("{time_taken.seconds!r}s, {records_seen}").render(report), "5s, 25")
+        self.assertEqual(compile_format("nothing").render(report), "nothing")
+        self.assertEqual(compile_format("{time_taken}")(report, frozenset()), "0:00:05")
+
+    def test_only_looks_up_used_fields(self):
+        compiled = compile_format("{records_seen} {items_per_second} {records_seen}")
+        self.assertEqual(compiled.fields, ("records_seen", "items_per_second"))
+        report = Report(25, 100, 5000000000)
+        compiled.render(report)
+        self.assertEqual(set(report.calculated), {"records_seen", "items_per_second"})
+
+    def test_replaced_values_are_rendered(self):
+        report = Report(1, 10, 0)
+        report["records_seen"] = 2
+        self.assertEqual(compile_format("{records_seen}/{total}").render(report), "2/10")
+        self.assertEqual(default_format_callback(report, frozenset(["report_last_record"])), "2 in 0:00:00")
+
+    def test_rejects_positional_fields(self):
+        for template in ["{}", "{0}", "{records_seen:{width}}"]:
+            with self.assertRaises(ValueError):
+                compile_format(template)
+
+    def test_default_format_matches_str_format(self):
+        report = Report(25, 100, 5000000000, idle_ns=1000000000)
+        for reasons in [frozenset(), frozenset(["report_last_record"]), frozenset(["every_n_seconds_idle"])]:
+            total = report["total"]
+            idle_message = " (After being idle for {idle_time})" if "every_n_seconds_idle" in reasons else ""
+            if total is None or "report_last_record" in reasons:
+                format_string = "{records_seen} in {time_taken}" + idle_message
+            else:
+                format_string = "{records_seen}/{total} ({percent_complete}%) in {time_taken} (Time left: {estimated_time_remaining})" + idle_message
+            self.assertEqual(default_format_callback(report, reasons), format_string.format(**report))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,146 @@
+import io
+import threading
+import time
+import unittest
+
+from progress_tracker import track_progress
+from progress_tracker.sinks import BLOCK, COALESCE, DROP_OLDEST, BackgroundSink, TerminalSink
+
+
+class BackgroundSinkTests(unittest.TestCase):
+    def setUp(self):
+        self.messages = []
+        self.threads = set()
+        self.release = threading.Event()
+
+    def slow_callback(self, message):
+        self.release.wait()
+        self.threads.add(threading.current_thread())
+        self.messages.append(message)
+
+    def records_seen(self, report, _reasons):
+        return report["records_seen"]
+
+    def test_delivers_on_background_thread(self):
+        sink = BackgroundSink()
+        start = time.monotonic()
+        tracker = track_progress(range(10), every_n_records=1, sink=sink, callback=self.slow_callback, format_callback=self.records_seen)
+        iterator = iter(tracker)
+        for _ in range(9):
+            next(iterator)
+        self.assertLess(time.monotonic() - start, 1)  # Not blocked by the callback
+        self.release.set()
+        list(iterator)  # Completing the tracker flushes the sink
+        self.assertEqual(self.messages, list(range(1, 11)))
+        self.assertEqual(self.threads, {sink.thread})
+        self.assertEqual(sink.delivered, 10)
+        self.assertEqual(sink.dropped, 0)
+
+    def test_block(self):
+        sink = BackgroundSink(maxsize=2, overflow=BLOCK)
+        self.release.set()
+        list(track_progress(range(50), every_n_records=1, sink=sink, callback=self.slow_callback, format_callback=self.records_seen))
+        self.assertEqual(self.messages, list(range(1, 51)))
+
+    def test_drop_oldest(self):
+        sink = BackgroundSink(maxsize=3, overflow=DROP_OLDEST)
+        tracker = track_progress(range(20), every_n_records=1, report_last_record=True, sink=sink, callback=self.slow_callback, format_callback=self.records_seen)
+        iterator = iter(tracker)
+        for _ in range(20):
+            next(iterator)
+        self.release.set()
+        list(iterator)
+        self.assertEqual(self.messages[-1], 20)  # The final report is never lost
+        self.assertEqual(sink.delivered + sink.dropped, 20)
+        self.assertGreaterEqual(sink.dropped, 16)
+        self.assertEqual(self.messages, sorted(self.messages))
+
+    def test_coalesce(self):
+        sink = BackgroundSink(overflow=COALESCE)
+        tracker = track_progress(range(20), every_n_records=1, sink=sink, callback=self.slow_callback, format_callback=self.records_seen)
+        iterator = iter(tracker)
+        for _ in range(20):
+            next(iterator)
+        self.release.set()
+        list(iterator)
+        self.assertLessEqual(len(self.messages), 2)  # The report being delivered when the rest arrived, and the latest one
+        self.assertEqual(self.messages[-1], 20)
+        self.assertEqual(sink.delivered + sink.dropped, 20)
+
+    def test_errors_are_raised_in_producer(self):
+        def failing_callback(_message):
+            raise ValueError("Sink is broken")
+
+        with self.assertRaises(ValueError):
+            list(track_progress(range(3), every_n_records=1, sink=BackgroundSink(), callback=failing_callback))
+
+    def test_close(self):
+        sink = BackgroundSink()
+        self.release.set()
+        list(track_progress(range(3), every_n_records=1, sink=sink, callback=self.slow_callback, format_callback=self.records_seen))
+        sink.close()
+        self.assertFalse(sink.thread.is_alive())
+        with self.assertRaises(RuntimeError):
+            list(track_progress(range(3), every_n_records=1, sink=sink))
+
+    def test_invalid_overflow(self):
+        with self.assertRaises(ValueError):
+            BackgroundSink(overflow="explode")
+
+
+class FakeTerminal(io.StringIO):
+    def isatty(self):
+        return True
+
+
+class TerminalSinkTests(unittest.TestCase):
+    def records_seen(self, report, _reasons):
+        return str(report["records_seen"])
+
+    def test_redraws_line_in_place(self):
+        terminal = FakeTerminal()
+        sink = TerminalSink(terminal, frames_per_second=1000)
+        for records in [5, 123, 45]:
+            with track_progress(total=200, every_n_records=1, sink=sink, format_callback=self.records_seen) as tracker:
+                tracker.advance(records)
+        self.assertEqual(terminal.getvalue(), "\r5\n\r123\n\r45\n")
+
+        terminal = FakeTerminal()
+        sink = TerminalSink(terminal, frames_per_second=1000)
+        sink.deliver({"records_seen": 123}, frozenset(), self.records_seen, print)
+        sink.deliver({"records_seen": 45}, frozenset(), self.records_seen, print)
+        sink.flush()
+        self.assertEqual(terminal.getvalue(), "\r123\r45 \n")  # The rest of the longer line is overwritten.
+
+    def test_frame_rate_is_limited(self):
+        terminal = FakeTerminal()
+        sink = TerminalSink(terminal, frames_per_second=5)
+        formatted = []
+
+        def format_callback(report, reasons):
+            formatted.append(report["records_seen"])
+            return str(report["records_seen"])
+
+        start = time.monotonic()
+        with track_progress(total=1000, every_n_records=1, sink=sink, format_callback=format_callback) as tracker:
+            while time.monotonic() - start < 0.5:
+                tracker.advance(1)
+                time.sleep(0.001)
+            tracker.advance(1000 - tracker.records_seen)
+        self.assertLessEqual(len(formatted), 5)  # About 3 frames in 0.5s, plus the final report, which isn't held back.
+        self.assertEqual(formatted[-1], 1000)
+        self.assertEqual(sink.delivered + sink.dropped, tracker.reports_raised)
+        self.assertTrue(terminal.getvalue().endswith("\r1000\n"))
+
+    def test_lines_when_not_a_terminal(self):
+        stream = io.StringIO()
+        sink = TerminalSink(stream, frames_per_second=1000)
+        with track_progress(total=10, every_n_records=5, sink=sink, format_callback=self.records_seen) as tracker:
+            for _ in range(10):
+                tracker.advance(1)
+                sink.flush()
+        self.assertEqual(stream.getvalue(), "5\n10\n")
+
+
+if __name__ == '__main__':
+    unittest.main()
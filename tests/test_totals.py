@@ -0,0 +1,113 @@
+import io
+import unittest
+import warnings
+
+from progress_tracker import AverageSizeTotal, FakeClock, LengthHint, track_progress
+
+
+def records(n):
+    for record in range(n):
+        yield record
+
+
+class TotalEstimatorTests(unittest.TestCase):
+    def test_length_hint_of_an_iterator(self):
+        iterator = iter(range(10))
+        hint = LengthHint(iterator)
+        self.assertEqual(hint(0), 10)
+        next(iterator)
+        next(iterator)
+        self.assertEqual(hint(2), 10)
+
+    def test_no_length_hint(self):
+        self.assertIsNone(LengthHint(records(10))(0))
+
+    def test_average_size(self):
+        file = io.BytesIO(b"a\nbb\nccc\n" * 100)
+        estimate = AverageSizeTotal(900, file.tell)
+        self.assertIsNone(estimate(0))
+        file.readline()
+        self.assertEqual(estimate(1), 450)  # The first record is 2 bytes out of 900.
+        file.readline()
+        file.readline()
+        self.assertEqual(estimate(3), 300)
+
+
+class EstimatedTotalTests(unittest.TestCase):
+    def test_percent_and_time_left_from_an_estimate(self):
+        clock = FakeClock()
+        reports = []
+        lines = io.BytesIO(b"".join(b"%d\n" % (index % 10) for index in range(100)))
+        estimate = AverageSizeTotal(200, lines.tell)
+        with warnings.catch_warnings():
+            warnings.simplefilter("error")
+            tracker = track_progress(lines, every_n_percent=25, total_estimator=estimate, clock=clock, callback=reports.append)
+        for _ in tracker:
+            clock.advance(seconds=1)
+        self.assertEqual(reports, [
+            "25/~100 (25.0%) in 0:00:25 (Time left: 0:01:15)",
+            "50/~100 (50.0%) in 0:00:50 (Time left: 0:00:50)",
+            "75/~100 (75.0%) in 0:01:15 (Time left: 0:00:25)",
+            "100/~100 (100.0%) in 0:01:40 (Time left: 0:00:00)",
+        ])
+        self.assertEqual(tracker.total, 100)
+        self.assertFalse(tracker.snapshot()["estimated"])
+
+    def test_estimate_is_refined(self):
+        reports = []
+        tracker = track_progress(records(200), every_n_percent=20, total_estimator=lambda records_seen: 100 if records_seen < 50 else 200,
+                                 callback=reports.append, format_callback=lambda report, reasons: (report["records_seen"], report["total"], report["estimated"]))
+        for _ in tracker:
+            pass
+        self.assertEqual(reports, [(20, 100, True), (40, 100, True), (120, 200, True), (160, 200, True), (200, 200, True)])
+        self.assertEqual(tracker.snapshot()["total"], 200)
+        self.assertFalse(tracker.snapshot()["estimated"])
+
+    def test_estimate_is_only_refined_every_percent(self):
+        calls = []
+        tracker = track_progress(records(1000), every_n_records=1000, total_estimator=lambda records_seen: calls.append(records_seen) or 1000, callback=lambda message: None)
+        for _ in tracker:
+            pass
+        self.assertEqual(calls, list(range(0, 1001, 10)))
+
+    def test_estimate_is_at_least_the_records_seen(self):
+        reports = []
+        tracker = track_progress(records(20), every_n_records=5, total_estimator=lambda records_seen: 10,
+                                 callback=reports.append, format_callback=lambda report, reasons: report["percent_complete"])
+        for _ in tracker:
+            pass
+        self.assertEqual(reports, [50.0, 100.0, 100.0, 100.0])
+
+    def test_estimate_keeps_up_once_passed(self):
+        reports = []
+        tracker = track_progress(records(1000), every_n_records=50, total_estimator=lambda records_seen: 500,
+                                 callback=reports.append, format_callback=lambda report, reasons: (report["records_seen"], report["total"]))
+        for _ in tracker:
+            pass
+        self.assertEqual(len(reports), 20)
+        for records_seen, total in reports:
+            self.assertLessEqual(records_seen, total + max(1, total // 100))  # At most 1% behind.
+
+    def test_estimate_backs_off_once_passed(self):
+        calls = []
+        tracker = track_progress(records(100000), total_estimator=lambda records_seen: calls.append(records_seen) or 1000, callback=lambda message: None)
+        for _ in tracker:
+            pass
+        self.assertLess(len(calls), 1000)  # Not once per record after the 1000th.
+        self.assertEqual(tracker.total, 100000)
+
+    def test_length_hint(self):
+        reports = []
+        iterator = iter(list(range(10)))
+        for _ in track_progress(iterator, every_n_percent=50, total_estimator=LengthHint(iterator), callback=reports.append):
+            pass
+        self.assertEqual([report.split(" ")[0] for report in reports], ["5/~10", "10/~10"])
+
+    def test_ignored_when_the_total_is_known(self):
+        tracker = track_progress(range(10), total_estimator=lambda records_seen: 5)
+        self.assertEqual(tracker.total, 10)
+        self.assertNotIn("estimated", tracker.snapshot())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,127 @@
+import threading
+import time
+import unittest
+import warnings
+
+from progress_tracker import track_progress
+from progress_tracker.progress_tracker import EVERY_N_RECORDS, EVERY_N_SECONDS, EVERY_N_SECONDS_IDLE
+from progress_tracker.watchdog import Watchdog
+
+
+class WatchdogTests(unittest.TestCase):
+    def setUp(self):
+        self.reports = []
+        self.watchdog = Watchdog()
+
+    def record_report(self, report, reasons):
+        self.reports.append((report["records_seen"], reasons, threading.current_thread()))
+        return ""
+
+    def test_schedule_and_cancel(self):
+        calls = []
+        fired = threading.Event()
+
+        def check(now_ns):
+            calls.append(now_ns)
+            if len(calls) == 3:
+                fired.set()
+                return None
+            return now_ns + 1000000
+
+        self.watchdog.schedule(self.watchdog.clock(), check)
+        cancelled = self.watchdog.schedule(self.watchdog.clock() + 10000000, lambda now_ns: calls.append(-1))
+        self.watchdog.cancel(cancelled)
+        self.assertTrue(fired.wait(1))
+        time.sleep(0.02)
+        self.assertEqual(len(calls), 3)
+        self.assertNotIn(-1, calls)
+
+    def test_failing_check_is_dropped(self):
+        calls = []
+        fired = threading.Event()
+
+        def failing_check(now_ns):
+            calls.append("failing")
+            raise ValueError("Exporter is broken")
+
+        def check(now_ns):
+            calls.append("check")
+            if calls.count("check") == 2:
+                fired.set()
+                return None
+            return now_ns + 1000000
+
+        with warnings.catch_warnings(record=True) as caught:
+            warnings.simplefilter("always")
+            self.watchdog.schedule(self.watchdog.clock(), failing_check)
+            self.watchdog.schedule(self.watchdog.clock(), check)
+            self.assertTrue(fired.wait(1))
+        self.assertEqual(calls.count("failing"), 1)
+        self.assertTrue(self.watchdog.thread.is_alive())
+        self.assertEqual([warning.category for warning in caught], [RuntimeWarning])
+
+    def test_idle_report_while_blocked(self):
+        IDLE_SECONDS_TRIGGER = 0.02
+
+        def stalling_source():
+            yield 1
+            time.sleep(IDLE_SECONDS_TRIGGER * 4)  # Blocked in `next()`
+            yield 2
+
+        for _ in track_progress(stalling_source(), every_n_seconds_idle=IDLE_SECONDS_TRIGGER, watchdog=self.watchdog, callback=lambda _: None, format_callback=self.record_report):
+            continue
+        self.assertEqual(len(self.reports), 1)
+        records_seen, reasons, thread = self.reports[0]
+        self.assertEqual(records_seen, 1)  # Reported before the second record arrived
+        self.assertEqual(reasons, frozenset([EVERY_N_SECONDS_IDLE]))
+        self.assertIs(thread, self.watchdog.thread)
+
+    def test_busy_processing_is_not_idle(self):
+        for _ in track_progress(range(2), every_n_seconds_idle=0.01, watchdog=self.watchdog, callback=lambda _: None, format_callback=self.record_report):
+            time.sleep(0.05)
+        self.assertEqual(self.reports, [])
+
+    def test_every_n_seconds_during_slow_record(self):
+        for _ in track_progress(range(1), every_n_seconds=0.02, watchdog=self.watchdog, callback=lambda _: None, format_callback=self.record_report):
+            time.sleep(0.07)
+        # Only a single report per record, even though the condition was met several times.
+        self.assertEqual([(records_seen, reasons) for records_seen, reasons, _ in self.reports], [(1, frozenset([EVERY_N_SECONDS]))])
+
+    def test_time_reports_wait_for_the_record(self):
+        for _ in track_progress(range(4), every_n_records=2, every_n_seconds=0.03, watchdog=self.watchdog, callback=lambda _: None, format_callback=self.record_report):
+            time.sleep(0.05)
+        # The condition is met while each record is being processed, so it's reported after the record, along with `every_n_records`.
+        reports = [(records_seen, reasons) for records_seen, reasons, _ in self.reports]
+        self.assertEqual([records_seen for records_seen, reasons in reports if EVERY_N_RECORDS in reasons], [2, 4])
+        self.assertTrue(any(EVERY_N_SECONDS in reasons for _, reasons in reports), reports)
+        self.assertEqual(len(reports), len(set(records_seen for records_seen, _ in reports)))
+
+    def test_single_report_per_record(self):
+        tracker = track_progress(range(200), every_n_records=1, every_n_seconds=0.0001, watchdog=self.watchdog, callback=lambda _: None, format_callback=self.record_report)
+        for _ in tracker:
+            time.sleep(0.0005)
+        records_reported = [records_seen for records_seen, _, _ in self.reports]
+        self.assertEqual(len(records_reported), len(set(records_reported)))
+        self.assertEqual(tracker.reports_raised, len(self.reports))
+
+    def test_callback_errors_are_raised_in_consumer(self):
+        def failing_callback(_message):
+            raise ValueError("Sink is broken")
+
+        with self.assertRaises(ValueError):
+            for _ in track_progress(range(3), every_n_seconds=0.01, watchdog=self.watchdog, callback=failing_callback):
+                time.sleep(0.03)
+
+    def test_clock_must_match(self):
+        with self.assertRaises(ValueError):
+            track_progress(range(3), every_n_seconds=1, watchdog=self.watchdog, clock=lambda: 0)
+
+    def test_shared_watchdog(self):
+        self.assertIs(Watchdog.shared(), Watchdog.shared())
+        tracker = track_progress(range(3), every_n_seconds=1, watchdog=True)
+        self.assertIs(tracker.watchdog, Watchdog.shared())
+        self.assertEqual(list(tracker), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()